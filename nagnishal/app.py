@@ -3,8 +3,9 @@ import pandas as pd
 import folium
 from streamlit_folium import st_folium
 import os
-from pathfinding import CampusPathfinder
+from pathfinding import DEFAULT_PROFILE, PROFILES
 from gemini_integration import GeminiAssistant
+from map_registry import DEFAULT_MAP, MapRegistry, load_map_config
 
 # Load environment variables from .env file
 try:
@@ -279,26 +280,39 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize pathfinder and Gemini assistant
+# Initialize the map registry and Gemini assistant
 @st.cache_resource
-def initialize_pathfinder():
-    return CampusPathfinder("attached_assets/map_1758707724808.osm")
+def initialize_maps():
+    # Loads maps by id on first use and hot-reloads them; each rerun uses the current pathfinder
+    return MapRegistry(load_map_config(os.environ.get("MAP_CONFIG")))
 
 @st.cache_resource
-def initialize_gemini():
+def initialize_gemini(map_id: str):
+    # One assistant per map, knowing that map's locations
     try:
         # Check for API key in environment variables (set by Replit Secrets)
         if not os.environ.get("GEMINI_API_KEY"):
             st.warning("🔧 AI Assistant unavailable: GEMINI_API_KEY not configured")
             return None
-        return GeminiAssistant()
+        return GeminiAssistant(registry=initialize_maps().registry(map_id))
     except Exception as e:
         st.error(f"Failed to initialize AI Assistant: {str(e)}")
         return None
 
 try:
-    pathfinder = initialize_pathfinder()
-    gemini = initialize_gemini()
+    maps = initialize_maps()
+    map_ids = list(maps.config)
+    if len(map_ids) > 1:
+        map_id = st.sidebar.selectbox("🏫 Campus Map", map_ids, index=map_ids.index(DEFAULT_MAP) if DEFAULT_MAP in map_ids else 0)
+    else:
+        map_id = map_ids[0]
+    pathfinder = maps.pathfinder(map_id)
+    if st.session_state.get('map_id') != map_id:
+        # A different campus invalidates the drawn map and the last route
+        st.session_state['map_id'] = map_id
+        st.session_state.pop('current_map', None)
+        st.session_state.pop('path_metrics', None)
+    gemini = initialize_gemini(map_id)
     
     # Cyberpunk header
     st.markdown("""
@@ -337,6 +351,13 @@ try:
                 index=0,
                 help="Choose the pathfinding algorithm. A* variants are recommended for optimal routes."
             )
+            profile = st.selectbox(
+                "🧭 Travel Mode",
+                list(PROFILES),
+                index=list(PROFILES).index(DEFAULT_PROFILE),
+                format_func=str.capitalize,
+                help="Edges are weighted, or excluded, for this way of getting around."
+            )
         
         # Find path button
         st.markdown("<br>", unsafe_allow_html=True)
@@ -360,7 +381,7 @@ try:
             if run_pathfinding:
                 try:
                     with st.spinner(f"Neural processing using {algorithm}..."):
-                        result = pathfinder.find_path(start_location, end_location, algorithm)
+                        result = pathfinder.find_path(start_location, end_location, algorithm, profile=profile)
                         st.session_state['current_map'] = result['map']
                         st.session_state['path_metrics'] = result['metrics']
                         st.session_state['algorithm_used'] = algorithm
@@ -509,7 +530,7 @@ try:
         
         with st.spinner("🧠 Running neural algorithm comparison..."):
             try:
-                comparison_results = pathfinder.compare_algorithms()
+                comparison_results = pathfinder.compare_algorithms(profile=profile)
                 
                 # Display results table
                 df = pd.DataFrame(comparison_results)
@@ -548,7 +569,7 @@ try:
         
         with st.spinner("🧠 Running heuristic neural analysis..."):
             try:
-                heuristic_results = pathfinder.compare_heuristics()
+                heuristic_results = pathfinder.compare_heuristics(profile=profile)
                 
                 # Display results table
                 df_heuristic = pd.DataFrame(heuristic_results)
@@ -0,0 +1,161 @@
+import argparse
+import itertools
+import json
+import platform
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from pathfinding import ALGORITHMS, DEFAULT_PROFILE, PROFILES, CampusPathfinder, SearchInstrumentation
+from synthetic_graphs import GRAPH_KINDS, synthetic_pathfinder
+
+DEFAULT_OSM = "attached_assets/map_1758707724808.osm"
+
+# Untimed runs before measuring, and timed runs per route and algorithm
+WARMUP = 1
+REPEAT = 5
+
+PERCENTILES = (50, 95, 99)
+
+
+def poi_pairs(pathfinder: CampusPathfinder) -> List[Tuple[str, str]]:
+    """Every ordered pair of distinct POIs."""
+    return list(itertools.permutations(pathfinder.POIS, 2))
+
+
+def measure_route(pathfinder: CampusPathfinder, start: str, end: str, algorithm: str,
+                  warmup: int = WARMUP, repeat: int = REPEAT, profile: str = DEFAULT_PROFILE) -> Dict[str, Any]:
+    """Time one route and algorithm, then count its work and memory in separate runs.
+
+    Latency runs call the bare search so tracing never skews the timings;
+    counters come from an instrumented pass and peak memory from a tracemalloc pass.
+    """
+    start_node = pathfinder.nearest_node(pathfinder.POIS[start], profile)
+    end_node = pathfinder.nearest_node(pathfinder.POIS[end], profile)
+
+    for _ in range(warmup):
+        pathfinder.search(start_node, end_node, algorithm, profile=profile)
+
+    latencies = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        path, cost, explored = pathfinder.search(start_node, end_node, algorithm, profile=profile)
+        latencies.append((time.perf_counter() - began) * 1000)
+
+    counters = SearchInstrumentation()
+    pathfinder.search(start_node, end_node, algorithm, counters, profile)
+
+    tracemalloc.start()
+    pathfinder.search(start_node, end_node, algorithm, profile=profile)
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'algorithm': algorithm,
+        'start': start,
+        'end': end,
+        'found': path is not None,
+        'distance': pathfinder.calculate_path_distance(path) if path else None,
+        'nodes_expanded': len(explored),
+        'heap_pushes': counters.pushes,
+        'stale_pops': counters.stale_pops,
+        'max_frontier': counters.max_frontier,
+        'peak_memory_kb': peak_bytes / 1024,
+        'latencies_ms': latencies
+    }
+
+
+def summarize(runs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Aggregate route runs into one row per algorithm."""
+    summary = []
+    for algorithm, group in itertools.groupby(sorted(runs, key=lambda r: r['algorithm']), key=lambda r: r['algorithm']):
+        group = list(group)
+        latencies = np.concatenate([r['latencies_ms'] for r in group])
+        row = {'algorithm': algorithm, 'routes': len(group), 'found': sum(r['found'] for r in group)}
+        for p, value in zip(PERCENTILES, np.percentile(latencies, PERCENTILES)):
+            row[f'p{p}_ms'] = round(float(value), 4)
+        row['mean_nodes_expanded'] = round(float(np.mean([r['nodes_expanded'] for r in group])), 2)
+        row['mean_heap_pushes'] = round(float(np.mean([r['heap_pushes'] for r in group])), 2)
+        row['mean_stale_pops'] = round(float(np.mean([r['stale_pops'] for r in group])), 2)
+        row['max_frontier'] = max(r['max_frontier'] for r in group)
+        row['max_peak_memory_kb'] = round(max(r['peak_memory_kb'] for r in group), 2)
+        summary.append(row)
+    order = {name: i for i, name in enumerate(ALGORITHMS)}
+    return sorted(summary, key=lambda row: order.get(row['algorithm'], len(order)))
+
+
+def run_benchmark(pathfinder: CampusPathfinder, algorithms: Optional[List[str]] = None,
+                  pairs: Optional[List[Tuple[str, str]]] = None,
+                  warmup: int = WARMUP, repeat: int = REPEAT, profile: str = DEFAULT_PROFILE) -> Dict[str, Any]:
+    """Benchmark algorithms over route pairs (all ordered POI pairs by default)."""
+    algorithms = algorithms or ALGORITHMS
+    pairs = pairs if pairs is not None else poi_pairs(pathfinder)
+
+    runs = [
+        measure_route(pathfinder, start, end, algorithm, warmup, repeat, profile)
+        for algorithm in algorithms
+        for start, end in pairs
+    ]
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'graph_nodes': pathfinder.search_graph.node_count,
+            'graph_edges': pathfinder.search_graph.edge_count,
+            'map_nodes': pathfinder.routing.node_count,
+            'profile': profile,
+            'routes': len(pairs),
+            'warmup': warmup,
+            'repeat': repeat
+        },
+        'summary': summarize(runs),
+        'runs': runs
+    }
+
+
+def write_results(results: Dict[str, Any], prefix: str):
+    """Write PREFIX.json (everything), PREFIX.csv (summary) and PREFIX_runs.csv."""
+    with open(f"{prefix}.json", "w") as f:
+        json.dump(results, f, indent=2)
+    pd.DataFrame(results['summary']).to_csv(f"{prefix}.csv", index=False)
+
+    runs = pd.DataFrame(results['runs'])
+    latencies = pd.DataFrame(runs.pop('latencies_ms').tolist())
+    runs['median_ms'] = latencies.median(axis=1)
+    runs['min_ms'] = latencies.min(axis=1)
+    runs.to_csv(f"{prefix}_runs.csv", index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CampusPathfinder over every POI pair and algorithm.")
+    parser.add_argument("--osm", default=DEFAULT_OSM, help="OSM file to load")
+    parser.add_argument("--synthetic", choices=GRAPH_KINDS, help="Benchmark a generated graph instead of the OSM file")
+    parser.add_argument("--nodes", type=int, default=10000, help="Approximate node count of the synthetic graph")
+    parser.add_argument("--algorithms", nargs="+", choices=ALGORITHMS, help="Algorithms to run (default: all)")
+    parser.add_argument("--profile", choices=list(PROFILES), default=DEFAULT_PROFILE, help="Travel profile to weight edges by")
+    parser.add_argument("--warmup", type=int, default=WARMUP, help="Untimed runs per route")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="Timed runs per route")
+    parser.add_argument("--limit", type=int, help="Only benchmark the first N POI pairs")
+    parser.add_argument("--out", default="benchmark_results", help="Output prefix for the JSON and CSV files")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        pathfinder = synthetic_pathfinder(args.synthetic, args.nodes)
+    else:
+        pathfinder = CampusPathfinder(args.osm)
+    pairs = poi_pairs(pathfinder)[:args.limit]
+    results = run_benchmark(pathfinder, args.algorithms, pairs, args.warmup, args.repeat, args.profile)
+    write_results(results, args.out)
+
+    print(pd.DataFrame(results['summary']).to_string(index=False))
+    print(f"\nWrote {args.out}.json, {args.out}.csv and {args.out}_runs.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Any, List, Tuple
+
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, TfidfVectorizer
+
+# Cosine similarity below which a location is not considered a match
+MIN_SCORE = 0.2
+
+# Words in nearly every entry or question that say nothing about a particular
+# place; "is the pool open" or "gym hours" must not match whatever is open 24/7
+STOP_WORDS = sorted(ENGLISH_STOP_WORDS | {'campus', 'open', 'opens', 'hour', 'hours', 'time', 'timing', 'timings', 'now'})
+
+
+def hour_tags(hours: str) -> str:
+    """Describe opening hours in words, so queries like "study late" can match them."""
+    if hours == "24/7":
+        return "24/7 always anytime overnight late night early morning"
+
+    times = re.findall(r'(\d+):\d+\s*(AM|PM)', hours)
+    if len(times) != 2:
+        return ""
+    (open_hour, open_half), (close_hour, close_half) = times
+    opens = int(open_hour) % 12 + (12 if open_half == "PM" else 0)
+    closes = int(close_hour) % 12 + (12 if close_half == "PM" else 0)
+
+    tags = []
+    if opens <= 7:
+        tags.append("early morning")
+    if closes >= 21:
+        tags.append("late night evening")
+    return " ".join(tags)
+
+
+class CampusRetriever:
+    """TF-IDF nearest-neighbour index over campus_info entries.
+
+    Each entry is indexed by its name, zone, description, facilities, nearby
+    places and a wording of its hours. Queries are scored by cosine
+    similarity through an inverted index of term postings, so only locations
+    sharing a term with the query are touched.
+    """
+
+    def __init__(self, campus_info: Dict[str, Dict[str, Any]]):
+        self.keys = list(campus_info)
+        documents = [self._document(info) for info in campus_info.values()]
+
+        self.vectorizer = TfidfVectorizer(stop_words=STOP_WORDS, sublinear_tf=True)
+        self.analyzer = self.vectorizer.build_analyzer()
+        if not documents:
+            # A campus without locations has nothing to retrieve; every search is empty
+            self.vocabulary, self.idf, self.postings = {}, None, []
+            return
+        matrix = self.vectorizer.fit_transform(documents).tocsc()
+        self.vocabulary = self.vectorizer.vocabulary_
+        self.idf = self.vectorizer.idf_
+
+        # Term id -> [(location index, weight)], the columns of the TF-IDF matrix
+        self.postings = [
+            list(zip(matrix.indices[start:end].tolist(), matrix.data[start:end].tolist()))
+            for start, end in zip(matrix.indptr[:-1], matrix.indptr[1:])
+        ]
+
+    def search(self, query: str, k: int = 3, min_score: float = MIN_SCORE) -> List[Tuple[str, float]]:
+        """Return up to k (campus_info key, score) pairs ranked by similarity."""
+        counts = Counter(term for term in self.analyzer(query) if term in self.vocabulary)
+        if not counts:
+            return []
+
+        # Query vector with the same sublinear TF-IDF weighting as the index
+        weights = {}
+        for term, count in counts.items():
+            term_id = self.vocabulary[term]
+            weights[term_id] = (1 + math.log(count)) * self.idf[term_id]
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+
+        scores = defaultdict(float)
+        for term_id, weight in weights.items():
+            for location, value in self.postings[term_id]:
+                scores[location] += weight * value
+
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.keys[location], float(score / norm)) for location, score in top if score / norm >= min_score]
+
+    def _document(self, info: Dict[str, Any]) -> str:
+        """Text indexed for one location."""
+        return " ".join([
+            info['name'],
+            info['location'],
+            info['description'],
+            " ".join(info['facilities']),
+            " ".join(info['nearby']),
+            hour_tags(info['hours'])
+        ])
@@ -0,0 +1,113 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Dict, Any, Optional
+
+try:
+    import streamlit as st
+    from streamlit import runtime as st_runtime
+except ImportError:  # Flask deployments do not need Streamlit
+    st = None
+    st_runtime = None
+
+# Default bounds: per-session history length, idle lifetime and live sessions
+MAX_HISTORY = 20
+SESSION_TTL_SECONDS = 30 * 60
+MAX_SESSIONS = 10000
+
+
+def new_context(max_history: int = MAX_HISTORY) -> Dict[str, Any]:
+    """Create an empty conversation context with a bounded history."""
+    return {
+        'last_location': None,
+        'last_query_type': None,
+        'conversation_history': deque(maxlen=max_history)
+    }
+
+
+class ContextStore(ABC):
+    """Interface for conversation context storage keyed by session id."""
+
+    @abstractmethod
+    def get(self, session_id: Optional[str]) -> Dict[str, Any]:
+        """Return the context for a session, creating it if needed."""
+
+    @abstractmethod
+    def save(self, session_id: Optional[str], context: Dict[str, Any]):
+        """Persist an updated context for a session."""
+
+
+class InMemoryContextStore(ContextStore):
+    """Process-local LRU store with idle TTL eviction.
+
+    Sessions are kept in access order, so both the least recently used and
+    the expired sessions sit at the front of the dict and are evicted in
+    O(1) each. Memory is bounded by max_sessions * max_history entries.
+    """
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, ttl_seconds: float = SESSION_TTL_SECONDS,
+                 max_history: int = MAX_HISTORY):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_history = max_history
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: Optional[str]) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                context = new_context(self.max_history)
+            else:
+                context = entry[1]
+            self._store(session_id, context, now)
+            return context
+
+    def save(self, session_id: Optional[str], context: Dict[str, Any]):
+        with self._lock:
+            self._store(session_id, context, time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _store(self, session_id: Optional[str], context: Dict[str, Any], now: float):
+        self._sessions[session_id] = (now + self.ttl_seconds, context)
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def _evict_expired(self, now: float):
+        while self._sessions:
+            session_id, (expires_at, _) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                break
+            del self._sessions[session_id]
+
+
+class StreamlitContextStore(ContextStore):
+    """Store backed by st.session_state, which is already per browser session."""
+
+    def __init__(self, max_history: int = MAX_HISTORY):
+        self.max_history = max_history
+
+    def get(self, session_id: Optional[str]) -> Dict[str, Any]:
+        context = st.session_state.get('conversation_context')
+        if context is None:
+            context = new_context(self.max_history)
+        elif not isinstance(context['conversation_history'], deque):
+            context['conversation_history'] = deque(context['conversation_history'], maxlen=self.max_history)
+        st.session_state.conversation_context = context
+        return context
+
+    def save(self, session_id: Optional[str], context: Dict[str, Any]):
+        st.session_state.conversation_context = context
+
+
+def default_context_store() -> ContextStore:
+    """Pick the Streamlit store inside a Streamlit run, in-memory otherwise."""
+    if st_runtime is not None and st_runtime.exists():
+        return StreamlitContextStore()
+    return InMemoryContextStore()
@@ -0,0 +1,144 @@
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+# Model requests: /v1beta/models/<model>:generateContent or :streamGenerateContent
+MODEL_PATH = re.compile(r'^/v\w+/models/(?P<model>[^:/]+):(?P<method>generateContent|streamGenerateContent)')
+
+# Default answer, split on spaces into streamed chunks
+DEFAULT_ANSWER = "The library is open from 8 AM to 10 PM."
+
+
+class FakeGeminiServer:
+    """Local stand-in for the Gemini REST API, for tests and offline runs.
+
+    Serves generateContent and streamGenerateContent (as server-sent events)
+    on 127.0.0.1; point the client at ``url`` with GEMINI_BASE_URL. The
+    behaviour can be changed between requests: ``delay`` seconds before
+    answering, ``chunk_delay`` seconds between streamed chunks, ``status``
+    to fail every request with that HTTP status, and ``fail_after_chunks``
+    to cut a stream off after that many chunks. Every request body is kept
+    in ``requests``.
+    """
+
+    def __init__(self, port: int = 0, answer: str = DEFAULT_ANSWER):
+        self.answer = answer
+        self.delay = 0.0
+        self.chunk_delay = 0.0
+        self.status = 200
+        self.fail_after_chunks: Optional[int] = None
+        self.requests: List[Dict[str, Any]] = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeGeminiServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-gemini", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'FakeGeminiServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def chunks(self) -> List[str]:
+        """The answer as streamed chunks, one word each."""
+        words = self.answer.split(" ")
+        return [word + (" " if i < len(words) - 1 else "") for i, word in enumerate(words)]
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                match = MODEL_PATH.match(self.path)
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if match is None:
+                    return self._send_json(404, {"error": {"code": 404, "message": f"No route {self.path}",
+                                                           "status": "NOT_FOUND"}})
+                fake.requests.append(dict(json.loads(body or b"{}"), model=match["model"], method=match["method"]))
+                time.sleep(fake.delay)
+                if fake.status != 200:
+                    return self._send_json(fake.status, {"error": {"code": fake.status, "message": "Fake failure",
+                                                                   "status": "INTERNAL"}})
+                if match["method"] == "generateContent":
+                    return self._send_json(200, candidate(fake.answer))
+                self._stream()
+
+            def _stream(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                self.close_connection = True
+                try:
+                    for i, chunk in enumerate(fake.chunks()):
+                        if fake.fail_after_chunks is not None and i >= fake.fail_after_chunks:
+                            # Drop the connection without the final chunk, like a reset upstream
+                            return
+                        if i:
+                            time.sleep(fake.chunk_delay)
+                        event = f"data: {json.dumps(candidate(chunk))}\r\n\r\n".encode()
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(event), event))
+                        self.wfile.flush()
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+
+            def _send_json(self, status: int, payload: Dict[str, Any]):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def candidate(text: str) -> Dict[str, Any]:
+    """generateContent response body carrying one text part."""
+    return {
+        "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP", "index": 0}],
+        "modelVersion": "fake"
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake Gemini API; set GEMINI_BASE_URL to its address.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds before every answer")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="Seconds between streamed chunks")
+    args = parser.parse_args()
+
+    server = FakeGeminiServer(args.port)
+    server.delay, server.chunk_delay = args.delay, args.chunk_delay
+    print(f"Fake Gemini API on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
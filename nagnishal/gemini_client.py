@@ -0,0 +1,226 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from typing import Any, Iterator, List, Optional
+
+from google import genai
+from google.genai import types
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+# Model call limits: concurrent calls per process and hard deadline per call
+MAX_CONCURRENCY = 8
+CALL_TIMEOUT_SECONDS = 5.0
+
+# Circuit breaker: consecutive failures before opening, seconds before a retry
+FAILURE_THRESHOLD = 3
+RESET_TIMEOUT_SECONDS = 30.0
+
+
+def create_genai_client() -> genai.Client:
+    """Create the Gemini client from the environment.
+
+    GEMINI_BASE_URL points the client at another endpoint, such as a local
+    fake server in tests.
+    """
+    base_url = os.environ.get("GEMINI_BASE_URL")
+    http_options = types.HttpOptions(base_url=base_url) if base_url else None
+    return genai.Client(api_key=os.environ.get("GEMINI_API_KEY"), http_options=http_options)
+
+
+class ModelStreamError(Exception):
+    """A streamed model answer failed after some text was already delivered."""
+
+
+class CircuitBreaker:
+    """Stops calling the model after repeated failures, retrying after a cool-down.
+
+    Closed: calls go through. Open: calls are refused until reset_timeout has
+    passed. Half-open: a single trial call decides whether to close again.
+    """
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted now."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half-open"
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """Give up a call that ended without an outcome, e.g. because it was cancelled.
+
+        A half-open trial call is handed back, so the next call becomes the
+        trial instead of the breaker waiting forever on one that never reports.
+        """
+        with self._lock:
+            if self.state == "half-open":
+                self.state = "open"
+                self.opened_at = time.monotonic() - self.reset_timeout
+
+
+class AsyncGeminiClient:
+    """Asyncio model call path shared by Flask and Streamlit threads.
+
+    Calls run on one background event loop so the client's async HTTP
+    connections are reused. A semaphore caps concurrent calls, every call has
+    a hard deadline (including time spent queued), and a circuit breaker
+    skips the model entirely while it is failing. Every failure returns None
+    so callers can fall back to the template answers.
+    """
+
+    def __init__(self, client: Optional[Any] = None, model: Optional[str] = None,
+                 max_concurrency: int = MAX_CONCURRENCY, timeout_seconds: float = CALL_TIMEOUT_SECONDS,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.client = client if client is not None else create_genai_client()
+        self.model = model or os.environ.get("GEMINI_MODEL", DEFAULT_MODEL)
+        self.timeout_seconds = timeout_seconds
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self._max_concurrency = max_concurrency
+        self._semaphore = None
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Background event loop, started on first use."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="gemini-client", daemon=True).start()
+            return self._loop
+
+    async def generate(self, prompt: str, system_instruction: Optional[str] = None) -> Optional[str]:
+        """Generate text for a prompt, or None on timeout, error or open circuit."""
+        if not self.breaker.allow():
+            return None
+        semaphore = self._get_semaphore()
+        config = types.GenerateContentConfig(system_instruction=system_instruction) if system_instruction else None
+
+        async def call() -> str:
+            async with semaphore:
+                response = await self.client.aio.models.generate_content(
+                    model=self.model, contents=prompt, config=config
+                )
+                return response.text
+
+        try:
+            text = await asyncio.wait_for(call(), self.timeout_seconds)
+        except asyncio.CancelledError:
+            # Cancelled by the caller, not a model failure
+            self.breaker.release()
+            raise
+        except Exception as e:
+            print(f"Model call failed: {type(e).__name__}: {e}")
+            self.breaker.record_failure()
+            return None
+
+        self.breaker.record_success()
+        return text or None
+
+    async def stream(self, prompt: str, chunks: queue.Queue, system_instruction: Optional[str] = None):
+        """Stream generated text into a queue as ('chunk', text) items.
+
+        The deadline applies to the first chunk and is then renewed for every
+        chunk, so a stalled stream is cut off. Always finishes with ('end', ok).
+        """
+        ok = False
+        try:
+            if not self.breaker.allow():
+                return
+            semaphore = self._get_semaphore()
+            config = types.GenerateContentConfig(system_instruction=system_instruction) if system_instruction else None
+
+            async with asyncio.timeout(self.timeout_seconds) as deadline:
+                async with semaphore:
+                    stream = await self.client.aio.models.generate_content_stream(
+                        model=self.model, contents=prompt, config=config
+                    )
+                    async for response in stream:
+                        if response.text:
+                            chunks.put(('chunk', response.text))
+                        deadline.reschedule(asyncio.get_running_loop().time() + self.timeout_seconds)
+            ok = True
+            self.breaker.record_success()
+        except asyncio.CancelledError:
+            # The consumer went away (stream_sync cancels the task), not a model failure
+            self.breaker.release()
+            raise
+        except Exception as e:
+            print(f"Model stream failed: {type(e).__name__}: {e}")
+            self.breaker.record_failure()
+        finally:
+            chunks.put(('end', ok))
+
+    async def generate_many(self, prompts: List[str], system_instruction: Optional[str] = None) -> List[Optional[str]]:
+        """Generate for many prompts as waves of concurrent calls.
+
+        Each wave is at most max_concurrency calls, so no call spends its
+        deadline queued behind the rest of the batch.
+        """
+        results = []
+        for start in range(0, len(prompts), self._max_concurrency):
+            wave = prompts[start:start + self._max_concurrency]
+            results.extend(await asyncio.gather(*(self.generate(p, system_instruction) for p in wave)))
+        return results
+
+    def run(self, coroutine) -> Any:
+        """Run a coroutine on the background loop from a synchronous thread."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def generate_sync(self, prompt: str, system_instruction: Optional[str] = None) -> Optional[str]:
+        """Blocking wrapper around generate() for request threads."""
+        return self.run(self.generate(prompt, system_instruction))
+
+    def stream_sync(self, prompt: str, system_instruction: Optional[str] = None) -> Iterator[str]:
+        """Yield text chunks from a request thread as the model produces them.
+
+        Yields nothing if the model fails before the first chunk, so callers can
+        fall back; raises ModelStreamError if it fails part way through.
+        """
+        chunks = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(self.stream(prompt, chunks, system_instruction), self.loop)
+        delivered = False
+        try:
+            while True:
+                kind, value = chunks.get()
+                if kind == 'chunk':
+                    delivered = True
+                    yield value
+                elif value or not delivered:
+                    return
+                else:
+                    raise ModelStreamError("Model stream interrupted")
+        finally:
+            # Stop generating if the consumer went away early
+            future.cancel()
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limit, created on the background loop."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._semaphore
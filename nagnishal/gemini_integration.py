@@ -1,165 +1,297 @@
 # IMPORTANT: KEEP THIS COMMENT
 # Using google-genai blueprint integration
-from google import genai
-from google.genai import types
-from typing import Dict, Any, Optional
-import streamlit as st
+from typing import Dict, Any, Optional, List, Iterator, Tuple
 import re
-import os
+import threading
 from datetime import datetime
 from difflib import SequenceMatcher
+from collections import Counter
+from functools import lru_cache
+from conversation_store import ContextStore, default_context_store
+from response_cache import ResponseCache
+from gemini_client import AsyncGeminiClient, ModelStreamError, create_genai_client
+from intent_classifier import IntentClassifier
+from campus_index import CampusRetriever
+from location_registry import LocationRegistry, normalize_location_name
 
 def get_string_similarity(s1: str, s2: str) -> float:
     """Calculate similarity ratio between two strings."""
     return SequenceMatcher(None, s1.lower(), s2.lower()).ratio()
 
-def normalize_location_name(name: str) -> str:
-    """Normalize location name for better matching."""
-    return re.sub(r'[^a-z0-9]', '', name.lower())
+def qgrams(text: str, q: int = 3) -> set:
+    """Return the set of q-grams of a string (the string itself if shorter than q)."""
+    if len(text) <= q:
+        return {text}
+    return {text[i:i + q] for i in range(len(text) - q + 1)}
+
+def similarity_ratio(matches: int, total_length: int) -> float:
+    """SequenceMatcher.ratio() formula, so bounds compare exactly with real scores."""
+    return 2.0 * matches / total_length if total_length else 1.0
+
+class LocationMatcher:
+    """Precomputed fuzzy matcher over campus_info keys, names and variations.
+    
+    Returns exactly what a SequenceMatcher scan over every alias would return,
+    including the first-alias-wins tie break, but only runs SequenceMatcher on
+    aliases whose length and character-count upper bounds can still win.
+    A trigram index seeds the scan with likely matches so the bounds tighten
+    early.
+    """
+    
+    SEED_CANDIDATES = 5
+    
+    def __init__(self, campus_info: Dict[str, Dict[str, Any]], cache_size: int = 4096):
+        self.aliases = []  # normalized alias strings, in original scan order
+        self.alias_keys = []  # campus_info key for each alias
+        self.exact = {}  # alias -> first alias index
+        
+        for loc_key, loc_info in campus_info.items():
+            candidates = [
+                loc_key,
+                loc_info['name'],
+                loc_key.replace('_', ' '),
+                loc_info['name'].lower(),
+                loc_key.replace('block', '').strip(),
+                loc_key.replace('court', '').strip(),
+                loc_key.replace('ground', '').strip()
+            ]
+            for candidate in candidates:
+                alias = normalize_location_name(candidate)
+                # A repeated alias can never beat its first occurrence
+                if alias and alias not in self.exact:
+                    self.exact[alias] = len(self.aliases)
+                    self.aliases.append(alias)
+                    self.alias_keys.append(loc_key)
+        
+        self.char_counts = [Counter(alias) for alias in self.aliases]
+        
+        self.by_length = {}
+        for idx, alias in enumerate(self.aliases):
+            self.by_length.setdefault(len(alias), []).append(idx)
+        
+        self.qgram_index = {}
+        for idx, alias in enumerate(self.aliases):
+            for gram in qgrams(alias):
+                self.qgram_index.setdefault(gram, []).append(idx)
+        
+        self._cached_match = lru_cache(maxsize=cache_size)(self._match_normalized)
+    
+    def best_match(self, query_term: str, threshold: float = 0.6) -> Optional[str]:
+        """Best matching campus_info key for a term, or None below threshold."""
+        return self._cached_match(normalize_location_name(query_term), threshold)
+    
+    def best_matches(self, query_terms: List[str], threshold: float = 0.6) -> List[Optional[str]]:
+        """Batched best_match; repeated terms are only matched once."""
+        results = {}
+        for term in query_terms:
+            if term not in results:
+                results[term] = self.best_match(term, threshold)
+        return [results[term] for term in query_terms]
+    
+    def _match_normalized(self, query: str, threshold: float) -> Optional[str]:
+        if not query:
+            return None
+        
+        exact_idx = self.exact.get(query)
+        if exact_idx is not None:
+            return self.alias_keys[exact_idx]
+        
+        query_len = len(query)
+        query_counts = Counter(query)
+        best_idx = None
+        best_score = threshold
+        seen = set()
+        
+        def beats(score: float, idx: int) -> bool:
+            return score > best_score or (best_idx is not None and score == best_score and idx < best_idx)
+        
+        def consider(idx: int):
+            nonlocal best_idx, best_score
+            seen.add(idx)
+            alias = self.aliases[idx]
+            total = query_len + len(alias)
+            
+            # Shared characters bound the matching blocks (SequenceMatcher.quick_ratio)
+            counts = self.char_counts[idx]
+            shared = sum(min(n, counts[ch]) for ch, n in query_counts.items() if ch in counts)
+            if not beats(similarity_ratio(shared, total), idx):
+                return
+            
+            score = SequenceMatcher(None, query, alias).ratio()
+            if beats(score, idx):
+                best_idx, best_score = idx, score
+        
+        # Seed with the aliases sharing the most trigrams with the query
+        overlap = Counter()
+        for gram in qgrams(query):
+            overlap.update(self.qgram_index.get(gram, ()))
+        for idx, _ in overlap.most_common(self.SEED_CANDIDATES):
+            consider(idx)
+        
+        # Then every length bucket whose length bound can still win, best bound first
+        bucket_bounds = sorted(
+            ((similarity_ratio(min(length, query_len), length + query_len), length) for length in self.by_length),
+            reverse=True
+        )
+        for bound, length in bucket_bounds:
+            if bound < best_score:
+                break
+            for idx in self.by_length[length]:
+                if idx not in seen and beats(bound, idx):
+                    consider(idx)
+        
+        return self.alias_keys[best_idx] if best_idx is not None else None
+
+class QueryParser:
+    """Single-pass query parser producing an intent-plus-slots structure.
+    
+    The query is lowercased and tokenized once, and every navigation pattern
+    and intent keyword is matched by one precompiled alternation scanned with
+    finditer, so adding patterns does not add passes over the query.
+    """
+    
+    # Substring keywords for location sub-intents and contextual references
+    INTENT_KEYWORDS = {
+        'hours': ['hour', 'time', 'open'],
+        'facilities': ['facilities', 'available'],
+        'contextual': ['here', 'there']
+    }
+    # Intents whose keywords must be whole words ("where" is not a reference to "here")
+    WHOLE_WORD_INTENTS = {'contextual'}
+    
+    def __init__(self, navigation_patterns: List[str], matcher: LocationMatcher):
+        self.matcher = matcher
+        self.navigation_groups = []  # (group name, number of capture groups)
+        
+        alternatives = []
+        for i, pattern in enumerate(navigation_patterns):
+            name = f'nav{i}'
+            alternatives.append(f'(?P<{name}>{pattern})')
+            self.navigation_groups.append((name, re.compile(pattern).groups))
+        for intent, keywords in self.INTENT_KEYWORDS.items():
+            words = '|'.join(re.escape(k) for k in keywords)
+            if intent in self.WHOLE_WORD_INTENTS:
+                words = rf'\b(?:{words})\b'
+            alternatives.append(f'(?P<{intent}>{words})')
+        
+        self.combined_pattern = re.compile('|'.join(alternatives))
+    
+    def parse(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Parse a query into intent, topic and resolved location slots."""
+        text = query.lower()
+        tokens = text.split()
+        
+        navigation = None
+        flags = set()
+        for match in self.combined_pattern.finditer(text):
+            intent = match.lastgroup
+            if intent in self.INTENT_KEYWORDS:
+                flags.add(intent)
+            elif navigation is None:
+                # Capture groups of a navigation alternative follow its named group
+                group_number = self.combined_pattern.groupindex[intent]
+                size = dict(self.navigation_groups)[intent]
+                navigation = [match.group(group_number + 1 + i) for i in range(size)]
+        
+        slots = {'start': None, 'end': None, 'locations': []}
+        if navigation is not None:
+            potential = [loc.strip() for loc in navigation if loc]
+            if len(potential) >= 2:
+                slots['start'], slots['end'] = potential[0], potential[1]
+            slots['locations'] = [loc for loc in self.matcher.best_matches(potential) if loc]
+        
+        # No navigation slots: fall back to matching individual words
+        if not slots['locations']:
+            for best_match in self.matcher.best_matches(tokens):
+                if best_match and best_match not in slots['locations']:
+                    slots['locations'].append(best_match)
+        
+        # Resolve "here"/"there" to the last location in the conversation
+        if not slots['locations'] and 'contextual' in flags:
+            if context and context.get('last_location'):
+                slots['locations'].append(context['last_location'])
+        
+        if navigation is not None:
+            intent = 'navigation'
+        elif slots['locations']:
+            intent = 'location'
+        else:
+            intent = 'general'
+        
+        if 'hours' in flags:
+            topic = 'hours'
+        elif 'facilities' in flags:
+            topic = 'facilities'
+        else:
+            topic = 'info'
+        
+        return {
+            'text': text,
+            'tokens': tokens,
+            'intent': intent,
+            'topic': topic,
+            'slots': slots
+        }
+    
+    def parse_many(self, queries: List[str], context: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Parse a batch of queries, fuzzy-matching each distinct word only once."""
+        words = {word for query in queries for word in query.lower().split()}
+        self.matcher.best_matches(sorted(words))
+        return [self.parse(query, context) for query in queries]
+
+class CampusKnowledge:
+    """campus_info and everything derived from it, built together and published as one object.
+    
+    Updates build a new instance and swap it in with a single assignment, so
+    a request that reads the assistant's ``knowledge`` once gets a matcher,
+    classifier, retriever, system prompt and cache version that all belong
+    to the same campus_info, even while a reload runs.
+    """
+    
+    def __init__(self, campus_info: Dict[str, Dict[str, Any]], navigation_patterns: List[str], version: int = 0,
+                 classifier: Optional[IntentClassifier] = None):
+        self.campus_info = campus_info
+        # Part of every response cache key, so answers never outlive the campus_info they came from
+        self.version = version
+        # Precomputed fuzzy index over location keys, names and variations
+        self.matcher = LocationMatcher(campus_info)
+        self.parser = QueryParser(navigation_patterns, self.matcher)
+        # Local intent classifier; only low-confidence queries reach the model
+        self.classifier = classifier if classifier is not None else IntentClassifier(campus_info, navigation_patterns)
+        # Retrieval over descriptions and facilities for queries naming no location
+        self.retriever = CampusRetriever(campus_info)
+        self.system_instruction = self._build_system_instruction()
+
+    def _build_system_instruction(self) -> str:
+        """System prompt grounding the model in the campus knowledge base."""
+        facts = '\n'.join(
+            f"- {info['name']} ({info['location']}): {info['description']}. Hours: {info['hours']}. "
+            f"Facilities: {', '.join(info['facilities'])}. Nearby: {', '.join(info['nearby'])}."
+            for info in self.campus_info.values()
+        )
+        return f"""You are a friendly campus navigation assistant.
+Answer only from the campus facts and the verified answer you are given, in short Markdown.
+If the facts do not cover the question, say so and suggest asking about a campus location.
+
+Campus facts:
+{facts}"""
 
 class GeminiAssistant:
-    def __init__(self):
-        """Initialize the Gemini AI assistant with campus knowledge."""
+    def __init__(self, context_store: Optional[ContextStore] = None, client: Optional[Any] = None,
+                 response_cache: Optional[ResponseCache] = None, model_client: Optional[AsyncGeminiClient] = None,
+                 classifier: Optional[IntentClassifier] = None, registry: Optional[LocationRegistry] = None):
+        """Initialize the Gemini AI assistant with campus knowledge.
+        
+        A client stub can be passed in place of the Gemini client to run offline.
+        """
         # Initialize Gemini client with secure API key from environment
-        self.client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
-        self.campus_info = {
-            "flag_post": {
-                "name": "Main Flag Post",
-                "location": "Campus Entrance",
-                "hours": "24/7",
-                "facilities": ["Information Board", "Security Post"],
-                "nearby": ["Entry Gate", "Exit Gate"],
-                "description": "The central flag post marking the campus entrance"
-            },
-            "entry_gate": {
-                "name": "Main Entry Gate",
-                "location": "Campus Perimeter",
-                "hours": "24/7",
-                "facilities": ["Security Booth", "Visitor Registration", "Information Desk"],
-                "nearby": ["Flag Post", "Check Post 1"],
-                "description": "Primary entrance point with security checkpoints"
-            },
-            "exit_gate": {
-                "name": "Exit Gate",
-                "location": "Campus Perimeter",
-                "hours": "24/7",
-                "facilities": ["Security Booth", "Vehicle Check Point"],
-                "nearby": ["Flag Post", "Check Post 2"],
-                "description": "Main exit point from campus"
-            },
-            "check_post_1": {
-                "name": "Check Post 1",
-                "location": "North Campus",
-                "hours": "24/7",
-                "facilities": ["Security Check", "Visitor Registration"],
-                "nearby": ["Entry Gate", "Acad 1"],
-                "description": "Northern security checkpoint"
-            },
-            "check_post_2": {
-                "name": "Check Post 2",
-                "location": "South Campus",
-                "hours": "24/7",
-                "facilities": ["Security Check", "Information Desk"],
-                "nearby": ["Exit Gate", "Acad 2"],
-                "description": "Southern security checkpoint"
-            },
-            "acad_1": {
-                "name": "Academic Block 1",
-                "location": "Academic Zone",
-                "hours": "7:00 AM - 6:00 PM",
-                "facilities": ["Classrooms", "Labs", "Faculty Offices", "Seminar Halls"],
-                "nearby": ["Library", "Faculty Block"],
-                "description": "Primary academic building with modern facilities"
-            },
-            "acad_2": {
-                "name": "Academic Block 2",
-                "location": "Academic Zone",
-                "hours": "7:00 AM - 6:00 PM",
-                "facilities": ["Lecture Halls", "Computer Labs", "Study Areas"],
-                "nearby": ["Library", "Food Court"],
-                "description": "Secondary academic building focusing on specialized courses"
-            },
-            "library": {
-                "name": "Central Library",
-                "location": "Academic Zone",
-                "hours": "8:00 AM - 10:00 PM",
-                "facilities": ["Reading Rooms", "Digital Library", "Group Study Areas", "Research Section"],
-                "nearby": ["Acad 1", "Acad 2"],
-                "description": "Multi-story library with extensive collection and study spaces"
-            },
-            "food_court": {
-                "name": "Campus Food Court",
-                "location": "Student Zone",
-                "hours": "7:30 AM - 9:00 PM",
-                "facilities": ["Multiple Food Stalls", "Seating Area", "Vending Machines"],
-                "nearby": ["Library", "Hostel Block"],
-                "description": "Central dining facility with diverse food options"
-            },
-            "faculty_block": {
-                "name": "Faculty Block",
-                "location": "Academic Zone",
-                "hours": "9:00 AM - 5:00 PM",
-                "facilities": ["Faculty Offices", "Conference Rooms", "Meeting Areas"],
-                "nearby": ["Acad 1", "Library"],
-                "description": "Dedicated building for faculty offices and administrative work"
-            },
-            "hostel_block": {
-                "name": "Student Hostel",
-                "location": "Residential Zone",
-                "hours": "24/7",
-                "facilities": ["Dormitories", "Common Rooms", "Laundry", "Recreation Areas"],
-                "nearby": ["Food Court", "Sports Facilities"],
-                "description": "Student accommodation with modern amenities"
-            },
-            "cricket_ground": {
-                "name": "Cricket Ground",
-                "location": "Sports Zone",
-                "hours": "6:00 AM - 7:00 PM",
-                "facilities": ["Cricket Field", "Practice Nets", "Pavilion"],
-                "nearby": ["Football Ground", "Basketball Court"],
-                "description": "Regulation-size cricket ground with practice facilities"
-            },
-            "basketball_court": {
-                "name": "Basketball Court",
-                "location": "Sports Zone",
-                "hours": "6:00 AM - 7:00 PM",
-                "facilities": ["Basketball Court", "Seating Area", "Floodlights"],
-                "nearby": ["Volleyball Court", "Tennis Court"],
-                "description": "Standard basketball court with spectator seating"
-            },
-            "volleyball_court": {
-                "name": "Volleyball Court",
-                "location": "Sports Zone",
-                "hours": "6:00 AM - 7:00 PM",
-                "facilities": ["Volleyball Court", "Practice Area"],
-                "nearby": ["Basketball Court", "Tennis Court"],
-                "description": "Regulation volleyball court with practice areas"
-            },
-            "tennis_court": {
-                "name": "Tennis Court",
-                "location": "Sports Zone",
-                "hours": "6:00 AM - 7:00 PM",
-                "facilities": ["Tennis Courts", "Practice Wall", "Equipment Room"],
-                "nearby": ["Volleyball Court", "Basketball Court"],
-                "description": "Professional tennis courts with practice facilities"
-            },
-            "football_ground": {
-                "name": "Football Ground",
-                "location": "Sports Zone",
-                "hours": "6:00 AM - 7:00 PM",
-                "facilities": ["Football Field", "Practice Area", "Changing Rooms"],
-                "nearby": ["Cricket Ground", "Rest Area"],
-                "description": "Full-size football field with training areas"
-            },
-            "rest_area": {
-                "name": "Campus Rest Area",
-                "location": "Central Campus",
-                "hours": "24/7",
-                "facilities": ["Benches", "Shade Areas", "Water Points", "Vending Machines"],
-                "nearby": ["Food Court", "Sports Zone"],
-                "description": "Outdoor relaxation areas spread across campus"
-            }
-        }
+        self.client = client if client is not None else create_genai_client()
+        # Async model path with concurrency limit, deadline and circuit breaker
+        self.model = model_client if model_client is not None else AsyncGeminiClient(self.client)
+        # Per-session conversation context (Streamlit session state or in-memory LRU)
+        self.context_store = context_store if context_store is not None else default_context_store()
+        # Campus knowledge base from the shared location registry
+        self.registry = registry if registry is not None else LocationRegistry.default()
         
         # Enhanced navigation patterns
         self.navigation_patterns = [
@@ -167,31 +299,61 @@ class GeminiAssistant:
             r'(?:show|find|give)\s+(?:me\s+)?(?:the\s+)?(?:route|path|way|directions?)\s+(?:from\s+)?([\w\s]+)\s+to\s+([\w\s]+)',
             r'directions?\s+(?:from\s+)?([\w\s]+)\s+to\s+([\w\s]+)'
         ]
+        
+        # Campus knowledge and its indexes, replaced whole on every update;
+        # requests read it once and use that snapshot throughout
+        self.knowledge = CampusKnowledge(self.registry.campus_info(), self.navigation_patterns, classifier=classifier)
+        # Serialises updates; readers never take it
+        self._knowledge_lock = threading.Lock()
+        
+        # Responses cached by parsed intent and locations, keyed by the knowledge version
+        self.response_cache = response_cache if response_cache is not None else ResponseCache()
 
-    def get_response(self, query: str) -> Dict[str, Any]:
+    @property
+    def campus_info(self) -> Dict[str, Dict[str, Any]]:
+        """Current campus knowledge base; read-only, use update_campus_info to change it."""
+        return self.knowledge.campus_info
+
+    def update_campus_info(self, updates: Dict[str, Dict[str, Any]]):
+        """Add or replace campus_info entries, rebuilding derived indexes and dropping cached responses."""
+        with self._knowledge_lock:
+            self._rebuild_indexes({**self.knowledge.campus_info, **updates})
+
+    def reload_campus_info(self, registry: Optional[LocationRegistry] = None):
+        """Replace campus_info with the locations of ``registry`` (the current one by default), e.g. after a POI reload."""
+        with self._knowledge_lock:
+            if registry is not None:
+                self.registry = registry
+            self._rebuild_indexes(self.registry.campus_info())
+
+    def _rebuild_indexes(self, campus_info: Dict[str, Dict[str, Any]]):
+        """Build the knowledge derived from campus_info off to the side, publish it, and drop cached responses."""
+        current = self.knowledge
+        classifier = IntentClassifier(campus_info, self.navigation_patterns, current.classifier.confidence_threshold)
+        self.knowledge = CampusKnowledge(campus_info, self.navigation_patterns, current.version + 1, classifier)
+        # Entries keyed by the old version can no longer be hit
+        self.response_cache.clear()
+
+    def get_response(self, query: str, session_id: Optional[str] = None) -> Dict[str, Any]:
         """Process user query with enhanced NLP."""
         try:
-            query_lower = query.lower()
-            
             # Initialize response with context
             response = self._initialize_response()
             
             # Check conversation context
-            context = self._get_conversation_context()
+            context = self._get_conversation_context(session_id)
             
-            # Extract locations using regex patterns
-            locations = self._extract_locations(query_lower, context)
+            # One knowledge snapshot for the whole request
+            knowledge = self.knowledge
             
-            # Determine query type and handle accordingly
-            if self._is_navigation_query(query_lower):
-                response.update(self._handle_navigation_query(query_lower, locations))
-            elif locations:
-                response.update(self._handle_location_query(locations[0], query_lower))
-            else:
-                response.update(self._handle_general_query(query_lower))
+            # Parse, classify and resolve locations
+            parsed, use_model = self._understand(knowledge, query, context)
+            
+            # Answer from the cache, or handle according to the parsed intent
+            response.update(self._answer(knowledge, parsed, use_model))
             
             # Update conversation context
-            self._update_conversation_context(response)
+            self._update_conversation_context(response, session_id)
             
             return response
 
@@ -199,73 +361,209 @@ class GeminiAssistant:
             print(f"Error processing query: {str(e)}")
             return self._create_error_response(str(e))
 
-    def _extract_locations(self, query: str, context: Dict) -> list:
-        """Extract locations using enhanced fuzzy matching."""
-        locations = []
-        query_normalized = normalize_location_name(query)
-        
-        # Check for locations in navigation patterns
-        for pattern in self.navigation_patterns:
-            matches = re.search(pattern, query.lower())
-            if matches:
-                potential_locations = [loc.strip() for loc in matches.groups() if loc]
-                for pot_loc in potential_locations:
-                    best_match = self._find_best_matching_location(pot_loc)
-                    if best_match:
-                        locations.append(best_match)
-        
-        # If no locations found through patterns, try direct matching
-        if not locations:
-            # Try to find any location mentions with fuzzy matching
-            words = query.lower().split()
-            for word in words:
-                best_match = self._find_best_matching_location(word)
-                if best_match and best_match not in locations:
-                    locations.append(best_match)
-        
-        # Handle contextual references
-        if not locations and ('here' in query or 'there' in query):
-            if context.get('last_location'):
-                locations.append(context['last_location'])
-        
-        return locations
+    def get_responses(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """Answer a batch of queries, e.g. to replay chat logs or pre-warm the cache.
+        
+        Queries are parsed and classified together and never read or update
+        conversation context. Queries that need the model are deduplicated
+        and sent as concurrent calls; failed calls fall back to templates.
+        """
+        knowledge = self.knowledge
+        parsed_queries = knowledge.parser.parse_many(queries)
+        predictions = knowledge.classifier.classify([parsed['text'] for parsed in parsed_queries])
+        
+        plans = []
+        for parsed, prediction in zip(parsed_queries, predictions):
+            parsed, use_model = self._route(parsed, prediction)
+            plans.append((self._retrieve(knowledge, parsed), use_model))
+        
+        answers = []
+        pending = {}  # model cache key -> indexes of queries waiting on it
+        for i, (parsed, use_model) in enumerate(plans):
+            template = self._template_answer(knowledge, parsed)
+            answers.append(template)
+            if self.model is None or not use_model:
+                continue
+            key = self._model_cache_key(knowledge, parsed)
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                answers[i] = dict(cached, locations=list(cached['locations']))
+            else:
+                pending.setdefault(key, []).append(i)
+        
+        if pending:
+            keys = list(pending)
+            prompts = [self._model_prompt(plans[pending[key][0]][0], answers[pending[key][0]]) for key in keys]
+            texts = self.model.run(self.model.generate_many(prompts, knowledge.system_instruction))
+            for key, text in zip(keys, texts):
+                if not text:
+                    continue
+                answer = dict(answers[pending[key][0]], text=text, source="model")
+                self.response_cache.set(key, answer)
+                for i in pending[key]:
+                    answers[i] = dict(answer, locations=list(answer['locations']))
+        
+        responses = []
+        for answer in answers:
+            response = self._initialize_response()
+            response.update(answer)
+            responses.append(response)
+        return responses
 
-    def _find_best_matching_location(self, query_term: str, threshold: float = 0.6) -> Optional[str]:
-        """Find best matching location using fuzzy matching."""
-        best_match = None
-        highest_score = threshold
-        
-        query_normalized = normalize_location_name(query_term)
-        
-        for loc_key, loc_info in self.campus_info.items():
-            # Check original location key
-            score = get_string_similarity(query_normalized, normalize_location_name(loc_key))
-            if score > highest_score:
-                highest_score = score
-                best_match = loc_key
+    def _understand(self, knowledge: CampusKnowledge, query: str,
+                    context: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Parse a query, apply the local classifier and retrieve places for general queries."""
+        # Parse intent and location slots in a single pass
+        parsed = knowledge.parser.parse(query, context)
+        
+        # Confident local classification is answered without the model
+        parsed, use_model = self._route(parsed, knowledge.classifier.classify([parsed['text']])[0])
+        
+        return self._retrieve(knowledge, parsed), use_model
+
+    def _retrieve(self, knowledge: CampusKnowledge, parsed: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a general query into a search over location descriptions when anything matches."""
+        if parsed['intent'] != 'general':
+            return parsed
+        matches = knowledge.retriever.search(parsed['text'])
+        if not matches:
+            return parsed
+        return dict(parsed, intent='search', slots=dict(parsed['slots'], locations=[key for key, _ in matches]))
+
+    def _route(self, parsed: Dict[str, Any], prediction: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Apply the classifier's prediction to a parse.
+        
+        Returns the parse to answer and whether it needs the model: confident
+        predictions whose slots the templates can fill are answered locally.
+        """
+        if not prediction['confident']:
+            return parsed, True
+        
+        intent = prediction['intent']
+        locations = parsed['slots']['locations']
+        if intent == 'navigation':
+            return parsed, not (parsed['intent'] == 'navigation' and len(locations) >= 2)
+        if intent in ('hours', 'facilities', 'location'):
+            if not locations:
+                return parsed, True
+            topic = 'info' if intent == 'location' else intent
+            return dict(parsed, intent='location', topic=topic), False
+        return dict(parsed, intent='general'), False
+
+    def _answer(self, knowledge: CampusKnowledge, parsed: Dict[str, Any], use_model: bool = True) -> Dict[str, Any]:
+        """Answer a parsed query with the model, falling back to the template answer."""
+        template = self._template_answer(knowledge, parsed)
+        if self.model is None or not use_model:
+            return template
+        
+        key = self._model_cache_key(knowledge, parsed)
+        answer = self.response_cache.get(key)
+        if answer is None:
+            text = self.model.generate_sync(self._model_prompt(parsed, template), knowledge.system_instruction)
+            if not text:
+                # Slow, failing or circuit open: serve the template answer
+                return template
+            answer = dict(template, text=text, source="model")
+            self.response_cache.set(key, answer)
+        
+        return dict(answer, locations=list(answer['locations']))
+
+    def stream_response(self, query: str, session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Process a query, yielding answer text as it is generated.
+        
+        Yields ``{'type': 'chunk', 'text': ...}`` events followed by one
+        ``{'type': 'done', 'response': ...}`` event with the full response.
+        Template and cached answers go out as a single immediate chunk.
+        """
+        try:
+            response = self._initialize_response()
+            context = self._get_conversation_context(session_id)
+            knowledge = self.knowledge
+            parsed, use_model = self._understand(knowledge, query, context)
+            template = self._template_answer(knowledge, parsed)
             
-            # Check location name
-            score = get_string_similarity(query_normalized, normalize_location_name(loc_info['name']))
-            if score > highest_score:
-                highest_score = score
-                best_match = loc_key
+            answer = None
+            streamed = False
+            if self.model is not None and use_model:
+                key = self._model_cache_key(knowledge, parsed)
+                answer = self.response_cache.get(key)
+                if answer is None:
+                    parts = []
+                    try:
+                        for text in self.model.stream_sync(self._model_prompt(parsed, template), knowledge.system_instruction):
+                            parts.append(text)
+                            yield {'type': 'chunk', 'text': text}
+                    except ModelStreamError:
+                        # Interrupted part way: finish with the template answer, do not cache
+                        parts.append('\n\n' + template['text'])
+                        yield {'type': 'chunk', 'text': parts[-1]}
+                    else:
+                        if parts:
+                            self.response_cache.set(key, dict(template, text=''.join(parts), source="model"))
+                    if parts:
+                        answer = dict(template, text=''.join(parts), source="model")
+                        streamed = True
             
-            # Check common variations
-            variations = [
-                loc_key.replace('_', ' '),
-                loc_info['name'].lower(),
-                loc_key.replace('block', '').strip(),
-                loc_key.replace('court', '').strip(),
-                loc_key.replace('ground', '').strip()
-            ]
+            if answer is None:
+                answer = template
+            if not streamed:
+                yield {'type': 'chunk', 'text': answer['text']}
             
-            for variation in variations:
-                score = get_string_similarity(query_normalized, normalize_location_name(variation))
-                if score > highest_score:
-                    highest_score = score
-                    best_match = loc_key
+            response.update(dict(answer, locations=list(answer['locations'])))
+            self._update_conversation_context(response, session_id)
+            yield {'type': 'done', 'response': response}
+
+        except Exception as e:
+            print(f"Error processing query: {str(e)}")
+            error_response = self._create_error_response(str(e))
+            yield {'type': 'chunk', 'text': error_response['text']}
+            yield {'type': 'done', 'response': error_response}
+
+    def _template_answer(self, knowledge: CampusKnowledge, parsed: Dict[str, Any]) -> Dict[str, Any]:
+        """Rule-based answer, reusing cached answers for the same intent and locations."""
+        key = self._cache_key(knowledge, parsed)
+        answer = self.response_cache.get(key)
+        if answer is None:
+            campus_info = knowledge.campus_info
+            if parsed['intent'] == 'navigation':
+                answer = self._handle_navigation_query(campus_info, parsed)
+            elif parsed['intent'] == 'location':
+                answer = self._handle_location_query(campus_info, parsed)
+            elif parsed['intent'] == 'search':
+                answer = self._handle_search_query(campus_info, parsed)
+            else:
+                answer = self._handle_general_query(campus_info, parsed)
+            answer['source'] = "template"
+            self.response_cache.set(key, answer)
         
-        return best_match
+        # Copy so callers and context updates never mutate the cached entry
+        return dict(answer, locations=list(answer['locations']))
+
+    def _cache_key(self, knowledge: CampusKnowledge, parsed: Dict[str, Any]) -> tuple:
+        """Semantic cache key: knowledge version, intent, topic (for location queries) and resolved locations."""
+        topic = parsed['topic'] if parsed['intent'] == 'location' else None
+        return (knowledge.version, parsed['intent'], topic, tuple(parsed['slots']['locations']))
+
+    def _model_cache_key(self, knowledge: CampusKnowledge, parsed: Dict[str, Any]) -> tuple:
+        """Model answers depend on the exact question, so their key includes it."""
+        return self._cache_key(knowledge, parsed) + (self._question_key(parsed),)
+
+    def _question_key(self, parsed: Dict[str, Any]) -> str:
+        """Question text with punctuation and spacing normalized away."""
+        return ' '.join(normalize_location_name(token) for token in parsed['tokens'])
+
+    def _model_prompt(self, parsed: Dict[str, Any], template: Dict[str, Any]) -> str:
+        """Prompt asking the model to answer the question from the template answer."""
+        return f"""Question: {parsed['text']}
+
+Verified answer from campus records:
+{template['text']}
+
+Answer the question directly using the verified answer and the campus facts."""
+
+    def _find_best_matching_location(self, query_term: str, threshold: float = 0.6) -> Optional[str]:
+        """Find best matching location using the precomputed fuzzy index."""
+        return self.knowledge.matcher.best_match(query_term, threshold)
 
     def _initialize_response(self) -> Dict[str, Any]:
         """Initialize response with metadata."""
@@ -279,37 +577,29 @@ class GeminiAssistant:
             "query_understood": False
         }
 
-    def _get_conversation_context(self) -> Dict[str, Any]:
-        """Get conversation context from session state."""
-        if 'conversation_context' not in st.session_state:
-            st.session_state.conversation_context = {
-                'last_location': None,
-                'last_query_type': None,
-                'conversation_history': []
-            }
-        return st.session_state.conversation_context
+    def _get_conversation_context(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get conversation context for a session from the context store."""
+        return self.context_store.get(session_id)
 
-    def _update_conversation_context(self, response: Dict[str, Any]):
+    def _update_conversation_context(self, response: Dict[str, Any], session_id: Optional[str] = None):
         """Update conversation context with current response."""
-        context = self._get_conversation_context()
+        context = self._get_conversation_context(session_id)
         if response['locations']:
             context['last_location'] = response['locations'][-1]
+        # History is a bounded ring buffer, oldest entries drop off automatically
         context['conversation_history'].append({
             'timestamp': response['timestamp'],
             'query_understood': response['query_understood']
         })
-        st.session_state.conversation_context = context
-
-    def _is_navigation_query(self, query: str) -> bool:
-        """Enhanced navigation query detection."""
-        return any(re.search(pattern, query) for pattern in self.navigation_patterns)
+        self.context_store.save(session_id, context)
 
-    def _handle_navigation_query(self, query: str, locations: list) -> Dict[str, Any]:
+    def _handle_navigation_query(self, campus_info: Dict[str, Dict[str, Any]], parsed: Dict[str, Any]) -> Dict[str, Any]:
         """Handle navigation queries with enhanced location matching."""
+        locations = parsed['slots']['locations']
         if len(locations) >= 2:
             start_loc, end_loc = locations[0], locations[1]
-            start_info = self.campus_info[start_loc]
-            end_info = self.campus_info[end_loc]
+            start_info = campus_info[start_loc]
+            end_info = campus_info[end_loc]
             
             return {
                 "text": f"""### 🗺️ Navigation Instructions
@@ -341,16 +631,17 @@ Please specify both start and destination locations. For example:
             "locations": []
         }
 
-    def _handle_location_query(self, location: str, query: str) -> Dict[str, Any]:
+    def _handle_location_query(self, campus_info: Dict[str, Dict[str, Any]], parsed: Dict[str, Any]) -> Dict[str, Any]:
         """Handle queries about specific locations."""
-        info = self.campus_info[location]
+        location = parsed['slots']['locations'][0]
+        info = campus_info[location]
         
-        if "hour" in query or "time" in query or "open" in query:
+        if parsed['topic'] == 'hours':
             response_text = f"""### ⏰ {info['name']} Hours
 - **Operating Hours:** {info['hours']}
 - **Location:** {info['location']}"""
         
-        elif "facilities" in query or "available" in query:
+        elif parsed['topic'] == 'facilities':
             response_text = f"""### 🏢 {info['name']} Facilities
 - **Available Facilities:**
 {chr(10).join(['  • ' + f for f in info['facilities']])}
@@ -371,7 +662,25 @@ Please specify both start and destination locations. For example:
             "locations": [location]
         }
 
-    def _handle_general_query(self, query: str) -> Dict[str, Any]:
+    def _handle_search_query(self, campus_info: Dict[str, Dict[str, Any]], parsed: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle descriptive queries answered by retrieval over location details."""
+        locations = parsed['slots']['locations']
+        matches = [
+            f"- **{campus_info[loc]['name']}** ({campus_info[loc]['location']}): "
+            f"{campus_info[loc]['description']}. Hours: {campus_info[loc]['hours']}"
+            for loc in locations
+        ]
+        
+        return {
+            "text": """### 🔎 Places That Match
+{}
+
+Ask "How do I get from X to Y?" for a route to any of them.""".format('\n'.join(matches)),
+            "show_route": False,
+            "locations": locations
+        }
+
+    def _handle_general_query(self, campus_info: Dict[str, Dict[str, Any]], parsed: Dict[str, Any]) -> Dict[str, Any]:
         """Handle general queries about campus."""
         return {
             "text": """### 🎓 Campus Navigation Help
@@ -382,7 +691,7 @@ I can help you with:
 4. **Hours:** Ask "When is X open?"
 
 **Available Locations:**
-{}""".format('\n'.join([f"- {info['name']}" for info in self.campus_info.values()])),
+{}""".format('\n'.join([f"- {info['name']}" for info in campus_info.values()])),
             "show_route": False,
             "locations": []
         }
@@ -0,0 +1,147 @@
+import itertools
+import random
+import re
+from typing import Dict, Any, List
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+
+# Predictions below this probability are escalated to the model
+CONFIDENCE_THRESHOLD = 0.7
+
+INTENT_TEMPLATES = {
+    'navigation': [
+        "how do i get from {a} to {b}",
+        "how can i get from the {a} to the {b}",
+        "how to go from {a} to {b}",
+        "walk from {a} to {b}",
+        "show me the route from {a} to {b}",
+        "find the path from {a} to {b}",
+        "give me the way from the {a} to the {b}",
+        "show me directions from {a} to {b}",
+        "directions from {a} to {b}",
+        "direction from the {a} to {b}"
+    ],
+    'hours': [
+        "when is the {a} open",
+        "what time does {a} open",
+        "what time does the {a} close",
+        "{a} hours",
+        "opening hours of {a}",
+        "is the {a} open now",
+        "when does {a} close",
+        "till what time is {a} open",
+        "timings of the {a}"
+    ],
+    'facilities': [
+        "what facilities are in the {a}",
+        "what facilities does {a} have",
+        "what is available at {a}",
+        "amenities at the {a}",
+        "does the {a} have {f}",
+        "is there {f} in the {a}",
+        "{a} facilities",
+        "what can i use at {a}"
+    ],
+    'location': [
+        "tell me about the {a}",
+        "what is the {a}",
+        "where is {a}",
+        "{a}",
+        "info on {a}",
+        "describe the {a}",
+        "what is near the {a}",
+        "details about {a}"
+    ],
+    'general': [
+        "hello",
+        "hi there",
+        "hey",
+        "help",
+        "what can you do",
+        "who are you",
+        "thanks",
+        "thank you so much",
+        "good morning",
+        "how are you",
+        "what is this app",
+        "what places are on campus",
+        "list all locations",
+        "i need some help",
+        "can you help me",
+        "what questions can i ask",
+        "tell me a joke",
+        "what is the weather today",
+        "bye"
+    ]
+}
+
+
+class IntentClassifier:
+    """Small local intent classifier answering most chat queries without a model call.
+
+    Trained at startup on synthetic queries generated from campus_info names
+    and the intent templates above; navigation examples are kept only if the
+    assistant's navigation_patterns match them, so both stages agree.
+    Character n-gram TF-IDF features make it robust to typos, and inference
+    is vectorized over batches of queries.
+    """
+
+    def __init__(self, campus_info: Dict[str, Dict[str, Any]], navigation_patterns: List[str],
+                 confidence_threshold: float = CONFIDENCE_THRESHOLD, seed: int = 0):
+        self.confidence_threshold = confidence_threshold
+        texts, labels = self._training_examples(campus_info, navigation_patterns, random.Random(seed))
+        if len(set(labels)) < 2:
+            # A campus without locations only has general examples; every query is escalated
+            self.model = None
+            self.classes = sorted(set(labels))
+            return
+        self.model = make_pipeline(
+            TfidfVectorizer(analyzer='char_wb', ngram_range=(2, 4), sublinear_tf=True),
+            LogisticRegression(max_iter=1000, C=10.0)
+        )
+        self.model.fit(texts, labels)
+        self.classes = list(self.model.classes_)
+
+    def classify(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """Predict intent and confidence for a batch of queries in one vectorized pass."""
+        if not queries:
+            return []
+        if self.model is None:
+            return [{'intent': 'general', 'confidence': 0.0, 'confident': False} for _ in queries]
+        probabilities = self.model.predict_proba([query.lower() for query in queries])
+        predictions = []
+        for row in probabilities:
+            best = row.argmax()
+            predictions.append({
+                'intent': self.classes[best],
+                'confidence': float(row[best]),
+                'confident': bool(row[best] >= self.confidence_threshold)
+            })
+        return predictions
+
+    def _training_examples(self, campus_info: Dict[str, Dict[str, Any]], navigation_patterns: List[str],
+                           rng: random.Random) -> tuple:
+        """Fill the intent templates with campus location names and facilities."""
+        names = []
+        for loc_key, loc_info in campus_info.items():
+            names.extend(dict.fromkeys([loc_key.replace('_', ' '), loc_info['name'].lower()]))
+        pairs = list(itertools.permutations(names, 2))
+        # A campus listing no facilities still needs something to fill {f} with
+        facilities = sorted({f.lower() for info in campus_info.values() for f in info['facilities']}) or ["facilities"]
+        compiled = [re.compile(pattern) for pattern in navigation_patterns]
+
+        texts, labels = [], []
+        for intent, templates in INTENT_TEMPLATES.items():
+            for template in templates:
+                if '{b}' in template:
+                    examples = [template.format(a=a, b=b) for a, b in rng.sample(pairs, min(len(pairs), 40))]
+                    examples = [e for e in examples if any(p.search(e) for p in compiled)]
+                elif '{a}' in template:
+                    examples = [template.format(a=name, f=rng.choice(facilities)) for name in names]
+                else:
+                    examples = [template] * 5
+                texts.extend(examples)
+                labels.extend([intent] * len(examples))
+        return texts, labels
@@ -0,0 +1,292 @@
+import argparse
+import asyncio
+import json
+import logging
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from werkzeug.serving import make_server
+
+from benchmark import PERCENTILES
+from conversation_store import InMemoryContextStore
+from gemini_client import AsyncGeminiClient
+from gemini_integration import GeminiAssistant
+from pathfinding import ALGORITHMS
+
+# Default share of each endpoint in the generated traffic
+DEFAULT_MIX = {"find_path": 0.6, "ask_gemini": 0.35, "compare": 0.05}
+
+# Stub model: seconds per answer, split evenly across the streamed chunks
+STUB_LATENCY_SECONDS = 0.3
+STUB_CHUNKS = 4
+
+CHAT_QUERIES = [
+    "how do i get from the library to the food court",
+    "directions from entry gate to hostel block",
+    "when is the library open",
+    "what facilities does the food court have",
+    "tell me about acad 1",
+    "where can i play cricket",
+    "somewhere quiet to study late",
+    "hello",
+    "what can you do",
+    "is there parking for visitors",
+    "where do i report a lost id card",
+    "which block has the physics lab"
+]
+
+# Common/combined log format request line: "GET /path HTTP/1.1"
+LOG_REQUEST = re.compile(r'"(GET|POST) (\S+) HTTP/[\d.]+"')
+
+
+class StubGeminiClient:
+    """Offline stand-in for genai.Client that answers after a fixed delay.
+
+    Only the async generate_content/generate_content_stream calls the
+    assistant makes are provided, so the real AsyncGeminiClient path
+    (semaphore, deadline, breaker) is exercised without a network.
+    """
+
+    def __init__(self, latency: float = STUB_LATENCY_SECONDS, chunks: int = STUB_CHUNKS):
+        self.latency = latency
+        self.chunks = chunks
+        self.aio = SimpleNamespace(models=self)
+
+    async def generate_content(self, model: str, contents: str, config: Any = None) -> SimpleNamespace:
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(text=f"Stub answer to: {contents[-80:]}")
+
+    async def generate_content_stream(self, model: str, contents: str, config: Any = None):
+        async def chunks():
+            for i in range(self.chunks):
+                await asyncio.sleep(self.latency / self.chunks)
+                yield SimpleNamespace(text=f"Stub chunk {i + 1}. ")
+        return chunks()
+
+
+def stub_assistant(registry, latency: float = STUB_LATENCY_SECONDS) -> GeminiAssistant:
+    """Assistant wired to the stub client, with its own in-memory session store."""
+    client = StubGeminiClient(latency)
+    return GeminiAssistant(context_store=InMemoryContextStore(), client=client,
+                           model_client=AsyncGeminiClient(client), registry=registry)
+
+
+class RequestFactory:
+    """Builds (endpoint, method, path, body) requests for the load mix."""
+
+    def __init__(self, pois: List[str], seed: int = 0):
+        self.pois = pois
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def build(self, endpoint: str, path: Optional[str] = None) -> Tuple[str, str, str, Optional[Dict[str, Any]]]:
+        with self.lock:
+            start, end = self.rng.sample(self.pois, 2)
+            algorithm = self.rng.choice(ALGORITHMS)
+            query = self.rng.choice(CHAT_QUERIES)
+            session = f"load-{self.rng.randrange(1000)}"
+
+        if endpoint == "find_path":
+            return endpoint, "POST", "/find_path", {"start": start, "end": end, "algorithm": algorithm}
+        if endpoint == "find_path_stream":
+            query_string = urllib.parse.urlencode({"start": start, "end": end, "algorithm": algorithm})
+            return endpoint, "GET", path or f"/find_path/stream?{query_string}", None
+        if endpoint == "ask_gemini":
+            return endpoint, "POST", "/ask_gemini", {"query": query, "session_id": session}
+        return endpoint, "GET", path or f"/{endpoint}", None
+
+
+def endpoint_of(path: str) -> str:
+    """Endpoint label of a request path, e.g. /find_path/stream?x=1 -> find_path_stream."""
+    return path.split("?", 1)[0].strip("/").replace("/", "_") or "home"
+
+
+def mix_requests(factory: RequestFactory, mix: Dict[str, float], count: int, seed: int = 0) -> List[Tuple]:
+    """Draw count requests from an endpoint mix."""
+    rng = random.Random(seed)
+    endpoints = rng.choices(list(mix), weights=list(mix.values()), k=count)
+    return [factory.build(endpoint) for endpoint in endpoints]
+
+
+def log_requests(factory: RequestFactory, log_path: str) -> List[Tuple]:
+    """Requests replayed from an access log.
+
+    Lines are either JSON ({"method", "path", "body"}) or common log format;
+    access logs carry no POST bodies, so those are generated for the endpoint.
+    """
+    requests = []
+    with open(log_path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("{"):
+                entry = json.loads(line)
+                method, path, body = entry.get("method", "GET"), entry["path"], entry.get("body")
+            else:
+                match = LOG_REQUEST.search(line)
+                if not match:
+                    continue
+                method, path, body = match.group(1), match.group(2), None
+            endpoint = endpoint_of(path)
+            if body is None and method == "POST":
+                requests.append(factory.build(endpoint))
+            else:
+                requests.append((endpoint, method, path, body))
+    return requests
+
+
+class TestClientTransport:
+    """Sends requests in-process through the Flask test client."""
+
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def send(self, method: str, path: str, body: Optional[Dict[str, Any]]) -> int:
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body)
+        response.get_data()  # drain streamed responses
+        return response.status_code
+
+
+class HTTPTransport:
+    """Sends requests over HTTP to the app served by a local threaded server."""
+
+    def __init__(self, app):
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def send(self, method: str, path: str, body: Optional[Dict[str, Any]]) -> int:
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    def close(self):
+        self.server.shutdown()
+
+
+def run_load(transport, requests: List[Tuple], concurrency: int) -> Dict[str, Any]:
+    """Replay requests across concurrency worker threads and time each one."""
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    position = iter(range(len(requests)))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                index = next(position, None)
+            if index is None:
+                return
+            endpoint, method, path, body = requests[index]
+            began = time.perf_counter()
+            try:
+                status = transport.send(method, path, body)
+            except Exception:
+                status = 0
+            elapsed = (time.perf_counter() - began) * 1000
+            with lock:
+                samples[endpoint].append(elapsed)
+                if status >= 400 or status == 0:
+                    errors[endpoint] += 1
+
+    began = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - began
+
+    rows = []
+    for endpoint, latencies in sorted(samples.items()):
+        rows.append(summary_row(endpoint, latencies, errors[endpoint], wall, concurrency))
+    rows.append(summary_row("all", [x for v in samples.values() for x in v], sum(errors.values()), wall, concurrency))
+    return {"concurrency": concurrency, "seconds": wall, "endpoints": rows}
+
+
+def summary_row(endpoint: str, latencies: List[float], errors: int, wall: float, concurrency: int) -> Dict[str, Any]:
+    """Throughput and latency percentiles for one endpoint."""
+    row = {
+        "concurrency": concurrency,
+        "endpoint": endpoint,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 2)
+    }
+    for p, value in zip(PERCENTILES, np.percentile(latencies, PERCENTILES)):
+        row[f"p{p}_ms"] = round(float(value), 2)
+    row["max_ms"] = round(max(latencies), 2)
+    return row
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse "find_path=6,ask_gemini=3,compare=1" into endpoint weights."""
+    mix = {}
+    for part in text.split(","):
+        endpoint, _, weight = part.partition("=")
+        mix[endpoint.strip()] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Flask web app with a stubbed Gemini client.")
+    parser.add_argument("--mode", choices=["client", "http"], default="client",
+                        help="Flask test client in-process, or HTTP against a local threaded server")
+    parser.add_argument("--concurrency", default="1,4,16",
+                        help="Comma-separated concurrency levels to step through")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--mix", help="Endpoint weights, e.g. find_path=6,ask_gemini=3,compare=1")
+    parser.add_argument("--log", help="Replay an access log instead of generating a mix")
+    parser.add_argument("--stub-latency", type=float, default=STUB_LATENCY_SECONDS,
+                        help="Seconds the stub model takes per answer")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    import web_app
+
+    web_app.assistants[web_app.DEFAULT_MAP] = stub_assistant(web_app.maps.registry(web_app.DEFAULT_MAP), args.stub_latency)
+    factory = RequestFactory(list(web_app.maps.pathfinder(web_app.DEFAULT_MAP).POIS), args.seed)
+    if args.log:
+        requests = log_requests(factory, args.log)
+    else:
+        requests = mix_requests(factory, parse_mix(args.mix) if args.mix else DEFAULT_MIX, args.requests, args.seed)
+
+    transport = HTTPTransport(web_app.app) if args.mode == "http" else TestClientTransport(web_app.app)
+    results = []
+    try:
+        for level in (int(c) for c in args.concurrency.split(",")):
+            results.append(run_load(transport, requests, level))
+            print(pd.DataFrame(results[-1]["endpoints"]).to_string(index=False), end="\n\n")
+    finally:
+        if isinstance(transport, HTTPTransport):
+            transport.close()
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
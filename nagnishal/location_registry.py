@@ -0,0 +1,464 @@
+import copy
+import json
+import os
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+import pandas as pd
+
+# POI spreadsheet shipped with the app; web_app/app.py read POI_FILE instead when it is set
+DEFAULT_POI_FILE = "attached_assets/Book1_1758707719037.xlsx"
+
+# Accepted POI file headers (normalized) for each field; list cells are split on LIST_SEPARATOR
+NAME_COLUMNS = ("name", "places", "place", "location")
+LATITUDE_COLUMNS = ("latitude", "lat")
+LONGITUDE_COLUMNS = ("longitude", "lon", "lng")
+LIST_COLUMNS = ("facilities", "nearby", "aliases")
+LIST_SEPARATOR = ";"
+
+# Spreadsheet coordinates such as "13.22169° N" or "77.75495°E"
+COORDINATE = re.compile(r'(-?\d+(?:\.\d+)?)\s*°?\s*([NSEW])?', re.IGNORECASE)
+
+# Built-in campus locations: display name and coordinates (lat, lon) used by the
+# pathfinder, category, and the assistant's knowledge base entry
+LOCATIONS = [
+    {
+        "id": "flag_post",
+        "name": "Flag post",
+        "coordinates": (13.22169, 77.75495),
+        "category": "Other",
+        "info": {
+            "name": "Main Flag Post",
+            "location": "Campus Entrance",
+            "hours": "24/7",
+            "facilities": ["Information Board", "Security Post"],
+            "nearby": ["Entry Gate", "Exit Gate"],
+            "description": "The central flag post marking the campus entrance"
+        }
+    },
+    {
+        "id": "entry_gate",
+        "name": "Entry gate",
+        "coordinates": (13.22020, 77.75417),
+        "category": "Security",
+        "info": {
+            "name": "Main Entry Gate",
+            "location": "Campus Perimeter",
+            "hours": "24/7",
+            "facilities": ["Security Booth", "Visitor Registration", "Information Desk"],
+            "nearby": ["Flag Post", "Check Post 1"],
+            "description": "Primary entrance point with security checkpoints"
+        }
+    },
+    {
+        "id": "exit_gate",
+        "name": "Exit gate",
+        "coordinates": (13.22017, 77.75508),
+        "category": "Security",
+        "info": {
+            "name": "Exit Gate",
+            "location": "Campus Perimeter",
+            "hours": "24/7",
+            "facilities": ["Security Booth", "Vehicle Check Point"],
+            "nearby": ["Flag Post", "Check Post 2"],
+            "description": "Main exit point from campus"
+        }
+    },
+    {
+        "id": "check_post_1",
+        "name": "Check post 1",
+        "coordinates": (13.22140, 77.75507),
+        "category": "Security",
+        "info": {
+            "name": "Check Post 1",
+            "location": "North Campus",
+            "hours": "24/7",
+            "facilities": ["Security Check", "Visitor Registration"],
+            "nearby": ["Entry Gate", "Acad 1"],
+            "description": "Northern security checkpoint"
+        }
+    },
+    {
+        "id": "check_post_2",
+        "name": "Check post 2",
+        "coordinates": (13.22128, 77.75528),
+        "category": "Security",
+        "info": {
+            "name": "Check Post 2",
+            "location": "South Campus",
+            "hours": "24/7",
+            "facilities": ["Security Check", "Information Desk"],
+            "nearby": ["Exit Gate", "Acad 2"],
+            "description": "Southern security checkpoint"
+        }
+    },
+    {
+        "id": "acad_1",
+        "name": "Acad 1",
+        "coordinates": (13.22218, 77.75537),
+        "category": "Academic",
+        "info": {
+            "name": "Academic Block 1",
+            "location": "Academic Zone",
+            "hours": "7:00 AM - 6:00 PM",
+            "facilities": ["Classrooms", "Labs", "Faculty Offices", "Seminar Halls"],
+            "nearby": ["Library", "Faculty Block"],
+            "description": "Primary academic building with modern facilities"
+        }
+    },
+    {
+        "id": "acad_2",
+        "name": "Acad 2",
+        "coordinates": (13.22339, 77.75595),
+        "category": "Academic",
+        "info": {
+            "name": "Academic Block 2",
+            "location": "Academic Zone",
+            "hours": "7:00 AM - 6:00 PM",
+            "facilities": ["Lecture Halls", "Computer Labs", "Study Areas"],
+            "nearby": ["Library", "Food Court"],
+            "description": "Secondary academic building focusing on specialized courses"
+        }
+    },
+    {
+        "id": "library",
+        "name": "Library",
+        "coordinates": (13.22199, 77.75540),
+        "category": "Academic",
+        "info": {
+            "name": "Central Library",
+            "location": "Academic Zone",
+            "hours": "8:00 AM - 10:00 PM",
+            "facilities": ["Reading Rooms", "Digital Library", "Group Study Areas", "Research Section"],
+            "nearby": ["Acad 1", "Acad 2"],
+            "description": "Multi-story library with extensive collection and study spaces"
+        }
+    },
+    {
+        "id": "food_court",
+        "name": "Food Court",
+        "coordinates": (13.22488, 77.75716),
+        "category": "Facility",
+        "info": {
+            "name": "Campus Food Court",
+            "location": "Student Zone",
+            "hours": "7:30 AM - 9:00 PM",
+            "facilities": ["Multiple Food Stalls", "Seating Area", "Vending Machines"],
+            "nearby": ["Library", "Hostel Block"],
+            "description": "Central dining facility with diverse food options"
+        }
+    },
+    {
+        "id": "faculty_block",
+        "name": "Faculty Block",
+        "coordinates": (13.22359, 77.75726),
+        "category": "Facility",
+        "info": {
+            "name": "Faculty Block",
+            "location": "Academic Zone",
+            "hours": "9:00 AM - 5:00 PM",
+            "facilities": ["Faculty Offices", "Conference Rooms", "Meeting Areas"],
+            "nearby": ["Acad 1", "Library"],
+            "description": "Dedicated building for faculty offices and administrative work"
+        }
+    },
+    {
+        "id": "hostel_block",
+        "name": "Hostel Block",
+        "coordinates": (13.22458, 77.75886),
+        "category": "Facility",
+        "info": {
+            "name": "Student Hostel",
+            "location": "Residential Zone",
+            "hours": "24/7",
+            "facilities": ["Dormitories", "Common Rooms", "Laundry", "Recreation Areas"],
+            "nearby": ["Food Court", "Sports Facilities"],
+            "description": "Student accommodation with modern amenities"
+        }
+    },
+    {
+        "id": "cricket_ground",
+        "name": "Cricket Ground",
+        "coordinates": (13.22898, 77.75718),
+        "category": "Sports",
+        "info": {
+            "name": "Cricket Ground",
+            "location": "Sports Zone",
+            "hours": "6:00 AM - 7:00 PM",
+            "facilities": ["Cricket Field", "Practice Nets", "Pavilion"],
+            "nearby": ["Football Ground", "Basketball Court"],
+            "description": "Regulation-size cricket ground with practice facilities"
+        }
+    },
+    {
+        "id": "basketball_court",
+        "name": "Basket Ball",
+        "coordinates": (13.22883, 77.75813),
+        "category": "Sports",
+        "info": {
+            "name": "Basketball Court",
+            "location": "Sports Zone",
+            "hours": "6:00 AM - 7:00 PM",
+            "facilities": ["Basketball Court", "Seating Area", "Floodlights"],
+            "nearby": ["Volleyball Court", "Tennis Court"],
+            "description": "Standard basketball court with spectator seating"
+        }
+    },
+    {
+        "id": "volleyball_court",
+        "name": "Volley Ball",
+        "coordinates": (13.22869, 77.75856),
+        "category": "Sports",
+        "info": {
+            "name": "Volleyball Court",
+            "location": "Sports Zone",
+            "hours": "6:00 AM - 7:00 PM",
+            "facilities": ["Volleyball Court", "Practice Area"],
+            "nearby": ["Basketball Court", "Tennis Court"],
+            "description": "Regulation volleyball court with practice areas"
+        }
+    },
+    {
+        "id": "tennis_court",
+        "name": "Tennis Ball",
+        "coordinates": (13.22840, 77.75837),
+        "category": "Sports",
+        "info": {
+            "name": "Tennis Court",
+            "location": "Sports Zone",
+            "hours": "6:00 AM - 7:00 PM",
+            "facilities": ["Tennis Courts", "Practice Wall", "Equipment Room"],
+            "nearby": ["Volleyball Court", "Basketball Court"],
+            "description": "Professional tennis courts with practice facilities"
+        }
+    },
+    {
+        "id": "football_ground",
+        "name": "Foot Ball",
+        "coordinates": (13.22769, 77.75642),
+        "category": "Sports",
+        "info": {
+            "name": "Football Ground",
+            "location": "Sports Zone",
+            "hours": "6:00 AM - 7:00 PM",
+            "facilities": ["Football Field", "Practice Area", "Changing Rooms"],
+            "nearby": ["Cricket Ground", "Rest Area"],
+            "description": "Full-size football field with training areas"
+        }
+    },
+    {
+        "id": "rest_area",
+        "name": "Rest Area",
+        "coordinates": (13.22834, 77.75775),
+        "category": "Other",
+        "info": {
+            "name": "Campus Rest Area",
+            "location": "Central Campus",
+            "hours": "24/7",
+            "facilities": ["Benches", "Shade Areas", "Water Points", "Vending Machines"],
+            "nearby": ["Food Court", "Sports Zone"],
+            "description": "Outdoor relaxation areas spread across campus"
+        }
+    }
+]
+
+
+def normalize_location_name(name: str) -> str:
+    """Normalize location name for better matching."""
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
+def parse_coordinate(value: Any) -> float:
+    """Decimal degrees from a number or a string like "13.22169° N" (S and W are negative)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = COORDINATE.search(str(value))
+    if not match:
+        raise ValueError(f"Invalid coordinate: {value!r}")
+    degrees = float(match.group(1))
+    return -degrees if (match.group(2) or "").upper() in ("S", "W") else degrees
+
+
+def clean_place_name(name: Any) -> str:
+    """Display name from a spreadsheet cell, dropping trailing ":-" style separators."""
+    return re.sub(r'[\s:\-]+$', '', str(name)).strip()
+
+
+def _read_records(path: str) -> List[Dict[str, Any]]:
+    """Rows of a POI file as dicts with normalized keys and coordinates in "lat"/"lon"."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".geojson", ".json"):
+        with open(path) as f:
+            features = json.load(f).get("features", [])
+        records = []
+        for feature in features:
+            if (feature.get("geometry") or {}).get("type") != "Point":
+                continue
+            lon, lat = feature["geometry"]["coordinates"][:2]
+            properties = {key.strip().lower(): value for key, value in (feature.get("properties") or {}).items()}
+            records.append(dict(properties, lat=lat, lon=lon))
+        return records
+    
+    if extension in (".xlsx", ".xls"):
+        frame = pd.read_excel(path)
+    elif extension == ".csv":
+        frame = pd.read_csv(path)
+    else:
+        raise ValueError(f"Unsupported POI file type: {path}")
+    frame.columns = [str(column).strip().lower() for column in frame.columns]
+    columns = set(frame.columns)
+    
+    def pick(candidates: Tuple[str, ...]) -> str:
+        column = next((c for c in candidates if c in columns), None)
+        if column is None:
+            raise ValueError(f"{path} has no {candidates[0]} column")
+        return column
+    
+    renames = {pick(LATITUDE_COLUMNS): "lat", pick(LONGITUDE_COLUMNS): "lon", pick(NAME_COLUMNS): "name"}
+    frame = frame.rename(columns=renames).dropna(subset=["name", "lat", "lon"])
+    return [{key: value for key, value in row.items() if not pd.isna(value)} for row in frame.to_dict("records")]
+
+
+def read_location_file(path: str, known: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Locations from an xlsx, CSV or GeoJSON POI file.
+    
+    Each row needs a name and coordinates; optional id, category, hours,
+    description, location, facilities, nearby and aliases columns fill in the
+    rest. Rows naming a ``known`` location (LOCATIONS by default) keep its id,
+    category and assistant info, so a plain name/coordinates sheet still
+    carries the full metadata.
+    """
+    known_registry = LocationRegistry(known if known is not None else LOCATIONS)
+    locations = []
+    for record in _read_records(path):
+        name = clean_place_name(record["name"])
+        base = known_registry.get(str(record.get("id", ""))) or known_registry.get(name)
+        lists = {key: [item.strip() for item in str(record[key]).split(LIST_SEPARATOR) if item.strip()]
+                 for key in LIST_COLUMNS if key in record}
+        if base is not None:
+            info = dict(base['info'])
+        else:
+            info = {"name": name, "location": "", "hours": "Not listed", "facilities": [], "nearby": [],
+                    "description": name}
+        info.update({key: str(record[key]) for key in ("hours", "description", "location") if key in record})
+        info.update({key: value for key, value in lists.items() if key in info})
+        location = {
+            "id": str(record.get("id") or (base['id'] if base else re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_'))),
+            "name": name,
+            "coordinates": (parse_coordinate(record["lat"]), parse_coordinate(record["lon"])),
+            "category": str(record.get("category") or (base['category'] if base else "Other")),
+            "info": info
+        }
+        if "aliases" in lists:
+            location["aliases"] = lists["aliases"]
+        locations.append(location)
+    return locations
+
+
+class LocationRegistry:
+    """Single indexed source of campus locations for the pathfinder and the assistant.
+    
+    Each location holds its id (the assistant's snake_case key), display name
+    (the pathfinder's POI name), aliases, coordinates, category, assistant
+    metadata and, once a graph is loaded, its pre-snapped graph node. Every
+    alias is normalized once into a dict, so lookups from either side are O(1).
+    
+    A registry is not changed once it is shared: reloads and snapped nodes
+    produce a new registry, which the pathfinder and assistant swap in.
+    """
+    
+    def __init__(self, locations: List[Dict[str, Any]]):
+        self.locations = {}
+        self.aliases = {}
+        # POI file the locations came from, and a counter bumped by every reload
+        self.source = None
+        self.version = 0
+        for location in locations:
+            self.add(location)
+    
+    @classmethod
+    def default(cls) -> 'LocationRegistry':
+        """Registry of the built-in campus locations."""
+        return cls(LOCATIONS)
+    
+    @classmethod
+    def from_file(cls, path: str) -> 'LocationRegistry':
+        """Registry of the locations in an xlsx, CSV or GeoJSON POI file."""
+        registry = cls(read_location_file(path))
+        registry.source = path
+        return registry
+    
+    def reloaded(self, path: Optional[str] = None) -> 'LocationRegistry':
+        """New registry re-read from the POI file (or another one); this one is left unchanged.
+        
+        Locations already known keep their metadata when the file only lists
+        names and coordinates. Snapped nodes are cleared until a pathfinder
+        snaps the new locations.
+        """
+        path = path or self.source
+        if path is None:
+            raise ValueError("Registry has no POI file to reload")
+        known = [dict(location, node=None) for location in LOCATIONS + list(self.locations.values())]
+        registry = LocationRegistry(read_location_file(path, known))
+        registry.source = path
+        registry.version = self.version + 1
+        return registry
+    
+    def add(self, location: Dict[str, Any]):
+        """Add or replace a location and index its aliases."""
+        entry = dict(location)
+        entry.setdefault('node', None)
+        entry['aliases'] = self._aliases(entry)
+        self.locations[entry['id']] = entry
+        for alias in entry['aliases']:
+            # Earlier locations keep ambiguous aliases
+            self.aliases.setdefault(alias, entry['id'])
+    
+    def resolve(self, name: str) -> Optional[str]:
+        """Location id for an id, display name, assistant name or alias."""
+        return self.aliases.get(normalize_location_name(name))
+    
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Location entry for any of its names, or None."""
+        location_id = self.resolve(name)
+        return self.locations[location_id] if location_id else None
+    
+    def category(self, name: str) -> str:
+        """Category of a location, "Other" if unknown."""
+        location = self.get(name)
+        return location['category'] if location else "Other"
+    
+    def pois(self) -> Dict[str, Tuple[float, float]]:
+        """Display name -> (lat, lon), the pathfinder's POI table."""
+        return {loc['name']: loc['coordinates'] for loc in self.locations.values()}
+    
+    def campus_info(self) -> Dict[str, Dict[str, Any]]:
+        """Location id -> metadata, the assistant's knowledge base."""
+        return {location_id: loc['info'] for location_id, loc in self.locations.items()}
+    
+    def with_nodes(self, nodes: Dict[str, int]) -> 'LocationRegistry':
+        """Copy of this registry with pre-snapped graph nodes by location id; this one is left unchanged."""
+        registry = copy.copy(self)
+        registry.locations = {location_id: dict(location, node=nodes.get(location_id, location['node']))
+                              for location_id, location in self.locations.items()}
+        registry.aliases = dict(self.aliases)
+        return registry
+    
+    def node(self, name: str) -> Optional[int]:
+        """Pre-snapped graph node of a location, or None."""
+        location = self.get(name)
+        return location['node'] if location else None
+    
+    def _aliases(self, location: Dict[str, Any]) -> List[str]:
+        """Normalized names a location can be referred to by."""
+        location_id = location['id']
+        names = [
+            location_id,
+            location['name'],
+            location['info']['name'],
+            location_id.replace('block', ''),
+            location_id.replace('court', ''),
+            location_id.replace('ground', '')
+        ]
+        names.extend(location.get('aliases', []))
+        return [alias for alias in dict.fromkeys(normalize_location_name(n) for n in names) if alias]
@@ -0,0 +1,226 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from location_registry import DEFAULT_POI_FILE, LocationRegistry
+from map_reloader import POLL_INTERVAL_SECONDS, MapReloader
+from pathfinding import CampusPathfinder, RoutingGraph
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAP = "campus"
+DEFAULT_OSM_FILE = "attached_assets/map_1758707724808.osm"
+
+# Directory for routing graph snapshots, which load without parsing the OSM XML
+SNAPSHOT_DIR = ".map_snapshots"
+
+# Loaded graphs are evicted least recently used first above this estimated size
+MEMORY_BUDGET_MB = 1024
+
+
+class UnknownMapError(KeyError):
+    """A map id that is not in the map configuration."""
+
+
+def load_map_config(path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Map id -> {"osm": OSM file, "pois": POI file or None} from a JSON file.
+
+    Without a file the bundled campus is the only map, from OSM_FILE and
+    POI_FILE. Maps without a POI file use the built-in locations if they are
+    the bundled campus, and no locations otherwise.
+    """
+    if path:
+        with open(path) as f:
+            config = json.load(f)
+        return {map_id: {"osm": entry["osm"], "pois": entry.get("pois")} for map_id, entry in config.items()}
+    return {DEFAULT_MAP: {"osm": os.environ.get("OSM_FILE", DEFAULT_OSM_FILE),
+                          "pois": os.environ.get("POI_FILE", DEFAULT_POI_FILE)}}
+
+
+def load_routing_graph(osm_file_path: str, snapshot_dir: Optional[str] = SNAPSHOT_DIR) -> RoutingGraph:
+    """Routing graph of an OSM file, from its snapshot when the file has not changed since it was written.
+
+    Snapshots are named after the file's path, size and modification time,
+    so an edited map is parsed again and gets a fresh snapshot.
+    """
+    if snapshot_dir is None:
+        return RoutingGraph.from_osm(osm_file_path)
+    stat = os.stat(osm_file_path)
+    name = os.path.abspath(osm_file_path).strip(os.sep).replace(os.sep, "_")
+    snapshot = os.path.join(snapshot_dir, f"{name}.{stat.st_size}.{stat.st_mtime_ns}.npz")
+    if os.path.exists(snapshot):
+        try:
+            return RoutingGraph.load(snapshot)
+        except KeyError:
+            pass  # Written before parallel edges were kept; parsed again and replaced below
+
+    routing = RoutingGraph.from_osm(osm_file_path)
+    os.makedirs(snapshot_dir, exist_ok=True)
+    # Write under a temporary name so a concurrent reader never loads a partial snapshot
+    partial = f"{snapshot}.{os.getpid()}.{threading.get_ident()}.npz"
+    routing.save(partial)
+    os.replace(partial, snapshot)
+    # Snapshots of earlier versions of the file are never read again
+    for stale in os.listdir(snapshot_dir):
+        if stale.startswith(f"{name}.") and stale.count(".") == name.count(".") + 3 and stale != os.path.basename(snapshot):
+            os.remove(os.path.join(snapshot_dir, stale))
+    return routing
+
+
+class MapRegistry:
+    """Pathfinders for several maps by id, loaded on first use and kept under a memory budget.
+
+    Each loaded map is a MapReloader, so it is hot-reloaded when its OSM file
+    changes. Loaded maps are kept in least-recently-used order; when their
+    estimated size exceeds the budget the least recently used ones are
+    evicted, keeping their edge closures so they come back on the next load,
+    which reads the routing graph from its snapshot instead of the XML.
+    Location registries are small and stay loaded, so POI reloads and the
+    assistant's registry survive eviction.
+    """
+
+    def __init__(self, config: Dict[str, Dict[str, Any]], memory_budget_mb: float = MEMORY_BUDGET_MB,
+                 snapshot_dir: Optional[str] = SNAPSHOT_DIR, poll_interval: float = POLL_INTERVAL_SECONDS,
+                 watch: bool = True, instrument_search: bool = False):
+        self.config = config
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.snapshot_dir = snapshot_dir
+        self.poll_interval = poll_interval
+        self.watch = watch
+        self.instrument_search = instrument_search
+        self.evictions = 0
+        self._loaded: "OrderedDict[str, MapReloader]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._registries: Dict[str, LocationRegistry] = {}
+        self._overrides: Dict[str, Dict] = {}
+        # Guards the LRU bookkeeping; each map has its own lock so one slow load never blocks the others
+        self._lock = threading.Lock()
+        self._map_locks = {map_id: threading.Lock() for map_id in config}
+
+    def __contains__(self, map_id: str) -> bool:
+        return map_id in self.config
+
+    def registry(self, map_id: str) -> LocationRegistry:
+        """Location registry of a map, read from its POI file on first use."""
+        if map_id not in self.config:
+            raise UnknownMapError(f"Unknown map: {map_id}")
+        with self._lock:
+            registry = self._registries.get(map_id)
+        if registry is None:
+            registry = self._load_registry(map_id)
+            with self._lock:
+                registry = self._registries.setdefault(map_id, registry)
+        return registry
+
+    def _load_registry(self, map_id: str) -> LocationRegistry:
+        poi_file = self.config[map_id].get("pois")
+        if poi_file:
+            try:
+                return LocationRegistry.from_file(poi_file)
+            except Exception as e:
+                fallback = "built-in locations" if map_id == DEFAULT_MAP else "no locations"
+                logger.warning("Could not load POI file %s for map %s, using %s instead: %s",
+                               poi_file, map_id, fallback, e)
+        return LocationRegistry.default() if map_id == DEFAULT_MAP else LocationRegistry([])
+
+    def reload_pois(self, map_id: str, path: Optional[str] = None) -> CampusPathfinder:
+        """Re-read a map's POI file (or ``path``) into a new registry and swap in a pathfinder serving it.
+        
+        The new registry replaces the map's one only together with the swap,
+        under the reloader's writer lock, so a concurrent rebuild of the map
+        never picks up the old locations again. On failure nothing changes.
+        Returns the published pathfinder; its ``registry`` is the new one.
+        """
+        def change(current: CampusPathfinder) -> CampusPathfinder:
+            registry = self.registry(map_id).reloaded(path)
+            pathfinder = current.with_registry(registry)
+            with self._lock:
+                self._registries[map_id] = registry
+            return pathfinder
+        
+        return self.get(map_id).update(change)
+    
+    def get(self, map_id: str) -> MapReloader:
+        """The map's reloader, loading the map and evicting others if needed."""
+        if map_id not in self.config:
+            raise UnknownMapError(f"Unknown map: {map_id}")
+        with self._lock:
+            maps = self._loaded.get(map_id)
+            if maps is not None:
+                self._loaded.move_to_end(map_id)
+                return maps
+
+        with self._map_locks[map_id]:
+            with self._lock:
+                maps = self._loaded.get(map_id)
+                if maps is not None:
+                    self._loaded.move_to_end(map_id)
+                    return maps
+            maps = MapReloader(self.config[map_id]["osm"], lambda path: self._build(map_id, path), self.poll_interval,
+                               on_swap=lambda: self.resize(map_id))
+            if self.watch:
+                maps.start()
+            with self._lock:
+                self._loaded[map_id] = maps
+                self._sizes[map_id] = maps.current.memory_bytes()
+                evicted = self._evict(keep=map_id)
+        for old in evicted:
+            old.close()
+        return maps
+
+    def pathfinder(self, map_id: str) -> CampusPathfinder:
+        """The map's current pathfinder; read once per request."""
+        return self.get(map_id).current
+
+    def _build(self, map_id: str, osm_file_path: str) -> CampusPathfinder:
+        pathfinder = CampusPathfinder.from_routing(load_routing_graph(osm_file_path, self.snapshot_dir),
+                                                   registry=self.registry(map_id))
+        pathfinder.INSTRUMENT_SEARCH = self.instrument_search
+        overrides = self._overrides.pop(map_id, None)
+        if overrides:
+            pathfinder.restore_edge_overrides(overrides)
+        return pathfinder
+
+    def _evict(self, keep: str) -> List[MapReloader]:
+        # Called with the registry lock held; the evicted reloaders are closed outside it
+        evicted = []
+        while sum(self._sizes.values()) > self.memory_budget and len(self._loaded) > 1:
+            map_id = next(iter(self._loaded))
+            if map_id == keep:
+                self._loaded.move_to_end(map_id)
+                continue
+            maps = self._loaded.pop(map_id)
+            self._sizes.pop(map_id)
+            self._overrides[map_id] = maps.current.edge_overrides()
+            self.evictions += 1
+            evicted.append(maps)
+        return evicted
+
+    def resize(self, map_id: str):
+        """Re-measure a loaded map after a hot reload, evicting others if it grew."""
+        with self._lock:
+            maps = self._loaded.get(map_id)
+            if maps is None:
+                return
+            self._sizes[map_id] = maps.current.memory_bytes()
+            evicted = self._evict(keep=map_id)
+        for old in evicted:
+            old.close()
+
+    def status(self) -> Dict[str, Any]:
+        """Configured and loaded maps with their estimated sizes, in LRU order."""
+        with self._lock:
+            loaded = [
+                dict(maps.status(), map=map_id, memory_mb=round(self._sizes[map_id] / (1024 * 1024), 2))
+                for map_id, maps in self._loaded.items()
+            ]
+        return {
+            "maps": list(self.config),
+            "loaded": loaded,
+            "memory_mb": round(sum(entry["memory_mb"] for entry in loaded), 2),
+            "budget_mb": round(self.memory_budget / (1024 * 1024), 2),
+            "evictions": self.evictions
+        }
@@ -0,0 +1,174 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from pathfinding import CampusPathfinder
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the OSM file
+POLL_INTERVAL_SECONDS = 2.0
+
+
+class MapReloader:
+    """Holds the live CampusPathfinder and swaps in a rebuilt one when the OSM file changes.
+
+    A background thread polls the file's modification time and size. Once a
+    change has settled for one poll, a new pathfinder is built on that thread,
+    with its search graph, weights and snapped POIs, and then published with a
+    single reference assignment. Requests read ``current`` once and finish on
+    the pathfinder they started with. A file that fails to load is reported in
+    ``last_error`` and the previous map keeps serving.
+
+    Every other change (POI reloads, closures) goes through ``update`` the
+    same way: a changed copy is built and then swapped in, so the published
+    pathfinder is never modified. A replaced pathfinder retires its
+    comparison workers, which finish the work already given to them.
+    """
+
+    def __init__(self, osm_file_path: str, build: Optional[Callable[[str], CampusPathfinder]] = None,
+                 poll_interval: float = POLL_INTERVAL_SECONDS, on_swap: Optional[Callable[[], None]] = None):
+        self.osm_file_path = osm_file_path
+        self.poll_interval = poll_interval
+        self._build = build or CampusPathfinder
+        # Called after every swap, outside the lock
+        self._on_swap = on_swap
+        self._signature = self._file_signature()
+        # Signature of the last file that failed to load, so it is not retried every poll
+        self._failed_signature = None
+        self._current = self._build(osm_file_path)
+        self.version = 1
+        self.loaded_at = time.time()
+        self.last_error = None
+        # Serialises writers (rebuilds and updates); readers of ``current`` never take it
+        self.lock = threading.Lock()
+        self._wake = threading.Event()
+        self._force = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def current(self) -> CampusPathfinder:
+        """The pathfinder new requests should use."""
+        return self._current
+
+    def _file_signature(self) -> Tuple[int, int]:
+        stat = os.stat(self.osm_file_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload(self, force: bool = False) -> bool:
+        """Rebuild from the OSM file if it changed (or when forced) and swap it in.
+
+        Runs on the caller's thread; returns whether a new map was published.
+        """
+        with self.lock:
+            try:
+                signature = self._file_signature()
+            except OSError as e:
+                self.last_error = str(e)
+                return False
+            if not force and signature == self._signature:
+                return False
+
+            try:
+                pathfinder = self._build(self.osm_file_path)
+            except Exception as e:
+                self.last_error = f"Reload of {self.osm_file_path} failed: {e}"
+                self._failed_signature = signature
+                logger.error(self.last_error)
+                return False
+
+            # Closures and weight changes carry over where their edges still exist
+            pathfinder.restore_edge_overrides(self._current.edge_overrides())
+            self._signature = signature
+            self.loaded_at = time.time()
+            self.last_error = None
+            self._publish(pathfinder)
+        if self._on_swap is not None:
+            self._on_swap()
+        return True
+
+    def update(self, change: Callable[[CampusPathfinder], CampusPathfinder]) -> CampusPathfinder:
+        """Swap in ``change(current)``, a changed copy of the current pathfinder.
+
+        ``change`` runs under the writer lock, so updates and rebuilds never
+        interleave, and must not modify the pathfinder it is given. Errors
+        from it propagate and leave the current pathfinder in place.
+        """
+        with self.lock:
+            pathfinder = change(self._current)
+            self._publish(pathfinder)
+        if self._on_swap is not None:
+            self._on_swap()
+        return pathfinder
+
+    def _publish(self, pathfinder: CampusPathfinder):
+        # Called with the lock held; a single reference assignment publishes the new map
+        previous = self._current
+        self._current = pathfinder
+        self.version += 1
+        if previous is not pathfinder:
+            previous.retire_compare_pool()
+
+    def request_reload(self):
+        """Ask the watcher thread to rebuild now, off the caller's thread."""
+        self._force = True
+        self._wake.set()
+
+    def start(self):
+        """Start the background watcher thread (idempotent)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="map-reloader", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the watcher thread."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def close(self):
+        """Stop the watcher and retire the current pathfinder's comparison workers."""
+        self.stop()
+        with self.lock:
+            self._current.retire_compare_pool()
+
+    def status(self) -> dict:
+        """Loaded map version, file and last reload error."""
+        return {
+            "osm_file": self.osm_file_path,
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "nodes": self._current.routing.node_count,
+            "center": self._current.center,
+            "error": self.last_error
+        }
+
+    def _watch(self):
+        # A change is only loaded once the file looks the same on two polls,
+        # so a map that is still being written is not parsed half-way
+        pending = None
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            if self._force:
+                self._force = False
+                pending = None
+                self.reload(force=True)
+            else:
+                try:
+                    signature = self._file_signature()
+                except OSError:
+                    signature = None
+                if signature not in (None, self._signature, self._failed_signature):
+                    if signature == pending:
+                        pending = None
+                        self.reload()
+                    else:
+                        pending = signature
@@ -1,53 +1,1064 @@
 import osmnx as ox
 import networkx as nx
+import copy
 import folium
 import heapq
+import itertools
+import json
 import math
+import multiprocessing
+import os
+import statistics
+import sys
+import threading
+import time
+import numpy as np
 import pandas as pd
+from array import array
 from collections import deque
-from typing import Dict, List, Tuple, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from scipy import stats
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from sklearn.neighbors import BallTree
+from xml.etree import ElementTree
+from typing import Dict, List, Tuple, Any, Optional, Iterable, Iterator, Union, Callable
+from location_registry import LocationRegistry
+
+# Every algorithm accepted by find_path, in the order the UI lists them
+ALGORITHMS = ["A*", "A* (Euclidean)", "A* (Manhattan)", "A* (Combined)", "BFS", "DFS", "UCS"]
+
+# Way tags kept by the streaming OSM reader; every other tag is dropped while parsing
+ROUTING_TAGS = ("highway", "oneway", "junction", "access", "foot", "bicycle", "wheelchair", "surface", "name")
+
+# OSM oneway values meaning one-way, and those meaning against the node order (as osmnx reads them)
+ONEWAY_VALUES = {"yes", "true", "1", "-1", "reverse", "T", "F"}
+REVERSED_VALUES = {"-1", "reverse", "T"}
+
+# Travel profiles: speed in m/s, and cost factors by highway and surface applied
+# to edge lengths; None excludes the edge. ``mode`` is the access tag of the
+# profile (foot=no excludes walking, foot=yes overrides access=no). Factors
+# never go below 1, so the distance heuristics of A* stay admissible.
+PROFILES = {
+    "walking": {
+        "speed": 1.4,
+        "mode": "foot",
+        "highway": {"motorway": None, "motorway_link": None, "trunk": None, "trunk_link": None,
+                    "construction": None, "primary": 1.2, "primary_link": 1.2, "secondary": 1.1},
+        "surface": {}
+    },
+    "wheelchair": {
+        "speed": 0.9,
+        "mode": "wheelchair",
+        "highway": {"motorway": None, "motorway_link": None, "trunk": None, "trunk_link": None,
+                    "construction": None, "steps": None, "primary": 1.3, "primary_link": 1.3,
+                    "secondary": 1.2, "path": 1.5, "track": 2.0},
+        "surface": {"gravel": 2.0, "unpaved": 2.0, "dirt": 2.5, "ground": 2.5, "grass": 3.0, "sand": None}
+    },
+    "cycling": {
+        "speed": 4.2,
+        "mode": "bicycle",
+        "highway": {"motorway": None, "motorway_link": None, "construction": None, "steps": None,
+                    "trunk": 1.5, "trunk_link": 1.5, "footway": 3.0, "pedestrian": 3.0, "path": 1.5},
+        "surface": {"gravel": 1.5, "unpaved": 1.5, "dirt": 2.0, "ground": 2.0, "grass": 3.0, "sand": 3.0}
+    }
+}
+DEFAULT_PROFILE = "walking"
+
+# Weight of an edge a profile may not use
+EXCLUDED = math.inf
+
+# Default routes for compare_algorithms/compare_heuristics
+COMPARE_ROUTES = [
+    ("Entry gate", "Library"),
+    ("Library", "Food Court"),
+    ("Cricket Ground", "Hostel Block")
+]
+HEURISTIC_ROUTES = COMPARE_ROUTES + [
+    ("Acad 1", "Rest Area"),
+    ("Food Court", "Basket Ball")
+]
+
+# Timed runs per route and algorithm in comparisons, and the confidence level of their intervals
+COMPARE_TRIALS = 5
+CONFIDENCE = 0.95
+
+# Estimated work (search edges x searches) below which comparisons run
+# inline: starting workers and sending them the pathfinder takes seconds,
+# while searches cost about 0.3 us per search edge on the bundled campus
+COMPARE_POOL_MIN_WORK = 10_000_000
+
+# Comparison workers start from a clean process instead of a fork of the
+# (multi-threaded) server, which can copy locks held by other threads
+COMPARE_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# Pathfinder of a comparison worker process, handed over once when the worker starts
+_worker_pathfinder = None
+
+def _init_compare_worker(pathfinder: 'CampusPathfinder'):
+    global _worker_pathfinder
+    _worker_pathfinder = pathfinder
+
+def _run_compare_task(task: Tuple[str, str, str, int, str]) -> Dict[str, Any]:
+    return _worker_pathfinder.run_trials(*task)
+
+def _batch_event(batch: List[int], pushed: List[int], frontier_size: int, explored_total: int) -> Dict[str, Any]:
+    """Streamed search event for the nodes expanded and pushed since the last one; empties both lists."""
+    event = {
+        'type': 'batch',
+        'explored': list(batch),
+        'frontier': list(dict.fromkeys(pushed)),
+        'frontier_size': frontier_size,
+        'explored_total': explored_total
+    }
+    batch.clear()
+    pushed.clear()
+    return event
+
+def _dict_bytes(mapping: Dict[Any, Any]) -> int:
+    """sys.getsizeof of a dict and of its keys and values, not following nested containers."""
+    return sys.getsizeof(mapping) + sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in mapping.items())
+
+def _way_classes(way_tags: List[Dict[str, Any]]) -> np.ndarray:
+    """Class of every way: ways with the same routing tags, ignoring id and name, share one."""
+    classes = {}
+    return np.array([classes.setdefault(tuple(sorted((key, str(value)) for key, value in tags.items()
+                                                     if key not in ("osmid", "name"))), len(classes))
+                     for tags in way_tags], dtype=np.int64)
+
+def _weighted(lengths: np.ndarray, factors: np.ndarray) -> np.ndarray:
+    """Lengths times cost factors, inf where the factor is (so zero-length excluded edges stay excluded)."""
+    return np.where(np.isinf(factors), EXCLUDED, lengths * np.where(np.isinf(factors), 0, factors))
+
+def profile_factor(tags: Dict[str, Any], profile: str) -> Optional[float]:
+    """Cost factor of a way for a travel profile, or None if the profile may not use it."""
+    settings = PROFILES[profile]
+    mode = tags.get(settings["mode"])
+    if mode == "no":
+        return None
+    allowed = mode in ("yes", "designated", "permissive")
+    if tags.get("access") in ("no", "private") and not allowed:
+        return None
+    
+    highway = settings["highway"].get(str(tags.get("highway")), 1.0)
+    surface = settings["surface"].get(str(tags.get("surface")), 1.0)
+    if highway is None:
+        # An explicit access tag opens e.g. a trunk road with a sidewalk
+        highway = 1.0 if allowed else None
+    if highway is None or surface is None:
+        return None
+    return highway * surface
+
+class NodeIndex:
+    """Nearest-node lookup over a set of graph nodes by great-circle distance, as ox.distance.nearest_nodes."""
+    
+    def __init__(self, nodes: np.ndarray, lat: np.ndarray, lon: np.ndarray):
+        self.nodes = nodes
+        self.tree = BallTree(np.deg2rad(np.column_stack([lat[nodes], lon[nodes]])), metric="haversine")
+    
+    def nearest(self, lats: List[float], lons: List[float]) -> np.ndarray:
+        """Nearest indexed node to each point."""
+        _, positions = self.tree.query(np.deg2rad(np.column_stack([lats, lons])), k=1)
+        return self.nodes[positions[:, 0]]
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the indexed nodes and the tree's arrays."""
+        return self.nodes.nbytes + sum(np.asarray(array).nbytes for array in self.tree.get_arrays())
+
+class SearchInstrumentation:
+    """Counters and optional tracing callbacks for one search.
+    
+    ``on_expand(node, cost)`` is called when a node is expanded and
+    ``on_relax(node, neighbor, cost)`` when an edge puts a neighbor on the
+    frontier. Every search runs the same loop; without instrumentation it
+    skips the counting and callbacks behind a single flag test.
+    """
+    
+    def __init__(self, on_expand: Optional[Callable[[int, float], None]] = None,
+                 on_relax: Optional[Callable[[int, int, float], None]] = None):
+        self.on_expand = on_expand
+        self.on_relax = on_relax
+        self.pushes = 0
+        self.pops = 0
+        self.stale_pops = 0
+        self.relaxations = 0
+        self.max_frontier = 0
+    
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            'pushes': self.pushes,
+            'pops': self.pops,
+            'stale_pops': self.stale_pops,
+            'relaxations': self.relaxations,
+            'max_frontier': self.max_frontier
+        }
+
+class POIDict(dict):
+    """POI table that bumps a version counter whenever it is mutated."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+    
+    def _changed(self):
+        self.version += 1
+    
+    def __reduce__(self):
+        # Unpickle the items through __init__: the default path calls __setitem__ before version exists
+        return POIDict, (dict(self),), self.__dict__
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+    
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+    
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        self._changed()
+        return result
+    
+    def clear(self):
+        super().clear()
+        self._changed()
+    
+    def pop(self, *args):
+        result = super().pop(*args)
+        self._changed()
+        return result
+    
+    def popitem(self):
+        result = super().popitem()
+        self._changed()
+        return result
+    
+    def setdefault(self, key, default=None):
+        result = super().setdefault(key, default)
+        self._changed()
+        return result
+    
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+class AhoCorasick:
+    """Aho-Corasick automaton finding every occurrence of many patterns in one pass."""
+    
+    def __init__(self, patterns: Dict[str, Any]):
+        """Build the automaton from a mapping of pattern string to value."""
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]  # (pattern length, value) for every pattern ending at a state
+        
+        for pattern, value in patterns.items():
+            state = 0
+            for ch in pattern:
+                if ch not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][ch] = len(self.goto) - 1
+                state = self.goto[state][ch]
+            self.output[state].append((len(pattern), value))
+        
+        # Breadth-first construction of failure links, merging suffix outputs
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+    
+    def find_all(self, text: str) -> List[Tuple[int, int, Any]]:
+        """Return (start, end, value) for every pattern occurrence in text."""
+        matches = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for length, value in self.output[state]:
+                matches.append((i + 1 - length, i + 1, value))
+        return matches
+    
+    def find_longest(self, text: str) -> List[Tuple[int, int, Any]]:
+        """Return non-overlapping matches, preferring the leftmost then longest."""
+        selected = []
+        last_end = 0
+        for start, end, value in sorted(self.find_all(text), key=lambda m: (m[0], m[0] - m[1])):
+            if start >= last_end:
+                selected.append((start, end, value))
+                last_end = end
+        return selected
+
+class RoutingGraph:
+    """Compact directed routing graph in CSR form.
+    
+    Nodes are numbered 0..n-1, with ``node_ids`` mapping them back to OSM ids
+    and coordinates in ``lat``/``lon``. The outgoing edges of node i are
+    ``indptr[i]:indptr[i+1]`` in ``targets``/``lengths``/``edge_way``, in the
+    order networkx lists the neighbours, with parallel edges merged into the
+    shortest. Parallel edges with other routing tags are kept as
+    alternatives of the merged edge: ``parallel_edges``, ``parallel_lengths``
+    and ``parallel_ways`` hold the shortest of each, so ``edge_weights`` can
+    take the cheapest under each profile.
+    ``way_tags`` holds the routing tags of every way, and ``line_nodes``
+    split at ``line_offsets`` the node sequences of the roads, for drawing.
+    """
+    
+    def __init__(self, node_ids: np.ndarray, lat: np.ndarray, lon: np.ndarray, indptr: np.ndarray,
+                 targets: np.ndarray, lengths: np.ndarray, edge_way: np.ndarray,
+                 way_tags: List[Dict[str, Any]], line_nodes: np.ndarray, line_offsets: np.ndarray,
+                 parallel_edges: Optional[np.ndarray] = None, parallel_lengths: Optional[np.ndarray] = None,
+                 parallel_ways: Optional[np.ndarray] = None):
+        self.node_ids = node_ids
+        self.lat = lat
+        self.lon = lon
+        self.indptr = indptr
+        self.targets = targets
+        self.lengths = lengths
+        self.edge_way = edge_way
+        self.way_tags = way_tags
+        self.line_nodes = line_nodes
+        self.line_offsets = line_offsets
+        self.parallel_edges = parallel_edges if parallel_edges is not None else np.zeros(0, dtype=np.int64)
+        self.parallel_lengths = parallel_lengths if parallel_lengths is not None else np.zeros(0, dtype=np.float64)
+        self.parallel_ways = parallel_ways if parallel_ways is not None else np.zeros(0, dtype=np.int32)
+        self._index = None
+    
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+    
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+    
+    @classmethod
+    def from_osm(cls, osm_file_path: str) -> 'RoutingGraph':
+        """Stream an OSM XML file into routing arrays in a single pass.
+        
+        Nodes and ways are read with iterparse and discarded as soon as they
+        are consumed, keeping only coordinates, way node lists and
+        ROUTING_TAGS, so memory follows the routing data instead of the XML
+        tree. Edges follow the same rules as ``ox.graph_from_xml(simplify=False)``
+        (every way, oneway and roundabout handling, largest weakly connected
+        component), so searches expand exactly the same nodes.
+        """
+        node_ids, lats, lons = array('q'), array('d'), array('d')
+        way_nodes, way_offsets, way_oneway = array('q'), array('q', [0]), array('b')
+        way_tags = []
+        
+        context = ElementTree.iterparse(osm_file_path, events=("start", "end"))
+        _, root = next(context)
+        for event, elem in context:
+            if event != "end":
+                continue
+            if elem.tag == "node":
+                node_ids.append(int(elem.get("id")))
+                lats.append(float(elem.get("lat")))
+                lons.append(float(elem.get("lon")))
+            elif elem.tag == "way":
+                refs = [ref for ref, _ in itertools.groupby(int(nd.get("ref")) for nd in elem.iter("nd"))]
+                tags = {tag.get("k"): tag.get("v") for tag in elem.iter("tag") if tag.get("k") in ROUTING_TAGS}
+                oneway = tags.get("oneway") in ONEWAY_VALUES or tags.get("junction") == "roundabout"
+                if oneway and tags.get("oneway") in REVERSED_VALUES:
+                    refs.reverse()
+                tags["osmid"] = int(elem.get("id"))
+                way_tags.append(tags)
+                way_nodes.extend(refs)
+                way_offsets.append(len(way_nodes))
+                way_oneway.append(oneway)
+            elif elem.tag != "relation":
+                continue
+            # Drop every finished top-level element so the tree never grows
+            root.clear()
+        
+        node_ids = np.frombuffer(node_ids, dtype=np.int64)
+        way_nodes = np.frombuffer(way_nodes, dtype=np.int64)
+        way_offsets = np.frombuffer(way_offsets, dtype=np.int64)
+        way_oneway = np.frombuffer(way_oneway, dtype=np.int8).astype(bool)
+        
+        # Map way node references to node positions; references to nodes
+        # missing from the file (clipped extracts) are dropped
+        order = np.argsort(node_ids, kind='stable')
+        found = np.searchsorted(node_ids[order], way_nodes).clip(max=len(order) - 1)
+        positions = np.where(node_ids[order][found] == way_nodes, order[found], -1)
+        
+        # Consecutive nodes of each way, forward, then backward for two-way ways,
+        # in the order osmnx adds them
+        way_of = np.repeat(np.arange(len(way_tags)), np.diff(way_offsets))
+        same_way = way_of[:-1] == way_of[1:]
+        first = np.flatnonzero(same_way & (positions[:-1] >= 0) & (positions[1:] >= 0))
+        backward = first[~way_oneway[way_of[first]]]
+        u = np.concatenate([positions[first], positions[backward + 1]])
+        v = np.concatenate([positions[first + 1], positions[backward]])
+        ways = np.concatenate([way_of[first], way_of[backward]])
+        direction = np.concatenate([np.zeros(len(first), dtype=np.int8), np.ones(len(backward), dtype=np.int8)])
+        sequence = np.concatenate([first, backward])
+        edge_order = np.lexsort((sequence, direction, ways))
+        
+        return cls._build(node_ids, np.frombuffer(lats, dtype=np.float64), np.frombuffer(lons, dtype=np.float64),
+                          u[edge_order], v[edge_order], None, ways[edge_order], way_tags, positions, way_offsets)
+    
+    @classmethod
+    def from_networkx(cls, graph: nx.MultiDiGraph) -> 'RoutingGraph':
+        """Compile an osmnx-style MultiDiGraph, keeping its edge lengths and adjacency order."""
+        node_ids = np.fromiter(graph.nodes, dtype=np.int64, count=len(graph))
+        index = {node: i for i, node in enumerate(graph.nodes)}
+        lat = np.array([data['y'] for _, data in graph.nodes(data=True)], dtype=np.float64)
+        lon = np.array([data['x'] for _, data in graph.nodes(data=True)], dtype=np.float64)
+        
+        u, v, lengths, ways, way_tags, way_index, lines = [], [], [], [], [], {}, []
+        for a, b, data in graph.edges(data=True):
+            tags = {key: data[key] for key in ROUTING_TAGS if key in data}
+            tags['osmid'] = data.get('osmid')
+            signature = tuple(sorted((key, str(value)) for key, value in tags.items()))
+            if signature not in way_index:
+                way_index[signature] = len(way_tags)
+                way_tags.append(tags)
+            u.append(index[a])
+            v.append(index[b])
+            lengths.append(data.get('length', 1))
+            ways.append(way_index[signature])
+            if not data.get('reversed', False):
+                lines.extend([index[a], index[b]])
+        
+        return cls._build(node_ids, lat, lon, np.array(u, dtype=np.int64), np.array(v, dtype=np.int64),
+                          np.array(lengths, dtype=np.float64), np.array(ways, dtype=np.int64), way_tags,
+                          np.array(lines, dtype=np.int64), np.arange(0, len(lines) + 1, 2))
+    
+    @classmethod
+    def from_edges(cls, node_ids: np.ndarray, lat: np.ndarray, lon: np.ndarray, u: np.ndarray, v: np.ndarray,
+                   lengths: np.ndarray, ways: np.ndarray, way_tags: List[Dict[str, Any]]) -> 'RoutingGraph':
+        """Compile two-way edges given as arrays, e.g. a generated graph, without a networkx graph.
+        
+        ``u``/``v`` index ``node_ids``, and edge ``i`` belongs to the way
+        ``way_tags[ways[i]]``. Both directions of every edge are added, in the
+        order ``from_networkx`` would see them in a graph built edge by edge.
+        """
+        # u -> v then v -> u for every edge; each edge is also a line of its own
+        sources = np.column_stack([u, v]).ravel().astype(np.int64)
+        targets = np.column_stack([v, u]).ravel().astype(np.int64)
+        return cls._build(node_ids, lat, lon, sources, targets, np.repeat(lengths, 2), np.repeat(ways, 2),
+                          way_tags, sources, np.arange(0, len(sources) + 1, 2))
+    
+    @classmethod
+    def _build(cls, node_ids: np.ndarray, lat: np.ndarray, lon: np.ndarray, u: np.ndarray, v: np.ndarray,
+               lengths: Optional[np.ndarray], ways: np.ndarray, way_tags: List[Dict[str, Any]],
+               line_nodes: np.ndarray, line_offsets: np.ndarray) -> 'RoutingGraph':
+        """Keep the largest weakly connected component and lay the edges out as CSR.
+        
+        ``u``/``v`` must be in insertion order; each node's edges keep the
+        order their targets were first seen, like networkx adjacency.
+        ``line_nodes`` split at ``line_offsets`` are the road node sequences,
+        with -1 for nodes missing from the file.
+        """
+        n = len(node_ids)
+        adjacency = coo_matrix((np.ones(len(u), dtype=np.int8), (u, v)), shape=(n, n))
+        _, labels = connected_components(adjacency, directed=True, connection='weak')
+        keep = labels == np.bincount(labels).argmax()
+        relabel = np.cumsum(keep) - 1
+        
+        kept = keep[u]
+        u, v, ways = relabel[u[kept]], relabel[v[kept]], ways[kept]
+        node_ids, lat, lon = node_ids[keep], lat[keep], lon[keep]
+        if lengths is None:
+            lengths = ox.distance.great_circle(lat[u], lon[u], lat[v], lon[v])
+            lengths[np.isnan(lengths)] = 0
+        else:
+            lengths = lengths[kept]
+        
+        # Group edges by source in insertion order, then merge parallel edges
+        # into the position of the first, with the length and way of the shortest
+        order = np.argsort(u, kind='stable')
+        u, v, lengths, ways = u[order], v[order], lengths[order], ways[order]
+        keys = u * len(node_ids) + v
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        ranked = np.lexsort((np.arange(len(u)), lengths, inverse))
+        shortest = ranked[np.flatnonzero(np.diff(inverse[ranked], prepend=-1))]
+        edges = np.sort(first)
+        merged = np.empty(len(first), dtype=np.int64)
+        merged[inverse[edges]] = np.arange(len(edges))
+        
+        # Parallel edges with other routing tags stay as alternatives, the
+        # shortest of each, since a profile may exclude or penalise the
+        # shortest one's way; those with the same tags can never be cheaper
+        edge_class = _way_classes(way_tags)[ways]
+        others = np.flatnonzero(edge_class != edge_class[shortest[inverse]])
+        others = others[np.lexsort((lengths[others], edge_class[others], inverse[others]))]
+        others = others[np.concatenate([[True], (np.diff(inverse[others]) != 0) | (np.diff(edge_class[others]) != 0)])
+                        if len(others) else np.zeros(0, dtype=bool)]
+        parallel_edges, parallel_lengths, parallel_ways = merged[inverse[others]], lengths[others], ways[others]
+        lengths, edge_ways = lengths[shortest[inverse[edges]]], ways[shortest[inverse[edges]]]
+        
+        indptr = np.zeros(len(node_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(u[edges], minlength=len(node_ids)), out=indptr[1:])
+        
+        # Road lines for drawing, cut into the runs of consecutive segments
+        # whose ends both lie inside the component
+        inside = (line_nodes >= 0) & keep[line_nodes.clip(min=0)]
+        line_of = np.repeat(np.arange(len(line_offsets) - 1), np.diff(line_offsets))
+        linked = np.concatenate([inside[:-1] & inside[1:] & (line_of[:-1] == line_of[1:]), [False]])
+        previous = np.concatenate([[False], linked[:-1]])
+        starts = np.flatnonzero(linked & ~previous)
+        ends = np.flatnonzero(linked & ~np.concatenate([linked[1:], [False]]))
+        sizes = ends - starts + 2
+        offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=offsets[1:])
+        flat = np.repeat(starts - offsets[:-1], sizes) + np.arange(offsets[-1])
+        
+        return cls(node_ids, lat, lon, indptr, v[edges].astype(np.int32), lengths, edge_ways.astype(np.int32),
+                   way_tags, relabel[line_nodes[flat]].astype(np.int32), offsets,
+                   parallel_edges, parallel_lengths, parallel_ways.astype(np.int32))
+    
+    def save(self, path: str):
+        """Write the arrays and way tags to an uncompressed .npz snapshot that ``load`` reads back without parsing XML."""
+        np.savez(path, node_ids=self.node_ids, lat=self.lat, lon=self.lon, indptr=self.indptr,
+                 targets=self.targets, lengths=self.lengths, edge_way=self.edge_way,
+                 line_nodes=self.line_nodes, line_offsets=self.line_offsets,
+                 parallel_edges=self.parallel_edges, parallel_lengths=self.parallel_lengths,
+                 parallel_ways=self.parallel_ways, way_tags=np.array(json.dumps(self.way_tags)))
+    
+    @classmethod
+    def load(cls, path: str) -> 'RoutingGraph':
+        """Read a graph written by ``save``; raises KeyError for snapshots without parallel edges."""
+        with np.load(path) as data:
+            return cls(data['node_ids'], data['lat'], data['lon'], data['indptr'], data['targets'], data['lengths'],
+                       data['edge_way'], json.loads(str(data['way_tags'])), data['line_nodes'], data['line_offsets'],
+                       data['parallel_edges'], data['parallel_lengths'], data['parallel_ways'])
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays."""
+        return sum(array.nbytes for array in (self.node_ids, self.lat, self.lon, self.indptr, self.targets,
+                                              self.lengths, self.edge_way, self.line_nodes, self.line_offsets,
+                                              self.parallel_edges, self.parallel_lengths, self.parallel_ways))
+    
+    def nearest(self, lats: List[float], lons: List[float]) -> np.ndarray:
+        """Nearest node index to each point by great-circle distance, as ox.distance.nearest_nodes."""
+        if self._index is None:
+            self._index = NodeIndex(np.arange(self.node_count), self.lat, self.lon)
+        return self._index.nearest(lats, lons)
+    
+    def way_factors(self, profile: str) -> np.ndarray:
+        """Cost factor of every way for a travel profile, inf where it is excluded."""
+        factors = [profile_factor(tags, profile) for tags in self.way_tags]
+        return np.array([EXCLUDED if factor is None else factor for factor in factors], dtype=np.float64)
+    
+    def edge_weights(self, way_factors: np.ndarray) -> np.ndarray:
+        """Length times way factor of every edge, the cheapest of its parallel edges; inf where all are excluded."""
+        weights = _weighted(self.lengths, way_factors[self.edge_way])
+        np.minimum.at(weights, self.parallel_edges, _weighted(self.parallel_lengths, way_factors[self.parallel_ways]))
+        return weights
+    
+    def to_networkx(self) -> nx.MultiDiGraph:
+        """Expand back into an osmnx-style MultiDiGraph keyed by OSM node id, for osmnx tooling."""
+        graph = nx.MultiDiGraph(crs="epsg:4326")
+        ids = self.node_ids.tolist()
+        graph.add_nodes_from((osm_id, {'y': y, 'x': x}) for osm_id, y, x in zip(ids, self.lat.tolist(), self.lon.tolist()))
+        sources = np.repeat(np.arange(self.node_count), np.diff(self.indptr))
+        for a, b, length, way in zip(sources.tolist(), self.targets.tolist(), self.lengths.tolist(), self.edge_way.tolist()):
+            graph.add_edge(ids[a], ids[b], length=length, **self.way_tags[way])
+        for k, length, way in zip(self.parallel_edges.tolist(), self.parallel_lengths.tolist(), self.parallel_ways.tolist()):
+            graph.add_edge(ids[sources[k]], ids[self.targets[k]], length=length, **self.way_tags[way])
+        return graph
+
+class SimplifiedGraph:
+    """Routing graph with degree-2 chains collapsed into single edges.
+    
+    Shares node numbering with its ``base`` RoutingGraph, so coordinates,
+    OSM ids and heuristics apply unchanged; only ``kept`` nodes (junctions,
+    dead ends, way changes and pinned nodes) have edges. Each edge is one
+    chain of base edges with their summed length, and its base node sequence
+    ``shape_nodes[shape_offsets[k]:shape_offsets[k+1]]`` keeps the geometry.
+    Every base edge lies in exactly one chain: ``base_edges`` lists the base
+    edges of chain k at ``shape_offsets[k] - k:shape_offsets[k+1] - k - 1``
+    and ``edge_chain`` maps each base edge back to its chain, so the edges
+    can be re-weighted without changing the topology.
+    """
+    
+    def __init__(self, base: RoutingGraph, kept: np.ndarray, indptr: np.ndarray, targets: np.ndarray,
+                 lengths: np.ndarray, edge_way: np.ndarray, shape_nodes: np.ndarray, shape_offsets: np.ndarray,
+                 base_edges: np.ndarray):
+        self.base = base
+        self.kept = kept
+        self.indptr = indptr
+        self.targets = targets
+        self.lengths = lengths
+        self.edge_way = edge_way
+        self.shape_nodes = shape_nodes
+        self.shape_offsets = shape_offsets
+        self.base_edges = base_edges
+        self.edge_chain = np.empty(base.edge_count, dtype=np.int32)
+        self.edge_chain[base_edges] = np.repeat(np.arange(len(targets), dtype=np.int32), np.diff(shape_offsets) - 1)
+    
+    @property
+    def node_count(self) -> int:
+        return int(self.kept.sum())
+    
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+    
+    @classmethod
+    def unsimplified(cls, base: RoutingGraph) -> 'SimplifiedGraph':
+        """Every base node kept and every edge its own two-node chain."""
+        sources = np.repeat(np.arange(base.node_count, dtype=np.int32), np.diff(base.indptr))
+        shape_nodes = np.column_stack([sources, base.targets]).ravel()
+        return cls(base, np.ones(base.node_count, dtype=bool), base.indptr, base.targets, base.lengths,
+                   base.edge_way, shape_nodes, np.arange(0, len(shape_nodes) + 1, 2), np.arange(base.edge_count))
+    
+    @classmethod
+    def from_routing(cls, base: RoutingGraph, pinned: Iterable[int] = ()) -> 'SimplifiedGraph':
+        """Collapse every chain of interior nodes between kept nodes into one edge.
+        
+        A node is interior when it has exactly two distinct neighbours, is
+        passed straight through (two-way both sides, or one edge in and one
+        out) and all its edges carry the same routing tags, so every chain can
+        still be weighted by its tags. Pinned nodes, such as snapped POIs, and
+        both ends of base edges with parallel alternatives are always kept, so
+        such an edge is a chain of its own and can take the cheapest
+        alternative under each profile.
+        Parallel chains between the same two nodes are split by keeping an
+        interior node of one of them, so no base edge is dropped and shortest
+        paths stay exact under any profile, closure or re-weighting.
+        """
+        pinned = list(pinned)
+        n = base.node_count
+        sources = np.repeat(np.arange(n), np.diff(base.indptr))
+        targets = base.targets.astype(np.int64)
+        
+        out_degree = np.bincount(sources, minlength=n)
+        in_degree = np.bincount(targets, minlength=n)
+        neighbours = np.bincount(np.unique(np.concatenate([sources * n + targets, targets * n + sources])) // n, minlength=n)
+        
+        # Ways with the same routing tags (ignoring id and name) may share a chain
+        way_class = _way_classes(base.way_tags)
+        classes = int(way_class.max()) + 1 if len(way_class) else 1
+        edge_class = way_class[base.edge_way]
+        node_classes = np.unique(np.concatenate([sources * classes + edge_class, targets * classes + edge_class]))
+        class_count = np.bincount(node_classes // classes, minlength=n)
+        
+        through = ((in_degree == 2) & (out_degree == 2)) | ((in_degree == 1) & (out_degree == 1))
+        kept = ~((neighbours == 2) & through & (class_count == 1))
+        kept[sources[sources == targets]] = True
+        kept[sources[base.parallel_edges]] = True
+        kept[targets[base.parallel_edges]] = True
+        kept[np.asarray(pinned, dtype=np.int64)] = True
+        
+        indptr, base_targets, base_lengths = base.indptr.tolist(), base.targets.tolist(), base.lengths.tolist()
+        base_ways = base.edge_way.tolist()
+        is_kept = kept.tolist()
+        visited = bytearray(n)
+        chains = {}
+        split = []
+        
+        def walk(start: int):
+            # Follow each outgoing edge through interior nodes to the next kept node
+            out = chains[start] = {}
+            for k in range(indptr[start], indptr[start + 1]):
+                previous, node = start, base_targets[k]
+                length = base_lengths[k]
+                shape, edges = [start, node], [k]
+                while not is_kept[node]:
+                    visited[node] = 1
+                    for j in range(indptr[node], indptr[node + 1]):
+                        if base_targets[j] != previous:
+                            break
+                    previous, node = node, base_targets[j]
+                    length += base_lengths[j]
+                    shape.append(node)
+                    edges.append(j)
+                if node in out:
+                    # The base graph has no parallel edges, so one of the two chains has an interior node
+                    split.append(shape[1] if len(shape) > 2 else out[node][2][1])
+                out[node] = (length, base_ways[k], shape, edges)
+        
+        for node in np.flatnonzero(kept).tolist():
+            walk(node)
+        
+        # Closed rings of interior nodes have no kept node to start from; keep one node of each
+        for node in range(n):
+            if not is_kept[node] and not visited[node] and indptr[node + 1] > indptr[node]:
+                is_kept[node] = True
+                kept[node] = True
+                pinned.append(node)
+                walk(node)
+        
+        if split:
+            # Drop this pass's chains first; at 10^6 nodes they hold gigabytes of Python objects
+            chains.clear()
+            return cls.from_routing(base, pinned + split)
+        
+        counts = np.zeros(n, dtype=np.int64)
+        edge_targets, edge_lengths, edge_ways, shape_nodes, shape_sizes, base_edges = [], [], [], [], [], []
+        for node in sorted(chains):
+            counts[node] = len(chains[node])
+            for target, (length, way, shape, edges) in chains[node].items():
+                edge_targets.append(target)
+                edge_lengths.append(length)
+                edge_ways.append(way)
+                shape_nodes.extend(shape)
+                shape_sizes.append(len(shape))
+                base_edges.extend(edges)
+        
+        simplified_indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=simplified_indptr[1:])
+        shape_offsets = np.zeros(len(shape_sizes) + 1, dtype=np.int64)
+        np.cumsum(shape_sizes, out=shape_offsets[1:])
+        return cls(base, kept, simplified_indptr, np.array(edge_targets, dtype=np.int32),
+                   np.array(edge_lengths, dtype=np.float64), np.array(edge_ways, dtype=np.int32),
+                   np.array(shape_nodes, dtype=np.int32), shape_offsets, np.array(base_edges, dtype=np.int64))
+    
+    def weights(self, way_factors: np.ndarray, edge_scale: Optional[np.ndarray] = None,
+                edges: Optional[np.ndarray] = None) -> np.ndarray:
+        """Edge weights for per-way cost factors: length times factor, inf where excluded.
+        
+        Chains never mix routing tags, so one factor applies to the whole edge;
+        a base edge with parallel alternatives is a chain of its own and takes
+        the cheapest of them. ``edge_scale`` multiplies the length of each
+        base edge (inf closes it); ``edges`` limits the result to those search edges.
+        """
+        edges = np.arange(self.edge_count) if edges is None else np.asarray(edges, dtype=np.int64)
+        factors = way_factors[self.edge_way[edges]]
+        lengths = self.lengths[edges]
+        if edge_scale is not None and len(edges):
+            # Sum the scaled base edges of every chain that has a scaled one
+            sizes = self.shape_offsets[edges + 1] - self.shape_offsets[edges] - 1
+            offsets = np.zeros(len(edges) + 1, dtype=np.int64)
+            np.cumsum(sizes, out=offsets[1:])
+            flat = np.repeat(self.shape_offsets[edges] - edges - offsets[:-1], sizes) + np.arange(offsets[-1])
+            segments = self.base_edges[flat]
+            scale = edge_scale[segments]
+            closed = np.logical_or.reduceat(np.isinf(scale), offsets[:-1])
+            scaled = np.add.reduceat(self.base.lengths[segments] * np.where(np.isinf(scale), 0, scale), offsets[:-1])
+            unscaled = np.logical_and.reduceat(scale == 1, offsets[:-1])
+            lengths = np.where(unscaled, lengths, scaled)
+            factors = np.where(closed, EXCLUDED, factors)
+        weights = _weighted(lengths, factors)
+        
+        if len(self.base.parallel_edges) and len(edges):
+            firsts = self.base_edges[self.shape_offsets[edges] - edges]
+            parallel = np.isin(firsts, self.base.parallel_edges)
+            if parallel.any():
+                cheapest = self.base.edge_weights(way_factors)[firsts[parallel]]
+                if edge_scale is not None:
+                    scale = edge_scale[firsts[parallel]]
+                    cheapest = np.where(np.isinf(scale), EXCLUDED, cheapest * scale)
+                weights[parallel] = cheapest
+        return weights
 
 class CampusPathfinder:
-    def __init__(self, osm_file_path: str):
+    def __init__(self, osm_file_path: str, registry: Optional[LocationRegistry] = None, simplify: bool = True):
         """Initialize the pathfinder with OSM data."""
-        self.graph = ox.graph_from_xml(osm_file_path, simplify=False)
-        self.nodes, self.edges = ox.graph_to_gdfs(self.graph)
-        self.center = (self.nodes.geometry.y.mean(), self.nodes.geometry.x.mean())
-        
-        # Points of Interest with coordinates (lat, lon)
-        self.POIS = {
-            "Flag post": (13.22169, 77.75495),
-            "Entry gate": (13.22020, 77.75417),
-            "Exit gate": (13.22017, 77.75508),
-            "Check post 1": (13.22140, 77.75507),
-            "Check post 2": (13.22128, 77.75528),
-            "Acad 1": (13.22218, 77.75537),
-            "Acad 2": (13.22339, 77.75595),
-            "Library": (13.22199, 77.75540),
-            "Food Court": (13.22488, 77.75716),
-            "Faculty Block": (13.22359, 77.75726),
-            "Hostel Block": (13.22458, 77.75886),
-            "Cricket Ground": (13.22898, 77.75718),
-            "Basket Ball": (13.22883, 77.75813),
-            "Volley Ball": (13.22869, 77.75856),
-            "Tennis Ball": (13.22840, 77.75837),
-            "Foot Ball": (13.22769, 77.75642),
-            "Rest Area": (13.22834, 77.75775)
-        }
+        self._load(RoutingGraph.from_osm(osm_file_path), registry, simplify)
+    
+    @classmethod
+    def from_graph(cls, graph: nx.MultiDiGraph, registry: Optional[LocationRegistry] = None,
+                   simplify: bool = True) -> 'CampusPathfinder':
+        """Build a pathfinder over an existing osmnx-style graph, e.g. a synthetic one."""
+        return cls.from_routing(RoutingGraph.from_networkx(graph), registry, simplify)
+    
+    @classmethod
+    def from_routing(cls, routing: RoutingGraph, registry: Optional[LocationRegistry] = None,
+                     simplify: bool = True) -> 'CampusPathfinder':
+        """Build a pathfinder over a loaded routing graph, e.g. one read from a snapshot."""
+        pathfinder = cls.__new__(cls)
+        pathfinder._load(routing, registry, simplify)
+        return pathfinder
+    
+    def _load(self, routing: RoutingGraph, registry: Optional[LocationRegistry], simplify: bool = True):
+        """Set up the routing graph, POIs and their snapped nodes.
+        
+        Graph nodes are routing graph indices; ``routing.node_ids`` maps them
+        to OSM ids. Searches run on ``search_graph``, where degree-2 chains are
+        collapsed unless ``simplify`` is off; snapped POIs are always kept as
+        nodes. Edge weights and POI snapping are computed here once per travel
+        profile. The search loops read plain-list copies of the arrays, which
+        index faster than numpy from Python.
+        """
+        self.routing = routing
+        self._lat = routing.lat.tolist()
+        self._lon = routing.lon.tolist()
+        self.center = (float(routing.lat.mean()), float(routing.lon.mean()))
+        
+        # Points of Interest with coordinates (lat, lon) from the location registry
+        self.registry = registry if registry is not None else LocationRegistry.default()
+        self.POIS = self.registry.pois()
+        
+        # Per profile: way cost factors, the nodes touching an edge the profile
+        # may use, and a nearest-node index over them for snapping POIs
+        sources = np.repeat(np.arange(routing.node_count), np.diff(routing.indptr))
+        self._way_factors, self._usable, self._snap_indexes = {}, {}, {}
+        for profile in PROFILES:
+            self._way_factors[profile] = routing.way_factors(profile)
+            allowed = ~np.isinf(routing.edge_weights(self._way_factors[profile]))
+            usable = np.zeros(routing.node_count, dtype=bool)
+            usable[sources[allowed]] = True
+            usable[routing.targets[allowed]] = True
+            self._usable[profile] = usable if usable.any() else np.ones(routing.node_count, dtype=bool)
+            self._snap_indexes[profile] = NodeIndex(np.flatnonzero(self._usable[profile]), routing.lat, routing.lon)
+        
+        # Runtime closures and weight changes: a length multiplier per base edge, inf when closed
+        self._edge_scale = np.ones(routing.edge_count)
+        self._osm_index = None
+        
+        self._simplify = simplify
+        self._build_search_graph(self._snap_pois())
         
         # Walking speed in meters per second (average human walking speed)
-        self.WALKING_SPEED = 1.4
+        self.WALKING_SPEED = PROFILES["walking"]["speed"]
+        
+        # Streaming search batches: at least STREAM_MIN_BATCH explored nodes per
+        # event, scaled so a full exploration emits about STREAM_TARGET_EVENTS events
+        self.STREAM_MIN_BATCH = 16
+        self.STREAM_TARGET_EVENTS = 100
+        
+        # Collect search counters in every find_path call (off by default)
+        self.INSTRUMENT_SEARCH = False
+        
+        # Worker processes for comparisons, started on first use and retired
+        # (without cancelling running work) once this pathfinder is replaced
+        self._compare_pool = None
+        self._compare_lock = threading.Lock()
+        self._retired = False
+    
+    def _snap_pois(self) -> set:
+        """Snap every registry location to its nearest usable node of each profile.
+        
+        Replaces ``registry`` with a copy recording the default profile's
+        nodes, so a registry shared with other pathfinders is never changed,
+        and returns every snapped node, which the search graph must keep.
+        """
+        names = list(self.POIS)
+        lats, lons = [self.POIS[n][0] for n in names], [self.POIS[n][1] for n in names]
+        snapped = {}
+        for profile, index in self._snap_indexes.items():
+            nodes = index.nearest(lats, lons).tolist() if names else []
+            snapped[profile] = {self.POIS[n]: node for n, node in zip(names, nodes)}
+        self._snapped = snapped
+        
+        default_nodes = [snapped[DEFAULT_PROFILE][self.POIS[n]] for n in names]
+        self.registry = self.registry.with_nodes({self.registry.resolve(n): int(self.routing.node_ids[node])
+                                                  for n, node in zip(names, default_nodes)})
+        return {node for nodes in snapped.values() for node in nodes.values()}
+    
+    def _build_search_graph(self, pinned: set):
+        """Build the search graph keeping the pinned nodes, and its per-profile weights."""
+        routing = self.routing
+        self.search_graph = SimplifiedGraph.from_routing(routing, pinned) if self._simplify else SimplifiedGraph.unsimplified(routing)
+        self._indptr = self.search_graph.indptr.tolist()
+        self._targets = self.search_graph.targets.tolist()
+        self._lengths = self.search_graph.lengths.tolist()
+        self._shape_nodes = self.search_graph.shape_nodes.tolist()
+        self._shape_offsets = self.search_graph.shape_offsets.tolist()
+        self._weights = {profile: self.search_graph.weights(factors, self._edge_scale).tolist()
+                         for profile, factors in self._way_factors.items()}
+        self._node_indexes = {}
+    
+    def with_registry(self, registry: LocationRegistry) -> 'CampusPathfinder':
+        """Copy of this pathfinder serving the locations of ``registry``, e.g. a reloaded POI file, without reparsing the map.
+        
+        Only POI-dependent state is rebuilt on the copy: the POI table, its
+        snapped nodes and name index. The search graph is rebuilt only when a
+        new POI snaps to a node inside a collapsed chain; otherwise it is
+        shared. This pathfinder and its registry are left unchanged for
+        requests still using them.
+        """
+        pathfinder = copy.copy(self)
+        pathfinder.registry = registry
+        pathfinder.POIS = registry.pois()
+        pathfinder._node_indexes = dict(self._node_indexes)
+        pinned = pathfinder._snap_pois()
+        if not pathfinder.search_graph.kept[list(pinned)].all():
+            pathfinder._build_search_graph(pinned)
+        return pathfinder
+    
+    def memory_bytes(self) -> int:
+        """Rough memory held by the graph: its arrays, nearest-node indexes, way
+        tags and snapped points, plus the list copies the searches read.
+        
+        Each list slot is counted as a pointer and a float or int object;
+        small ints shared by the interpreter make this an overestimate. The
+        way tags and snapped points are sized with sys.getsizeof, dicts and
+        their keys and values, without following nested containers.
+        """
+        routing, search_graph = self.routing, self.search_graph
+        arrays = routing.nbytes + sum(array.nbytes for array in (
+            search_graph.kept, search_graph.indptr, search_graph.targets, search_graph.lengths, search_graph.edge_way,
+            search_graph.shape_nodes, search_graph.shape_offsets, search_graph.base_edges, search_graph.edge_chain,
+            self._edge_scale))
+        arrays += sum(mask.nbytes for mask in self._usable.values())
+        arrays += sum(factors.nbytes for factors in self._way_factors.values())
+        indexes = list(self._snap_indexes.values()) + list(self._node_indexes.values())
+        if routing._index is not None:
+            indexes.append(routing._index)
+        arrays += sum(index.nbytes for index in indexes)
+        slots = len(self._lat) + len(self._lon) + len(self._indptr) + len(self._targets) + len(self._lengths)
+        slots += len(self._shape_nodes) + len(self._shape_offsets) + sum(len(weights) for weights in self._weights.values())
+        objects = sys.getsizeof(routing.way_tags) + sum(_dict_bytes(tags) for tags in routing.way_tags)
+        # Snapped points are (lat, lon) tuples of two floats mapped to a node
+        objects += sum(_dict_bytes(snapped) + len(snapped) * 2 * sys.getsizeof(0.0) for snapped in self._snapped.values())
+        return arrays + slots * 32 + objects
+    
+    def base_edges(self, edges: Iterable[Tuple[int, int]], both_ways: bool = True) -> np.ndarray:
+        """Routing graph edge indices of (u, v) OSM node id pairs, with their reverse edges if ``both_ways``."""
+        routing = self.routing
+        if self._osm_index is None:
+            self._osm_index = {osm_id: i for i, osm_id in enumerate(routing.node_ids.tolist())}
+        index = self._osm_index
+        found = []
+        for u, v in edges:
+            if u not in index or v not in index:
+                raise KeyError(f"Unknown edge: {u} -> {v}")
+            pairs = [(index[u], index[v]), (index[v], index[u])] if both_ways else [(index[u], index[v])]
+            matched = [k for a, b in pairs for k in range(routing.indptr[a], routing.indptr[a + 1]) if routing.targets[k] == b]
+            if not matched:
+                raise KeyError(f"Unknown edge: {u} -> {v}")
+            found.extend(matched)
+        return np.unique(np.asarray(found, dtype=np.int64))
+    
+    def way_edges(self, way_id: int) -> np.ndarray:
+        """Routing graph edge indices of every edge along an OSM way."""
+        ways = [i for i, tags in enumerate(self.routing.way_tags) if tags.get('osmid') == way_id]
+        if not ways:
+            raise KeyError(f"Unknown way: {way_id}")
+        return np.flatnonzero(np.isin(self.routing.edge_way, ways))
+    
+    def search_edges(self, edges: np.ndarray) -> np.ndarray:
+        """Search graph edges whose chains contain the given routing graph edges."""
+        return np.unique(self.search_graph.edge_chain[np.asarray(edges, dtype=np.int64)])
+    
+    def with_edge_scale(self, edges: np.ndarray, scale: float) -> 'CampusPathfinder':
+        """Copy of this pathfinder with routing graph edges' lengths multiplied by ``scale``.
+        
+        EXCLUDED closes the edges and 1 restores them. Scales below 1 are
+        rejected: they would make an edge shorter than its straight-line
+        distance and the A* heuristic inadmissible. The copy shares the
+        search graph and gets its own edge scales and weight lists, in which
+        only the search edges containing the changed edges are re-weighted.
+        This pathfinder is left unchanged for requests still using it.
+        """
+        pathfinder = copy.copy(self)
+        pathfinder._edge_scale = self._edge_scale.copy()
+        pathfinder._weights = {profile: list(weights) for profile, weights in self._weights.items()}
+        pathfinder._apply_edge_scale(edges, scale)
+        return pathfinder
+    
+    def with_closed_edges(self, edges: Iterable[Tuple[int, int]], both_ways: bool = True) -> 'CampusPathfinder':
+        """Copy with (u, v) OSM node id pairs closed to every profile, e.g. for construction or events."""
+        return self.with_edge_scale(self.base_edges(edges, both_ways), EXCLUDED)
+    
+    def with_reopened_edges(self, edges: Iterable[Tuple[int, int]], both_ways: bool = True) -> 'CampusPathfinder':
+        """Copy with (u, v) OSM node id pairs reopened at their normal weight."""
+        return self.with_edge_scale(self.base_edges(edges, both_ways), 1.0)
+    
+    def _apply_edge_scale(self, edges: np.ndarray, scale: float) -> int:
+        # In place: only for pathfinders no request can see yet
+        edges = np.asarray(edges, dtype=np.int64)
+        if scale != EXCLUDED and not scale >= 1:
+            raise ValueError(f"Edge scale must be at least 1 to keep A* exact: {scale}")
+        self._edge_scale[edges] = scale
+        chains = self.search_edges(edges)
+        for profile, factors in self._way_factors.items():
+            weights = self._weights[profile]
+            for k, weight in zip(chains.tolist(), self.search_graph.weights(factors, self._edge_scale, chains).tolist()):
+                weights[k] = weight
+        return len(chains)
+    
+    def edge_overrides(self) -> Dict[Tuple[int, int], float]:
+        """Current closures (EXCLUDED) and weight multipliers by (u, v) OSM node id pair."""
+        routing = self.routing
+        changed = np.flatnonzero(self._edge_scale != 1)
+        sources = np.searchsorted(routing.indptr, changed, side='right') - 1
+        return {(int(routing.node_ids[u]), int(routing.node_ids[routing.targets[k]])): float(self._edge_scale[k])
+                for u, k in zip(sources.tolist(), changed.tolist())}
+    
+    def restore_edge_overrides(self, overrides: Dict[Tuple[int, int], float]) -> int:
+        """Re-apply ``edge_overrides()`` from another map version, skipping edges that no longer exist.
+        
+        Changes this pathfinder in place, so it is only called on freshly
+        built pathfinders before they are published.
+        """
+        by_scale = {}
+        for (u, v), scale in overrides.items():
+            try:
+                by_scale.setdefault(scale, []).extend(self.base_edges([(u, v)], both_ways=False).tolist())
+            except KeyError:
+                continue
+        for scale, edges in by_scale.items():
+            self._apply_edge_scale(edges, scale)
+        return sum(len(edges) for edges in by_scale.values())
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Process pools and locks cannot be pickled; copies and workers start their own when needed
+        state = self.__dict__.copy()
+        state['_compare_pool'] = None
+        state['_retired'] = False
+        del state['_compare_lock']
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._compare_lock = threading.Lock()
+    
+    @property
+    def POIS(self) -> POIDict:
+        """Points of interest by display name; mutations rebuild derived indexes lazily."""
+        return self._pois
+    
+    @POIS.setter
+    def POIS(self, pois: Dict[str, Tuple[float, float]]):
+        self._pois = POIDict(pois)
+    
+    def nearest_node(self, latlon: Tuple[float, float], profile: str = DEFAULT_PROFILE) -> int:
+        """Search graph node nearest to a (lat, lon) that the profile can leave or reach.
+        
+        Registry locations are pre-snapped; other points are snapped once and remembered.
+        """
+        snapped = self._snapped[profile]
+        node = snapped.get(latlon)
+        if node is None:
+            index = self._node_indexes.get(profile)
+            if index is None:
+                candidates = np.flatnonzero(self.search_graph.kept & self._usable[profile])
+                index = self._node_indexes[profile] = NodeIndex(candidates, self.routing.lat, self.routing.lon)
+            node = snapped[latlon] = int(index.nearest([latlon[0]], [latlon[1]])[0])
+        return node
+    
+    def node_coords(self, nodes: List[int]) -> List[Tuple[float, float]]:
+        """(lat, lon) of each graph node."""
+        return [(self._lat[n], self._lon[n]) for n in nodes]
+    
+    def expand_path(self, path: List[int]) -> List[int]:
+        """Full routing graph nodes along a search graph path, following each edge's geometry."""
+        if not path:
+            return path
+        nodes = [path[0]]
+        for u, v in zip(path, path[1:]):
+            k = self.edge_index(u, v)
+            nodes.extend(self._shape_nodes[self._shape_offsets[k] + 1:self._shape_offsets[k + 1]])
+        return nodes
     
     def euclidean_heuristic(self, node1: int, node2: int) -> float:
         """Calculate Euclidean distance heuristic for A*."""
-        y1, x1 = self.graph.nodes[node1]['y'], self.graph.nodes[node1]['x']
-        y2, x2 = self.graph.nodes[node2]['y'], self.graph.nodes[node2]['x']
+        y1, x1 = self._lat[node1], self._lon[node1]
+        y2, x2 = self._lat[node2], self._lon[node2]
         return math.dist([y1, x1], [y2, x2]) * 111000  # Convert to meters
     
     def manhattan_heuristic(self, node1: int, node2: int) -> float:
         """Calculate Manhattan distance heuristic for A*."""
-        y1, x1 = self.graph.nodes[node1]['y'], self.graph.nodes[node1]['x']
-        y2, x2 = self.graph.nodes[node2]['y'], self.graph.nodes[node2]['x']
+        y1, x1 = self._lat[node1], self._lon[node1]
+        y2, x2 = self._lat[node2], self._lon[node2]
         return (abs(y1 - y2) + abs(x1 - x2)) * 111000  # Convert to meters
     
     def combined_heuristic(self, node1: int, node2: int) -> float:
@@ -61,130 +1072,211 @@ class CampusPathfinder:
         """Default heuristic (Euclidean distance) for backward compatibility."""
         return self.euclidean_heuristic(node1, node2)
     
-    def bfs_osm(self, start: int, end: int) -> Tuple[Optional[List[int]], set]:
-        """Breadth-First Search implementation."""
-        frontier = deque([[start]])
-        explored = set()
+    def _search_loop(self, start: int, end: int, algorithm: str, profile: str = DEFAULT_PROFILE,
+                     instrumentation: Optional[SearchInstrumentation] = None,
+                     batch_size: int = 0) -> Iterator[Dict[str, Any]]:
+        """The one search loop behind every algorithm, as a generator.
         
-        while frontier:
-            path = frontier.popleft()
-            node = path[-1]
-            
-            if node == end:
-                return path, explored
-            
-            if node not in explored:
-                explored.add(node)
-                for nbr in self.graph.neighbors(node):
-                    if nbr not in explored:
-                        frontier.append(path + [nbr])
+        BFS and DFS take paths from a FIFO or LIFO frontier; UCS and the A*
+        variants from a heap ordered by cost plus heuristic. Instrumentation
+        counts and traces the search, and a ``batch_size`` makes it yield an
+        explored/frontier batch every that many expansions. Without either
+        it never yields and only pays one flag test per expansion and per
+        pushed neighbor. Returns (path, cost, explored, pushes) through
+        StopIteration.
+        """
+        indptr, targets, weights = self._indptr, self._targets, self._weights[profile]
+        best_first = algorithm not in ("BFS", "DFS")
+        # UCS is best-first without a heuristic
+        heuristic = self._heuristic_for(algorithm) if best_first and algorithm != "UCS" else None
         
-        return None, explored
-    
-    def dfs_osm(self, start: int, end: int) -> Tuple[Optional[List[int]], set]:
-        """Depth-First Search implementation."""
-        frontier = [[start]]
+        # Frontier entries are (priority, cost so far, path) for every algorithm
+        if best_first:
+            frontier = [(heuristic(start, end) if heuristic else 0, 0, [start])]
+            pop = partial(heapq.heappop, frontier)
+            push = partial(heapq.heappush, frontier)
+        else:
+            frontier = deque([(0, 0, [start])])
+            pop = frontier.popleft if algorithm == "BFS" else frontier.pop
+            push = frontier.append
+        
+        inst = instrumentation
+        counting = inst is not None
+        on_expand = inst.on_expand if counting else None
+        on_relax = inst.on_relax if counting else None
+        streaming = batch_size > 0
+        tracking = counting or streaming
         explored = set()
+        # Nodes expanded and pushed since the last streamed batch
+        batch, pushed = ([], []) if streaming else (None, None)
+        pushes = 0
+        if counting:
+            inst.pushes += 1
+            inst.max_frontier = max(inst.max_frontier, 1)
         
+        path = None
         while frontier:
-            path = frontier.pop()
+            f, g, path = pop()
             node = path[-1]
+            if counting:
+                inst.pops += 1
             
             if node == end:
-                return path, explored
+                break
             
-            if node not in explored:
-                explored.add(node)
-                for nbr in self.graph.neighbors(node):
-                    if nbr not in explored:
-                        frontier.append(path + [nbr])
+            if node in explored:
+                if counting:
+                    inst.stale_pops += 1
+                continue
+            
+            explored.add(node)
+            if on_expand:
+                on_expand(node, g if best_first else len(path) - 1)
+            for k in range(indptr[node], indptr[node + 1]):
+                nbr = targets[k]
+                if nbr not in explored and weights[k] != EXCLUDED:
+                    new_g = g + weights[k]
+                    push((new_g + heuristic(nbr, end) if heuristic else new_g, new_g, path + [nbr]))
+                    if tracking:
+                        pushes += 1
+                        if counting:
+                            inst.pushes += 1
+                            inst.relaxations += 1
+                            if on_relax:
+                                on_relax(node, nbr, new_g if best_first else len(path))
+                        if streaming:
+                            pushed.append(nbr)
+            if tracking:
+                if counting and len(frontier) > inst.max_frontier:
+                    inst.max_frontier = len(frontier)
+                if streaming:
+                    batch.append(node)
+                    if len(batch) >= batch_size:
+                        yield _batch_event(batch, pushed, len(frontier), len(explored))
+        else:
+            path = None
         
-        return None, explored
+        if streaming and batch:
+            yield _batch_event(batch, pushed, len(frontier), len(explored))
+        if path is None:
+            return None, None, explored, pushes
+        # BFS and DFS ignore weights while searching; their cost is the path's weight
+        return path, g if best_first else self.path_cost(path, profile), explored, pushes
+    
+    def _run_search(self, start: int, end: int, algorithm: str, profile: str = DEFAULT_PROFILE,
+                    instrumentation: Optional[SearchInstrumentation] = None) -> Tuple[Optional[List[int]], Optional[float], set]:
+        """Run the search loop to completion, returning (path, cost, explored)."""
+        try:
+            next(self._search_loop(start, end, algorithm, profile, instrumentation))
+        except StopIteration as done:
+            return done.value[:3]
+        raise RuntimeError("Search loop yielded without a batch size")
+    
+    def bfs_osm(self, start: int, end: int, profile: str = DEFAULT_PROFILE) -> Tuple[Optional[List[int]], set]:
+        """Breadth-First Search implementation."""
+        path, _, explored = self._run_search(start, end, "BFS", profile)
+        return path, explored
+    
+    def dfs_osm(self, start: int, end: int, profile: str = DEFAULT_PROFILE) -> Tuple[Optional[List[int]], set]:
+        """Depth-First Search implementation."""
+        path, _, explored = self._run_search(start, end, "DFS", profile)
+        return path, explored
     
-    def ucs_osm(self, start: int, end: int) -> Tuple[Optional[List[int]], Optional[float], set]:
+    def ucs_osm(self, start: int, end: int, profile: str = DEFAULT_PROFILE) -> Tuple[Optional[List[int]], Optional[float], set]:
         """Uniform Cost Search implementation."""
-        frontier = [(0, [start])]
-        explored = set()
-        
-        while frontier:
-            cost, path = heapq.heappop(frontier)
-            node = path[-1]
-            
-            if node == end:
-                return path, cost, explored
-            
-            if node not in explored:
-                explored.add(node)
-                for nbr in self.graph.neighbors(node):
-                    if nbr not in explored:
-                        edge_data = self.graph.get_edge_data(node, nbr)
-                        if edge_data:
-                            weight = min([d.get('length', 1) for d in edge_data.values()])
-                            heapq.heappush(frontier, (cost + weight, path + [nbr]))
-        
-        return None, None, explored
-    
-    def astar_osm(self, start: int, end: int, heuristic_type: str = "euclidean") -> Tuple[Optional[List[int]], Optional[float], set]:
+        return self._run_search(start, end, "UCS", profile)
+    
+    def astar_osm(self, start: int, end: int, heuristic_type: str = "euclidean",
+                  profile: str = DEFAULT_PROFILE) -> Tuple[Optional[List[int]], Optional[float], set]:
         """A* Search implementation with selectable heuristic."""
-        # Select heuristic function
-        if heuristic_type == "manhattan":
-            heuristic_func = self.manhattan_heuristic
-        elif heuristic_type == "combined":
-            heuristic_func = self.combined_heuristic
-        else:  # default to euclidean
-            heuristic_func = self.euclidean_heuristic
-        
-        frontier = [(heuristic_func(start, end), 0, [start])]
-        explored = set()
-        
-        while frontier:
-            f, g, path = heapq.heappop(frontier)
-            node = path[-1]
-            
-            if node == end:
-                return path, g, explored
-            
-            if node not in explored:
-                explored.add(node)
-                for nbr in self.graph.neighbors(node):
-                    if nbr not in explored:
-                        edge_data = self.graph.get_edge_data(node, nbr)
-                        if edge_data:
-                            weight = min([d.get('length', 1) for d in edge_data.values()])
-                            new_g = g + weight
-                            new_f = new_g + heuristic_func(nbr, end)
-                            heapq.heappush(frontier, (new_f, new_g, path + [nbr]))
-        
-        return None, None, explored
-    
-    def astar_euclidean(self, start: int, end: int) -> Tuple[Optional[List[int]], Optional[float], set]:
+        algorithm = {"manhattan": "A* (Manhattan)", "combined": "A* (Combined)"}.get(heuristic_type, "A*")
+        return self._run_search(start, end, algorithm, profile)
+    
+    def astar_euclidean(self, start: int, end: int, profile: str = DEFAULT_PROFILE) -> Tuple[Optional[List[int]], Optional[float], set]:
         """A* with Euclidean heuristic."""
-        return self.astar_osm(start, end, "euclidean")
+        return self.astar_osm(start, end, "euclidean", profile)
     
-    def astar_manhattan(self, start: int, end: int) -> Tuple[Optional[List[int]], Optional[float], set]:
+    def astar_manhattan(self, start: int, end: int, profile: str = DEFAULT_PROFILE) -> Tuple[Optional[List[int]], Optional[float], set]:
         """A* with Manhattan heuristic."""
-        return self.astar_osm(start, end, "manhattan")
+        return self.astar_osm(start, end, "manhattan", profile)
     
-    def astar_combined(self, start: int, end: int) -> Tuple[Optional[List[int]], Optional[float], set]:
+    def astar_combined(self, start: int, end: int, profile: str = DEFAULT_PROFILE) -> Tuple[Optional[List[int]], Optional[float], set]:
         """A* with combined heuristic."""
-        return self.astar_osm(start, end, "combined")
+        return self.astar_osm(start, end, "combined", profile)
+    
+    def iter_search(self, start: int, end: int, algorithm: str, batch_size: Optional[int] = None,
+                    profile: str = DEFAULT_PROFILE) -> Iterator[Dict[str, Any]]:
+        """Run a search step by step, yielding explored/frontier batches.
+        
+        Uses the same loop as search(), so nodes are expanded in exactly the
+        same order. Yields ``{'type': 'batch', ...}`` events every
+        ``batch_size`` expansions and a final ``{'type': 'done', ...}`` event
+        carrying the path, cost, explored set and total frontier pushes.
+        """
+        if batch_size is None:
+            batch_size = max(self.STREAM_MIN_BATCH, self.search_graph.node_count // self.STREAM_TARGET_EVENTS)
+        path, cost, explored, pushes = yield from self._search_loop(start, end, algorithm, profile, batch_size=max(1, batch_size))
+        yield {'type': 'done', 'path': path, 'cost': cost, 'explored': explored, 'pushes': pushes}
+    
+    def search(self, start: int, end: int, algorithm: str, instrumentation: Optional[SearchInstrumentation] = None,
+               profile: str = DEFAULT_PROFILE) -> Tuple[Optional[List[int]], Optional[float], set]:
+        """Run the named algorithm between two graph nodes, returning (path, cost, explored).
+        
+        The cost is in the profile's weights (metres scaled by its cost
+        factors). ``instrumentation`` collects counters and tracing callbacks.
+        """
+        return self._run_search(start, end, algorithm, profile, instrumentation)
+    
+    def instrumented_search(self, start: int, end: int, algorithm: str, instrumentation: SearchInstrumentation,
+                            profile: str = DEFAULT_PROFILE) -> Tuple[Optional[List[int]], Optional[float], set]:
+        """Run the named algorithm with counters and callbacks."""
+        return self._run_search(start, end, algorithm, profile, instrumentation)
+    
+    def _heuristic_for(self, algorithm: str) -> Callable[[int, int], float]:
+        """Heuristic used by a best-first algorithm; UCS uses none."""
+        if algorithm == "UCS":
+            return lambda node1, node2: 0
+        elif algorithm == "A* (Manhattan)":
+            return self.manhattan_heuristic
+        elif algorithm == "A* (Combined)":
+            return self.combined_heuristic
+        else:  # A* and A* (Euclidean)
+            return self.euclidean_heuristic
     
     def calculate_path_distance(self, path: List[int]) -> float:
         """Calculate total distance of a path in meters."""
         total_distance = 0.0
         
         for i in range(len(path) - 1):
-            edge_data = self.graph.get_edge_data(path[i], path[i + 1])
-            if edge_data:
-                weight = min([d.get('length', 0) for d in edge_data.values()])
-                total_distance += weight
+            total_distance += self.edge_length(path[i], path[i + 1])
         
         return total_distance
     
+    def edge_length(self, u: int, v: int) -> float:
+        """Length of the edge u -> v in meters, 0 if there is none."""
+        k = self.edge_index(u, v)
+        return self._lengths[k] if k >= 0 else 0.0
+    
+    def path_cost(self, path: List[int], profile: str = DEFAULT_PROFILE) -> float:
+        """Total weight of a path under a travel profile."""
+        weights = self._weights[profile]
+        return sum(weights[self.edge_index(u, v)] for u, v in zip(path, path[1:]))
+    
+    def edge_index(self, u: int, v: int) -> int:
+        """Position of the search graph edge u -> v, -1 if there is none."""
+        for k in range(self._indptr[u], self._indptr[u + 1]):
+            if self._targets[k] == v:
+                return k
+        return -1
+    
     def calculate_walking_time(self, distance: float) -> float:
         """Calculate estimated walking time in minutes."""
         return (distance / self.WALKING_SPEED) / 60  # Convert to minutes
     
+    def calculate_travel_time(self, distance: float, profile: str = DEFAULT_PROFILE) -> float:
+        """Estimated travel time in minutes at the profile's speed."""
+        return (distance / PROFILES[profile]["speed"]) / 60
+    
     def get_location_info(self, location_name: str) -> Dict[str, Any]:
         """Get information about a specific location."""
         coordinates = self.POIS.get(location_name, (0, 0))
@@ -197,30 +1289,14 @@ class CampusPathfinder:
     
     def _categorize_location(self, location_name: str) -> str:
         """Categorize location by type."""
-        academic = ['Acad 1', 'Acad 2', 'Library']
-        facilities = ['Food Court', 'Faculty Block', 'Hostel Block']
-        sports = ['Cricket Ground', 'Basket Ball', 'Volley Ball', 'Tennis Ball', 'Foot Ball']
-        security = ['Entry gate', 'Exit gate', 'Check post 1', 'Check post 2']
-        
-        if location_name in academic:
-            return "Academic"
-        elif location_name in facilities:
-            return "Facility"
-        elif location_name in sports:
-            return "Sports"
-        elif location_name in security:
-            return "Security"
-        else:
-            return "Other"
+        return self.registry.category(location_name)
     
     def create_base_map(self) -> folium.Map:
         """Create a base map with all roads and POIs."""
         m = folium.Map(location=self.center, zoom_start=17)
         
         # Add all roads in gray
-        for _, row in self.edges.iterrows():
-            coords = [(lat, lon) for lon, lat in row.geometry.coords]
-            folium.PolyLine(coords, color="gray", weight=2, opacity=0.4).add_to(m)
+        self._add_roads(m)
         
         # Add POI markers
         for name, (lat, lon) in self.POIS.items():
@@ -233,31 +1309,31 @@ class CampusPathfinder:
         
         return m
     
-    def find_path(self, start_name: str, end_name: str, algorithm: str) -> Dict[str, Any]:
-        """Find path between two locations using specified algorithm."""
+    def _add_roads(self, m: folium.Map):
+        """Draw every road of the routing graph in gray."""
+        nodes = self.routing.line_nodes.tolist()
+        offsets = self.routing.line_offsets.tolist()
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            folium.PolyLine(self.node_coords(nodes[start:end]), color="gray", weight=2, opacity=0.4).add_to(m)
+    
+    def find_path(self, start_name: str, end_name: str, algorithm: str,
+                  instrumentation: Optional[SearchInstrumentation] = None,
+                  profile: str = DEFAULT_PROFILE) -> Dict[str, Any]:
+        """Find path between two locations using specified algorithm.
+        
+        Edges are weighted and excluded by the travel ``profile``. Search
+        counters are added to the metrics when ``instrumentation`` is given or
+        INSTRUMENT_SEARCH is set.
+        """
+        if instrumentation is None and self.INSTRUMENT_SEARCH:
+            instrumentation = SearchInstrumentation()
         start_latlon = self.POIS[start_name]
         end_latlon = self.POIS[end_name]
         
-        start_node = ox.distance.nearest_nodes(self.graph, start_latlon[1], start_latlon[0])
-        end_node = ox.distance.nearest_nodes(self.graph, end_latlon[1], end_latlon[0])
-        
-        # Run the selected algorithm
-        if algorithm == "BFS":
-            path, explored = self.bfs_osm(start_node, end_node)
-            cost = self.calculate_path_distance(path) if path else None
-        elif algorithm == "DFS":
-            path, explored = self.dfs_osm(start_node, end_node)
-            cost = self.calculate_path_distance(path) if path else None
-        elif algorithm == "UCS":
-            path, cost, explored = self.ucs_osm(start_node, end_node)
-        elif algorithm == "A* (Euclidean)":
-            path, cost, explored = self.astar_euclidean(start_node, end_node)
-        elif algorithm == "A* (Manhattan)":
-            path, cost, explored = self.astar_manhattan(start_node, end_node)
-        elif algorithm == "A* (Combined)":
-            path, cost, explored = self.astar_combined(start_node, end_node)
-        else:  # Default A*
-            path, cost, explored = self.astar_osm(start_node, end_node)
+        start_node = self.nearest_node(start_latlon, profile)
+        end_node = self.nearest_node(end_latlon, profile)
+        
+        path, cost, explored = self.search(start_node, end_node, algorithm, instrumentation, profile)
         
         if not path:
             raise Exception("No path found between the selected locations")
@@ -266,24 +1342,22 @@ class CampusPathfinder:
         m = folium.Map(location=self.center, zoom_start=17)
         
         # Add all roads in gray
-        for _, row in self.edges.iterrows():
-            coords = [(lat, lon) for lon, lat in row.geometry.coords]
-            folium.PolyLine(coords, color="gray", weight=2, opacity=0.4).add_to(m)
+        self._add_roads(m)
         
         # Add explored nodes in orange
         for node in explored:
-            y, x = self.graph.nodes[node]['y'], self.graph.nodes[node]['x']
+            y, x = self._lat[node], self._lon[node]
             folium.CircleMarker(
                 (y, x),
                 radius=3,
                 color="orange",
                 opacity=0.5,
-                popup=f"Explored: {node}"
+                popup=f"Explored: {self.routing.node_ids[node]}"
             ).add_to(m)
         
-        # Add final path
+        # Add final path along the full road geometry
         if path:
-            coords = [(self.graph.nodes[n]['y'], self.graph.nodes[n]['x']) for n in path]
+            coords = self.node_coords(self.expand_path(path))
             # White outline
             folium.PolyLine(coords, color="white", weight=8, opacity=0.8).add_to(m)
             # Blue path
@@ -303,92 +1377,236 @@ class CampusPathfinder:
         ).add_to(m)
         
         # Calculate metrics
-        distance = cost if cost else self.calculate_path_distance(path)
-        walking_time = self.calculate_walking_time(distance)
+        distance = self.calculate_path_distance(path)
+        travel_time = self.calculate_travel_time(distance, profile)
+        
+        metrics = {
+            'distance': distance,
+            'time': travel_time,
+            'profile': profile,
+            'nodes_explored': len(explored),
+            'start_location': start_name,
+            'end_location': end_name
+        }
+        if instrumentation is not None:
+            metrics['search_stats'] = instrumentation.as_dict()
         
         return {
             'map': m,
-            'metrics': {
-                'distance': distance,
-                'time': walking_time,
-                'nodes_explored': len(explored),
-                'start_location': start_name,
-                'end_location': end_name
+            'path': self.expand_path(path),
+            'metrics': metrics
+        }
+    
+    def stream_path(self, start_name: str, end_name: str, algorithm: str, batch_size: Optional[int] = None,
+                    profile: str = DEFAULT_PROFILE) -> Iterator[Dict[str, Any]]:
+        """Stream a search between two locations as (lat, lon) batches for animation."""
+        start_latlon = self.POIS[start_name]
+        end_latlon = self.POIS[end_name]
+        
+        start_node = self.nearest_node(start_latlon, profile)
+        end_node = self.nearest_node(end_latlon, profile)
+        
+        to_coords = self.node_coords
+        
+        for event in self.iter_search(start_node, end_node, algorithm, batch_size, profile):
+            if event['type'] == 'batch':
+                yield {
+                    'type': 'batch',
+                    'explored': to_coords(event['explored']),
+                    'frontier': to_coords(event['frontier']),
+                    'frontier_size': event['frontier_size'],
+                    'explored_total': event['explored_total']
+                }
+                continue
+            
+            path = event['path']
+            if not path:
+                raise Exception("No path found between the selected locations")
+            
+            distance = self.calculate_path_distance(path)
+            yield {
+                'type': 'done',
+                'path': to_coords(self.expand_path(path)),
+                'metrics': {
+                    'distance': distance,
+                    'time': self.calculate_travel_time(distance, profile),
+                    'profile': profile,
+                    'nodes_explored': len(event['explored']),
+                    'start_location': start_name,
+                    'end_location': end_name
+                }
             }
+    
+    def run_trials(self, start_name: str, end_name: str, algorithm: str, trials: int,
+                   profile: str = DEFAULT_PROFILE) -> Dict[str, Any]:
+        """Run one route a number of times after a warmup run, timing each search."""
+        if start_name not in self.POIS or end_name not in self.POIS:
+            return {'found': False, 'distance': None, 'nodes_explored': 0, 'wall_ms': []}
+        
+        start_node = self.nearest_node(self.POIS[start_name], profile)
+        end_node = self.nearest_node(self.POIS[end_name], profile)
+        
+        path, cost, explored = self.search(start_node, end_node, algorithm, profile=profile)
+        wall_ms = []
+        for _ in range(trials):
+            began = time.perf_counter()
+            self.search(start_node, end_node, algorithm, profile=profile)
+            wall_ms.append((time.perf_counter() - began) * 1000)
+        
+        return {
+            'found': path is not None,
+            'distance': self.calculate_path_distance(path) if path else None,
+            'nodes_explored': len(explored),
+            'wall_ms': wall_ms
         }
     
-    def compare_algorithms(self) -> List[Dict[str, Any]]:
-        """Compare all algorithms on multiple test routes."""
-        # Define test cases
-        test_routes = [
-            ("Entry gate", "Library"),
-            ("Library", "Food Court"),
-            ("Cricket Ground", "Hostel Block")
-        ]
+    def resolve_routes(self, routes: Union[str, List[Tuple[str, str]], None], default: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """Comparison routes: the default list, "all" ordered POI pairs, or the given pairs."""
+        if routes is None:
+            return list(default)
+        if routes == "all":
+            return [(a, b) for a in self.POIS for b in self.POIS if a != b]
+        return [tuple(route) for route in routes]
+    
+    def run_comparison(self, routes: List[Tuple[str, str]], algorithms: List[str], trials: int,
+                       workers: Optional[int] = None, profile: str = DEFAULT_PROFILE) -> Dict[str, List[Dict[str, Any]]]:
+        """Run every route x algorithm task, spread over worker processes when there is enough work.
+        
+        The work is estimated as search edges x searches; below
+        COMPARE_POOL_MIN_WORK the tasks run inline, which is faster than
+        starting workers. Returns the per-route trial results of each algorithm.
+        """
+        tasks = [(start, end, algorithm, trials, profile) for algorithm in algorithms for start, end in routes]
+        workers = workers if workers is not None else os.cpu_count() or 1
+        work = len(self._targets) * len(tasks) * trials
         
-        algorithms = ["BFS", "DFS", "UCS", "A*"]
+        if workers > 1 and len(tasks) > 1 and work >= COMPARE_POOL_MIN_WORK:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            pool = self._get_compare_pool(workers)
+            outcomes = None
+            if pool is not None:
+                try:
+                    outcomes = list(pool.map(_run_compare_task, tasks, chunksize=chunksize))
+                except RuntimeError:
+                    # Retired between lookup and submit, or the workers died; a broken pool is not reused
+                    with self._compare_lock:
+                        if self._compare_pool is pool:
+                            self._compare_pool = None
+            if outcomes is None:
+                # A replaced pathfinder runs its remaining comparisons on a one-off pool
+                with self._new_compare_pool(workers) as pool:
+                    outcomes = list(pool.map(_run_compare_task, tasks, chunksize=chunksize))
+        else:
+            outcomes = [self.run_trials(*task) for task in tasks]
+        
+        results = {algorithm: [] for algorithm in algorithms}
+        for (_, _, algorithm, _, _), outcome in zip(tasks, outcomes):
+            results[algorithm].append(outcome)
+        return results
+    
+    def _new_compare_pool(self, workers: int) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(COMPARE_START_METHOD),
+                                   initializer=_init_compare_worker, initargs=(self,))
+    
+    def _get_compare_pool(self, workers: int) -> Optional[ProcessPoolExecutor]:
+        """Shared comparison workers, started on first use; None once this pathfinder is retired."""
+        with self._compare_lock:
+            if self._compare_pool is None and not self._retired:
+                self._compare_pool = self._new_compare_pool(workers)
+            return self._compare_pool
+    
+    def retire_compare_pool(self):
+        """Let the comparison workers finish their queued work and exit, without cancelling it.
+        
+        Called once this pathfinder has been replaced: comparisons already
+        running complete on the old workers, and later ones on a one-off pool.
+        """
+        with self._compare_lock:
+            self._retired = True
+            pool, self._compare_pool = self._compare_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+    
+    def close_compare_pool(self):
+        """Stop the comparison workers; the next comparison starts fresh ones from the current state."""
+        with self._compare_lock:
+            pool, self._compare_pool = self._compare_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _wall_time_stats(self, outcomes: List[Dict[str, Any]]) -> Dict[str, float]:
+        """Mean, variance and confidence interval of the wall time, over the per-route mean times.
+        
+        Trials of one route repeat the same search, so they are not
+        independent samples of the route mix; each route counts once. Routes
+        of very different lengths make the interval wide, and its lower
+        bound is clipped at 0 since wall times cannot be negative.
+        """
+        samples = [statistics.fmean(outcome['wall_ms']) for outcome in outcomes if outcome['wall_ms']]
+        mean = statistics.fmean(samples) if samples else 0.0
+        variance = statistics.variance(samples) if len(samples) > 1 else 0.0
+        if len(samples) > 1:
+            margin = float(stats.t.ppf((1 + CONFIDENCE) / 2, len(samples) - 1)) * math.sqrt(variance / len(samples))
+        else:
+            margin = 0.0
+        return {
+            'Mean Wall Time (ms)': round(mean, 4),
+            'Wall Time Variance (ms²)': round(variance, 6),
+            'Wall Time CI Low (ms)': round(max(0.0, mean - margin), 4),
+            'Wall Time CI High (ms)': round(mean + margin, 4)
+        }
+    
+    def compare_algorithms(self, routes: Union[str, List[Tuple[str, str]], None] = None, trials: int = COMPARE_TRIALS,
+                           algorithms: Optional[List[str]] = None, workers: Optional[int] = None,
+                           profile: str = DEFAULT_PROFILE) -> List[Dict[str, Any]]:
+        """Compare algorithms over routes with repeated timed trials under one travel profile.
+        
+        ``routes`` is None for the default test routes, "all" for every
+        ordered POI pair, or a list of (start, end) names.
+        """
+        test_routes = self.resolve_routes(routes, COMPARE_ROUTES)
+        algorithms = algorithms or ["BFS", "DFS", "UCS", "A*"]
+        comparison = self.run_comparison(test_routes, algorithms, trials, workers, profile)
         results = []
         
         for algo in algorithms:
-            total_distance = 0
-            total_nodes = 0
-            successful_runs = 0
-            
-            for start, end in test_routes:
-                try:
-                    result = self.find_path(start, end, algo)
-                    total_distance += result['metrics']['distance']
-                    total_nodes += result['metrics']['nodes_explored']
-                    successful_runs += 1
-                except:
-                    continue
+            successful = [outcome for outcome in comparison[algo] if outcome['found']]
+            successful_runs = len(successful)
             
             if successful_runs > 0:
+                total_distance = sum(outcome['distance'] for outcome in successful)
+                total_nodes = sum(outcome['nodes_explored'] for outcome in successful)
                 results.append({
                     'Algorithm': algo,
                     'Average Distance (m)': round(total_distance / successful_runs, 2),
                     'Average Nodes Explored': round(total_nodes / successful_runs, 2),
-                    'Average Time (min)': round(self.calculate_walking_time(total_distance / successful_runs), 2),
+                    'Average Time (min)': round(self.calculate_travel_time(total_distance / successful_runs, profile), 2),
+                    **self._wall_time_stats(successful),
                     'Success Rate': f"{successful_runs}/{len(test_routes)}"
                 })
         
         return results
     
-    def compare_heuristics(self) -> List[Dict[str, Any]]:
-        """Compare A* algorithm with different heuristics on multiple test routes."""
-        # Define test cases
-        test_routes = [
-            ("Entry gate", "Library"),
-            ("Library", "Food Court"),
-            ("Cricket Ground", "Hostel Block"),
-            ("Acad 1", "Rest Area"),
-            ("Food Court", "Basket Ball")
-        ]
-        
+    def compare_heuristics(self, routes: Union[str, List[Tuple[str, str]], None] = None, trials: int = COMPARE_TRIALS,
+                           workers: Optional[int] = None, profile: str = DEFAULT_PROFILE) -> List[Dict[str, Any]]:
+        """Compare A* algorithm with different heuristics over routes with repeated timed trials."""
+        test_routes = self.resolve_routes(routes, HEURISTIC_ROUTES)
         heuristics = [
             "A* (Euclidean)",
             "A* (Manhattan)", 
             "A* (Combined)"
         ]
+        comparison = self.run_comparison(test_routes, heuristics, trials, workers, profile)
         results = []
         
         for heuristic in heuristics:
-            total_distance = 0
-            total_nodes = 0
-            total_time = 0
-            successful_runs = 0
-            
-            for start, end in test_routes:
-                try:
-                    result = self.find_path(start, end, heuristic)
-                    total_distance += result['metrics']['distance']
-                    total_nodes += result['metrics']['nodes_explored']
-                    total_time += result['metrics']['time']
-                    successful_runs += 1
-                except:
-                    continue
+            successful = [outcome for outcome in comparison[heuristic] if outcome['found']]
+            successful_runs = len(successful)
             
             if successful_runs > 0:
+                total_distance = sum(outcome['distance'] for outcome in successful)
+                total_nodes = sum(outcome['nodes_explored'] for outcome in successful)
+                total_time = sum(self.calculate_travel_time(outcome['distance'], profile) for outcome in successful)
                 heuristic_name = heuristic.replace("A* (", "").replace(")", "")
                 results.append({
                     'Heuristic Type': heuristic_name,
@@ -396,26 +1614,43 @@ class CampusPathfinder:
                     'Average Nodes Explored': round(total_nodes / successful_runs, 2),
                     'Average Time (min)': round(total_time / successful_runs, 2),
                     'Efficiency Score': round((total_distance / successful_runs) / (total_nodes / successful_runs), 4),
+                    **self._wall_time_stats(successful),
                     'Success Rate': f"{successful_runs}/{len(test_routes)}"
                 })
         
         return results
     
-    def extract_locations(self, query: str) -> list:
-        """Extract location names from a query string."""
-        locations = []
-        query_lower = query.lower()
+    def _poi_automaton(self) -> AhoCorasick:
+        """Aho-Corasick automaton over POI name variations, rebuilt when POIS changes."""
+        cached = getattr(self, '_poi_automaton_cache', None)
+        if cached is not None and cached[0] is self._pois and cached[1] == self._pois.version:
+            return cached[2]
         
-        for poi in self.POIS.keys():
-            # Check for exact matches and common variations
+        aliases = {}
+        for poi in self._pois.keys():
+            # Exact name and common variations
             poi_variations = [
                 poi.lower(),
                 poi.replace(" ", "").lower(),
                 poi.replace("block", "").lower(),
                 poi.replace("court", "").lower()
             ]
-            
-            if any(var in query_lower for var in poi_variations):
-                locations.append(poi)
+            for variation in poi_variations:
+                if variation and poi not in aliases.setdefault(variation, []):
+                    aliases[variation].append(poi)
+        
+        automaton = AhoCorasick(aliases)
+        self._poi_automaton_cache = (self._pois, self._pois.version, automaton)
+        return automaton
+    
+    def extract_locations(self, query: str) -> list:
+        """Extract location names from a query string, in order of mention."""
+        locations = []
+        
+        # One linear pass over the query; overlapping mentions keep the longest
+        for _, _, pois in self._poi_automaton().find_longest(query.lower()):
+            for poi in pois:
+                if poi not in locations:
+                    locations.append(poi)
         
         return locations
@@ -0,0 +1,133 @@
+import argparse
+import json
+import statistics
+import sys
+from typing import Dict, Any, List, Optional, Tuple
+
+import pandas as pd
+
+from benchmark import DEFAULT_OSM, run_benchmark
+from pathfinding import CampusPathfinder
+
+BASELINE_PATH = "perf_baseline.json"
+
+# Benchmark rounds per gate run, and untimed and timed runs per route in each;
+# more than the benchmark's defaults so sub-millisecond timings settle.
+# Latency takes the best round to damp scheduler noise
+ROUNDS = 5
+WARMUP = 3
+REPEAT = 20
+
+# Allowed regression per metric relative to the baseline, widened to
+# NOISE_SIGMAS standard deviations of the metric across the baseline's rounds
+# where that is larger. Expansions and pushes are deterministic, so they get no slack.
+THRESHOLDS = {
+    'p50_ms': 0.30,
+    'p95_ms': 0.40,
+    'mean_nodes_expanded': 0.0,
+    'mean_heap_pushes': 0.0,
+    'max_peak_memory_kb': 0.15
+}
+LATENCY_METRICS = ('p50_ms', 'p95_ms')
+NOISE_SIGMAS = 3.0
+
+
+def measure(pathfinder: CampusPathfinder, rounds: int = ROUNDS, warmup: int = WARMUP,
+            repeat: int = REPEAT) -> Tuple[Dict[str, Dict[str, float]], Dict[str, Dict[str, float]]]:
+    """Per-algorithm gated metrics and their run-to-run noise.
+
+    Latency is the fastest of several rounds; the noise of each metric is
+    its standard deviation across the rounds.
+    """
+    per_round = {}
+    for _ in range(rounds):
+        for row in run_benchmark(pathfinder, warmup=warmup, repeat=repeat)['summary']:
+            values = per_round.setdefault(row['algorithm'], {metric: [] for metric in THRESHOLDS})
+            for metric in THRESHOLDS:
+                values[metric].append(row[metric])
+
+    measured, noise = {}, {}
+    for algorithm, values in per_round.items():
+        measured[algorithm] = {metric: min(series) if metric in LATENCY_METRICS else series[-1]
+                               for metric, series in values.items()}
+        noise[algorithm] = {metric: round(statistics.stdev(series), 4) if len(series) > 1 else 0.0
+                            for metric, series in values.items()}
+    return measured, noise
+
+
+def compare(baseline: Dict[str, Dict[str, float]], measured: Dict[str, Dict[str, float]],
+            noise: Optional[Dict[str, Dict[str, float]]] = None) -> List[Dict[str, Any]]:
+    """One row per algorithm and metric with the allowed limit and a status."""
+    rows = []
+    noise = noise or {}
+    for algorithm, expected in baseline.items():
+        actual = measured.get(algorithm)
+        for metric, relative in THRESHOLDS.items():
+            base = expected[metric]
+            slack = max(base * relative, NOISE_SIGMAS * noise.get(algorithm, {}).get(metric, 0.0))
+            limit = base + slack
+            value = actual[metric] if actual else None
+            if value is None:
+                status = "missing"
+            elif value > limit:
+                status = "REGRESSED"
+            elif value < base - slack:
+                status = "improved"
+            else:
+                status = "ok"
+            rows.append({
+                'algorithm': algorithm,
+                'metric': metric,
+                'baseline': base,
+                'current': value,
+                'limit': round(limit, 4),
+                'change_%': round((value - base) / base * 100, 1) if value is not None and base else None,
+                'status': status
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when pathfinding performance regresses against the stored baseline.")
+    parser.add_argument("--osm", default=DEFAULT_OSM, help="OSM file to benchmark")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument("--update", action="store_true", help="Record the current results as the new baseline")
+    parser.add_argument("--rounds", type=int, default=ROUNDS)
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = parser.parse_args()
+
+    pathfinder = CampusPathfinder(args.osm)
+    measured, noise = measure(pathfinder, args.rounds, args.warmup, args.repeat)
+
+    if args.update:
+        with open(args.baseline, "w") as f:
+            json.dump({
+                'osm': args.osm,
+                'graph_nodes': pathfinder.search_graph.node_count,
+                'rounds': args.rounds,
+                'warmup': args.warmup,
+                'repeat': args.repeat,
+                'algorithms': measured,
+                'noise': noise
+            }, f, indent=2)
+        print(f"Wrote baseline {args.baseline}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    rows = compare(baseline['algorithms'], measured, baseline.get('noise'))
+    print(pd.DataFrame(rows).to_string(index=False))
+
+    failures = [row for row in rows if row['status'] in ("REGRESSED", "missing")]
+    if failures:
+        print(f"\n{len(failures)} metric(s) regressed:")
+        for row in failures:
+            print(f"  {row['algorithm']} {row['metric']}: {row['baseline']} -> {row['current']} (limit {row['limit']})")
+        sys.exit(1)
+    print("\nNo performance regressions.")
+
+
+if __name__ == "__main__":
+    main()
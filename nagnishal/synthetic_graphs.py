@@ -0,0 +1,240 @@
+import argparse
+import math
+from typing import Dict, Any, List, Tuple
+
+import networkx as nx
+import numpy as np
+import osmnx as ox
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+from location_registry import LocationRegistry
+from pathfinding import CampusPathfinder, RoutingGraph
+
+GRAPH_KINDS = ["grid", "geometric", "road"]
+
+# Synthetic graphs are laid out around the campus, with about this many metres between neighbours
+ORIGIN = (13.2175, 77.7531)
+SPACING_M = 25.0
+METRES_PER_DEGREE = 111320.0
+
+# Random geometric graphs connect points within this expected number of neighbours
+GEOMETRIC_DEGREE = 6
+# and group their paths into one way id per square cell of this size
+GEOMETRIC_WAY_CELL_M = 200.0
+
+# Road-like graphs: every ARTERIAL_EVERY-th row and column is a primary road; other
+# street segments are removed with DROP_PROBABILITY and some are under construction
+ARTERIAL_EVERY = 8
+DROP_PROBABILITY = 0.2
+HIGHWAY_MIX = {"residential": 0.55, "footway": 0.25, "tertiary": 0.15, "construction": 0.05}
+
+POI_COUNT = 20
+
+
+def _to_lat_lon(x_m: np.ndarray, y_m: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert planar metre offsets from ORIGIN to (lat, lon) arrays."""
+    lat = ORIGIN[0] + y_m / METRES_PER_DEGREE
+    lon = ORIGIN[1] + x_m / (METRES_PER_DEGREE * math.cos(math.radians(ORIGIN[0])))
+    return lat, lon
+
+
+def _grid_edges(side: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Horizontal and vertical neighbour pairs of a side x side grid, plus each pair's street.
+
+    Streets 0..side-1 are the rows and side..2*side-1 the columns.
+    """
+    ids = np.arange(side * side).reshape(side, side)
+    u = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+    v = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+    street = np.concatenate([
+        np.repeat(np.arange(side), side - 1),     # row of each horizontal edge
+        np.tile(np.arange(side), side - 1) + side  # column of each vertical edge
+    ])
+    return u, v, street
+
+
+def _street_ways(lat: np.ndarray, lon: np.ndarray, u: np.ndarray, v: np.ndarray, highways: np.ndarray,
+                 streets: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+    """Largest connected component of undirected edge arrays, with the ways of its streets.
+
+    Only the largest connected component is kept, so every POI pair is
+    routable. All edges of one street with the same highway tag share a way,
+    like a two-way OSM street split into segments, so there are few distinct
+    ways even at 10^6 nodes. Returns the kept node indices, the edges
+    relabelled to them, their lengths, way indices and way tags.
+    """
+    n = len(lat)
+    adjacency = coo_matrix((np.ones(len(u)), (u, v)), shape=(n, n))
+    _, labels = connected_components(adjacency, directed=False)
+    largest = labels == np.bincount(labels).argmax()
+    keep = largest[u]
+    u, v, highways, streets = u[keep], v[keep], highways[keep], streets[keep]
+    relabel = np.cumsum(largest) - 1
+
+    _, highway_codes = np.unique(highways.astype(str), return_inverse=True)
+    _, first, ways = np.unique(np.stack([streets, highway_codes.ravel()]), axis=1, return_index=True, return_inverse=True)
+    way_tags = [{'highway': highways[i], 'oneway': False, 'osmid': way_id}
+                for way_id, i in enumerate(first.tolist(), 1)]
+    lengths = ox.distance.great_circle(lat[u], lon[u], lat[v], lon[v])
+    return np.flatnonzero(largest), relabel[u], relabel[v], lengths, ways.ravel(), way_tags
+
+
+def _build_graph(lat: np.ndarray, lon: np.ndarray, u: np.ndarray, v: np.ndarray,
+                 highways: np.ndarray, streets: np.ndarray, name: str) -> nx.MultiDiGraph:
+    """Assemble an osmnx-style MultiDiGraph from undirected edge arrays.
+
+    Each undirected edge becomes two directed edges of its street's way.
+    """
+    nodes, u, v, lengths, ways, way_tags = _street_ways(lat, lon, u, v, highways, streets)
+    graph = nx.MultiDiGraph(crs="epsg:4326", name=name)
+    graph.add_nodes_from((int(i) + 1, {'y': float(lat[i]), 'x': float(lon[i])}) for i in nodes)
+    for a, b, way, length in zip((nodes[u] + 1).tolist(), (nodes[v] + 1).tolist(), ways.tolist(), lengths.tolist()):
+        data = dict(way_tags[way], length=length)
+        graph.add_edge(a, b, 0, reversed=False, **data)
+        graph.add_edge(b, a, 0, reversed=True, **data)
+    return graph
+
+
+def _build_routing(lat: np.ndarray, lon: np.ndarray, u: np.ndarray, v: np.ndarray,
+                   highways: np.ndarray, streets: np.ndarray, name: str) -> RoutingGraph:
+    """Compile undirected edge arrays straight into a RoutingGraph.
+
+    Equal to ``RoutingGraph.from_networkx(_build_graph(...))``, without
+    building the networkx graph, which dominates load time and memory at
+    10^6 nodes.
+    """
+    nodes, u, v, lengths, ways, way_tags = _street_ways(lat, lon, u, v, highways, streets)
+    return RoutingGraph.from_edges(nodes + 1, lat[nodes], lon[nodes], u, v, lengths, ways, way_tags)
+
+
+def _grid(n_nodes: int, seed: int = 0) -> tuple:
+    """Node coordinates, edges, highways, streets and name of grid_graph, for _build_graph or _build_routing."""
+    side = max(2, round(math.sqrt(n_nodes)))
+    x, y = np.meshgrid(np.arange(side) * SPACING_M, np.arange(side) * SPACING_M)
+    lat, lon = _to_lat_lon(x.ravel(), y.ravel())
+    u, v, streets = _grid_edges(side)
+    return lat, lon, u, v, np.full(len(u), "residential", dtype=object), streets, f"grid-{n_nodes}"
+
+
+def _geometric(n_nodes: int, seed: int = 0) -> tuple:
+    """Node coordinates, edges, highways, streets and name of geometric_graph, for _build_graph or _build_routing."""
+    rng = np.random.default_rng(seed)
+    extent = math.sqrt(n_nodes) * SPACING_M
+    points = rng.uniform(0, extent, size=(n_nodes, 2))
+    radius = SPACING_M * math.sqrt(GEOMETRIC_DEGREE / math.pi)
+    pairs = cKDTree(points).query_pairs(radius, output_type='ndarray')
+    lat, lon = _to_lat_lon(points[:, 0], points[:, 1])
+    # There are no streets here, so paths share a way per square cell of their first point
+    cells = (points[pairs[:, 0]] // GEOMETRIC_WAY_CELL_M).astype(np.int64)
+    streets = cells[:, 1] * (int(extent // GEOMETRIC_WAY_CELL_M) + 1) + cells[:, 0]
+    return lat, lon, pairs[:, 0], pairs[:, 1], np.full(len(pairs), "footway", dtype=object), streets, f"geometric-{n_nodes}"
+
+
+def _road(n_nodes: int, seed: int = 0) -> tuple:
+    """Node coordinates, edges, highways, streets and name of road_graph, for _build_graph or _build_routing."""
+    rng = np.random.default_rng(seed)
+    side = max(2, round(math.sqrt(n_nodes)))
+    x, y = np.meshgrid(np.arange(side) * SPACING_M, np.arange(side) * SPACING_M)
+    x = x.ravel() + rng.uniform(-0.3, 0.3, side * side) * SPACING_M
+    y = y.ravel() + rng.uniform(-0.3, 0.3, side * side) * SPACING_M
+    lat, lon = _to_lat_lon(x, y)
+
+    u, v, streets = _grid_edges(side)
+    arterial = streets % side % ARTERIAL_EVERY == 0
+    highways = rng.choice(list(HIGHWAY_MIX), size=len(u), p=list(HIGHWAY_MIX.values())).astype(object)
+    highways[arterial] = "primary"
+    keep = arterial | (rng.random(len(u)) >= DROP_PROBABILITY)
+    return lat, lon, u[keep], v[keep], highways[keep], streets[keep], f"road-{n_nodes}"
+
+
+def grid_graph(n_nodes: int, seed: int = 0) -> nx.MultiDiGraph:
+    """Square street grid of about n_nodes intersections."""
+    return _build_graph(*_grid(n_nodes, seed))
+
+
+def geometric_graph(n_nodes: int, seed: int = 0) -> nx.MultiDiGraph:
+    """Random geometric graph: uniform points joined to every point within a fixed radius."""
+    return _build_graph(*_geometric(n_nodes, seed))
+
+
+def road_graph(n_nodes: int, seed: int = 0) -> nx.MultiDiGraph:
+    """Road-like network: a jittered grid of mixed streets crossed by primary arterials."""
+    return _build_graph(*_road(n_nodes, seed))
+
+
+GENERATORS = {"grid": grid_graph, "geometric": geometric_graph, "road": road_graph}
+EDGE_GENERATORS = {"grid": _grid, "geometric": _geometric, "road": _road}
+
+
+def _check_kind(kind: str):
+    if kind not in GENERATORS:
+        raise ValueError(f"Unknown graph kind {kind!r}, expected one of {GRAPH_KINDS}")
+
+
+def generate_graph(kind: str, n_nodes: int, seed: int = 0) -> nx.MultiDiGraph:
+    """Generate a synthetic graph of the given kind ("grid", "geometric" or "road")."""
+    _check_kind(kind)
+    return GENERATORS[kind](n_nodes, seed)
+
+
+def generate_routing(kind: str, n_nodes: int, seed: int = 0) -> RoutingGraph:
+    """The RoutingGraph of ``generate_graph(kind, n_nodes, seed)``, built without networkx."""
+    _check_kind(kind)
+    return _build_routing(*EDGE_GENERATORS[kind](n_nodes, seed))
+
+
+def _locations(lat: np.ndarray, lon: np.ndarray, name: str, count: int, seed: int) -> List[Dict[str, Any]]:
+    """Location registry entries for POIs placed on randomly chosen nodes."""
+    rng = np.random.default_rng(seed)
+    chosen = rng.choice(len(lat), size=min(count, len(lat)), replace=False)
+    locations = []
+    for i, index in enumerate(sorted(chosen.tolist())):
+        locations.append({
+            "id": f"poi_{i:03d}",
+            "name": f"POI {i:03d}",
+            "coordinates": (float(lat[index]), float(lon[index])),
+            "category": "Other",
+            "info": {
+                "name": f"Synthetic POI {i:03d}",
+                "location": name,
+                "hours": "24/7",
+                "facilities": [],
+                "nearby": [],
+                "description": "Synthetic point of interest for scaling tests"
+            }
+        })
+    return locations
+
+
+def synthetic_locations(graph: nx.MultiDiGraph, count: int = POI_COUNT, seed: int = 0) -> List[Dict[str, Any]]:
+    """Location registry entries for POIs placed on randomly chosen graph nodes."""
+    lat = np.array([data['y'] for _, data in graph.nodes(data=True)])
+    lon = np.array([data['x'] for _, data in graph.nodes(data=True)])
+    return _locations(lat, lon, graph.graph.get('name', 'Synthetic graph'), count, seed)
+
+
+def synthetic_pathfinder(kind: str, n_nodes: int, poi_count: int = POI_COUNT, seed: int = 0) -> CampusPathfinder:
+    """CampusPathfinder over a generated graph with synthetic POIs."""
+    routing = generate_routing(kind, n_nodes, seed)
+    registry = LocationRegistry(_locations(routing.lat, routing.lon, f"{kind}-{n_nodes}", poi_count, seed))
+    return CampusPathfinder.from_routing(routing, registry=registry)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic routing graph as GraphML.")
+    parser.add_argument("kind", choices=GRAPH_KINDS)
+    parser.add_argument("--nodes", type=int, default=10000, help="Approximate number of nodes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="GraphML output path (default: KIND-NODES.graphml)")
+    args = parser.parse_args()
+
+    graph = generate_graph(args.kind, args.nodes, args.seed)
+    out = args.out or f"{args.kind}-{args.nodes}.graphml"
+    ox.save_graphml(graph, out)
+    print(f"Wrote {out}: {len(graph)} nodes, {graph.number_of_edges()} edges")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import os
+import time
+
+import pytest
+
+from fake_gemini_server import FakeGeminiServer
+from gemini_client import AsyncGeminiClient, CircuitBreaker, ModelStreamError, create_genai_client
+
+
+@pytest.fixture
+def server(monkeypatch):
+    with FakeGeminiServer() as fake:
+        monkeypatch.setenv("GEMINI_BASE_URL", fake.url)
+        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+        yield fake
+
+
+def make_client(timeout_seconds: float = 2.0, breaker: CircuitBreaker = None) -> AsyncGeminiClient:
+    return AsyncGeminiClient(create_genai_client(), timeout_seconds=timeout_seconds, breaker=breaker)
+
+
+def test_base_url_points_client_at_fake_server(server):
+    assert os.environ["GEMINI_BASE_URL"] == server.url
+    client = make_client()
+
+    assert client.generate_sync("When is the library open?", "Campus facts") == server.answer
+    request = server.requests[-1]
+    assert request["method"] == "generateContent"
+    assert request["contents"][0]["parts"][0]["text"] == "When is the library open?"
+    assert request["systemInstruction"]["parts"][0]["text"] == "Campus facts"
+
+
+def test_generate_times_out_and_counts_a_failure(server):
+    server.delay = 1.0
+    client = make_client(timeout_seconds=0.2)
+
+    began = time.monotonic()
+    assert client.generate_sync("slow") is None
+    assert time.monotonic() - began < 0.9
+    assert client.breaker.failures == 1
+
+
+def test_stream_yields_chunks_in_order(server):
+    client = make_client()
+
+    assert list(client.stream_sync("stream")) == server.chunks()
+    assert server.requests[-1]["method"] == "streamGenerateContent"
+    assert client.breaker.state == "closed"
+
+
+def test_stream_failing_before_first_chunk_yields_nothing(server):
+    server.status = 500
+    client = make_client()
+
+    assert list(client.stream_sync("broken")) == []
+    assert client.breaker.failures == 1
+
+
+def test_stream_stalling_after_first_chunk_raises(server):
+    server.chunk_delay = 1.0
+    client = make_client(timeout_seconds=0.3)
+
+    received = []
+    with pytest.raises(ModelStreamError):
+        for text in client.stream_sync("stall"):
+            received.append(text)
+    assert received == server.chunks()[:1]
+    assert client.breaker.failures == 1
+
+
+def test_stream_cut_off_part_way_raises(server):
+    server.fail_after_chunks = 2
+    client = make_client()
+
+    received = []
+    with pytest.raises(ModelStreamError):
+        for text in client.stream_sync("cut"):
+            received.append(text)
+    assert received == server.chunks()[:2]
+
+
+def test_breaker_opens_after_repeated_failures_and_skips_the_model(server):
+    server.status = 500
+    client = make_client(breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+    assert client.generate_sync("one") is None
+    assert client.generate_sync("two") is None
+    assert client.breaker.state == "open"
+
+    calls = len(server.requests)
+    assert client.generate_sync("three") is None
+    assert list(client.stream_sync("four")) == []
+    assert len(server.requests) == calls
+
+
+def test_breaker_closes_after_a_successful_trial_call(server):
+    server.status = 500
+    client = make_client(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.2))
+    assert client.generate_sync("fail") is None
+    assert client.breaker.state == "open"
+
+    server.status = 200
+    time.sleep(0.25)
+    assert client.generate_sync("trial") == server.answer
+    assert client.breaker.state == "closed"
+
+
+def test_failed_trial_call_reopens_the_breaker(server):
+    server.status = 500
+    client = make_client(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.2))
+    assert client.generate_sync("fail") is None
+
+    time.sleep(0.25)
+    assert client.generate_sync("trial") is None
+    assert client.breaker.state == "open"
+    assert not client.breaker.allow()
+
+
+def test_abandoned_trial_stream_hands_the_trial_back(server):
+    server.chunk_delay = 0.5
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.2)
+    breaker.record_failure()
+    time.sleep(0.25)
+    client = make_client(breaker=breaker)
+
+    stream = client.stream_sync("trial")
+    assert next(stream) == server.chunks()[0]
+    assert breaker.state == "half-open"
+    stream.close()
+
+    deadline = time.monotonic() + 2
+    while breaker.state == "half-open" and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert breaker.state == "open"
+    assert breaker.allow()
@@ -0,0 +1,164 @@
+import re
+from difflib import SequenceMatcher
+
+import pytest
+
+from gemini_integration import LocationMatcher, QueryParser
+from location_registry import LocationRegistry, normalize_location_name
+
+# The assistant's navigation patterns, as the baseline regex scan used them
+NAVIGATION_PATTERNS = [
+    r'(?:how (?:do|can|to))?\s*(?:get|go|walk|reach)\s+(?:from\s+)?([\w\s]+)\s+to\s+([\w\s]+)',
+    r'(?:show|find|give)\s+(?:me\s+)?(?:the\s+)?(?:route|path|way|directions?)\s+(?:from\s+)?([\w\s]+)\s+to\s+([\w\s]+)',
+    r'directions?\s+(?:from\s+)?([\w\s]+)\s+to\s+([\w\s]+)'
+]
+
+TERMS = [
+    "library", "librery", "central library", "food court", "foodcourt", "food", "cafeteria",
+    "acad 1", "academic block 2", "acad2", "block", "hostel", "student hostel", "hostle",
+    "cricket", "cricket ground", "basketball", "vollyball", "tennis", "football", "court",
+    "ground", "gate", "entry", "exit gate", "main gate", "check post 2", "checkpost1",
+    "flag", "flag post", "rest", "rest area", "faculty", "xyz", "", "a", "the", "to", "where",
+]
+
+QUERIES = [
+    "how do I get from the library to the food court",
+    "how can i walk from hostel to cricket ground",
+    "go to tennis court",
+    "reach basketball court to volleyball court",
+    "show me the route from entry gate to acad 1",
+    "find the path from faculty block to rest area",
+    "give me directions from check post 1 to the flag post",
+    "directions from exit gate to football ground",
+    "show me directions from library to food court",
+    "what are the library hours",
+    "when does the food court open",
+    "what facilities are available at the hostel",
+    "tell me about the cricket ground",
+    "Central Library",
+    "is the tennis court open now",
+    "hello",
+    "what can you do",
+    "how is the weather today",
+    "what time is it there",
+    "take me there",
+    "anything to eat here",
+]
+
+
+def baseline_best_match(campus_info, query_term, threshold=0.6):
+    """SequenceMatcher over every key, name and variation, as the assistant matched before the index."""
+    best_match = None
+    highest_score = threshold
+    query_normalized = normalize_location_name(query_term)
+    for loc_key, loc_info in campus_info.items():
+        variations = [
+            loc_key,
+            loc_info['name'],
+            loc_key.replace('_', ' '),
+            loc_info['name'].lower(),
+            loc_key.replace('block', '').strip(),
+            loc_key.replace('court', '').strip(),
+            loc_key.replace('ground', '').strip()
+        ]
+        for variation in variations:
+            score = SequenceMatcher(None, query_normalized.lower(), normalize_location_name(variation).lower()).ratio()
+            if score > highest_score:
+                highest_score = score
+                best_match = loc_key
+    return best_match
+
+
+def baseline_parse(campus_info, query, context):
+    """Intent, locations and topic from the separate regex scans the assistant ran before the parser."""
+    query = query.lower()
+    locations = []
+    for pattern in NAVIGATION_PATTERNS:
+        matches = re.search(pattern, query)
+        if matches:
+            for potential in [loc.strip() for loc in matches.groups() if loc]:
+                best_match = baseline_best_match(campus_info, potential)
+                if best_match:
+                    locations.append(best_match)
+    if not locations:
+        for word in query.split():
+            best_match = baseline_best_match(campus_info, word)
+            if best_match and best_match not in locations:
+                locations.append(best_match)
+    if not locations and ('here' in query or 'there' in query) and context.get('last_location'):
+        locations.append(context['last_location'])
+
+    if any(re.search(pattern, query) for pattern in NAVIGATION_PATTERNS):
+        intent = 'navigation'
+    elif locations:
+        intent = 'location'
+    else:
+        intent = 'general'
+    if "hour" in query or "time" in query or "open" in query:
+        topic = 'hours'
+    elif "facilities" in query or "available" in query:
+        topic = 'facilities'
+    else:
+        topic = 'info'
+    return intent, locations, topic
+
+
+@pytest.fixture(scope="module")
+def campus_info():
+    return LocationRegistry.default().campus_info()
+
+
+@pytest.fixture(scope="module")
+def parser(campus_info):
+    return QueryParser(NAVIGATION_PATTERNS, LocationMatcher(campus_info))
+
+
+@pytest.mark.parametrize("threshold", [0.4, 0.6, 0.8])
+def test_matcher_returns_baseline_best_match(campus_info, threshold):
+    matcher = LocationMatcher(campus_info)
+
+    for term in TERMS:
+        assert matcher.best_match(term, threshold) == baseline_best_match(campus_info, term, threshold), term
+
+
+def test_batched_lookups_match_single_lookups(campus_info):
+    matcher = LocationMatcher(campus_info)
+
+    assert matcher.best_matches(TERMS + TERMS) == [baseline_best_match(campus_info, term) for term in TERMS + TERMS]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_parser_matches_baseline_regex_scan(campus_info, parser, query):
+    context = {'last_location': 'library'}
+    intent, locations, topic = baseline_parse(campus_info, query, context)
+
+    parsed = parser.parse(query, context)
+
+    assert parsed['intent'] == intent
+    assert parsed['topic'] == topic
+    if intent == 'navigation':
+        # The baseline collected slots from every matching pattern; the route uses the first two
+        assert parsed['slots']['locations'][:2] == locations[:2]
+    else:
+        assert parsed['slots']['locations'] == locations
+
+
+def test_unmatched_destination_is_not_filled_from_another_pattern(parser):
+    # Two patterns match here; the baseline matched "library" once per pattern and routed it to itself
+    parsed = parser.parse("show me directions from library to cafeteria")
+
+    assert parsed['intent'] == 'navigation'
+    assert parsed['slots']['locations'] == ['library']
+
+
+def test_where_is_not_a_contextual_reference(parser):
+    parsed = parser.parse("where is it", {'last_location': 'library'})
+
+    assert parsed['intent'] == 'general'
+    assert parsed['slots']['locations'] == []
+
+
+def test_parse_many_matches_parse(parser):
+    context = {'last_location': 'library'}
+
+    assert parser.parse_many(QUERIES, context) == [parser.parse(query, context) for query in QUERIES]
@@ -0,0 +1,111 @@
+import itertools
+import math
+import os
+
+import numpy as np
+import osmnx as ox
+import pytest
+
+from map_registry import DEFAULT_OSM_FILE
+from pathfinding import ALGORITHMS, PROFILES, CampusPathfinder, RoutingGraph
+
+OSM_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), DEFAULT_OSM_FILE)
+
+# The A* heuristics scale degrees to metres (and Manhattan is not a lower bound), so
+# only UCS is guaranteed to return shortest paths; the others have to return real ones
+EXACT = ["UCS"]
+
+
+@pytest.fixture(scope="module")
+def routing():
+    return RoutingGraph.from_osm(OSM_FILE)
+
+
+@pytest.fixture(scope="module")
+def simplified(routing):
+    return CampusPathfinder.from_routing(routing)
+
+
+@pytest.fixture(scope="module")
+def unsimplified(routing):
+    return CampusPathfinder.from_routing(routing, simplify=False)
+
+
+def adjacency(routing):
+    """OSM id -> [(neighbour OSM id, length, way OSM id)] in CSR order, plus the parallel alternatives."""
+    ids = routing.node_ids.tolist()
+    edges = {}
+    for i in range(routing.node_count):
+        row = slice(routing.indptr[i], routing.indptr[i + 1])
+        edges[ids[i]] = [(ids[target], round(length, 6), routing.way_tags[way].get('osmid'))
+                         for target, length, way in zip(routing.targets[row].tolist(), routing.lengths[row].tolist(),
+                                                        routing.edge_way[row].tolist())]
+    sources = np.repeat(np.arange(routing.node_count), np.diff(routing.indptr))
+    parallel = sorted((ids[sources[edge]], ids[routing.targets[edge]], round(length, 6), routing.way_tags[way].get('osmid'))
+                      for edge, length, way in zip(routing.parallel_edges.tolist(), routing.parallel_lengths.tolist(),
+                                                   routing.parallel_ways.tolist()))
+    return edges, parallel
+
+
+def routes(pathfinder, profile, algorithm="UCS"):
+    """(path, cost) between every pair of POIs."""
+    result = {}
+    for start, end in itertools.permutations(pathfinder.POIS, 2):
+        path, cost, _ = pathfinder.search(pathfinder.nearest_node(pathfinder.POIS[start], profile),
+                                          pathfinder.nearest_node(pathfinder.POIS[end], profile),
+                                          algorithm, profile=profile)
+        result[start, end] = (path, cost)
+    return result
+
+
+def test_from_osm_matches_from_networkx(routing):
+    graph = ox.graph_from_xml(OSM_FILE, simplify=False, retain_all=False)
+    from_networkx = RoutingGraph.from_networkx(graph)
+
+    # Node order differs between the two readers, so compare by OSM id
+    assert set(routing.node_ids.tolist()) == set(graph.nodes)
+    assert adjacency(routing) == adjacency(from_networkx)
+
+
+@pytest.mark.parametrize("profile", list(PROFILES))
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_simplified_distances_match_unsimplified(simplified, unsimplified, profile, algorithm):
+    expected = routes(unsimplified, profile)
+
+    for pair, (path, cost) in routes(simplified, profile, algorithm).items():
+        shortest_path, shortest_cost = expected[pair]
+        if shortest_path is None:
+            assert path is None, pair
+            continue
+        assert path[0] == shortest_path[0] and path[-1] == shortest_path[-1], pair
+        # Expanded back to routing graph nodes, the path costs the same on the unsimplified graph
+        assert math.isclose(cost, unsimplified.path_cost(simplified.expand_path(path), profile), rel_tol=1e-9), pair
+        if algorithm in EXACT:
+            assert math.isclose(cost, shortest_cost, rel_tol=1e-9), pair
+        else:
+            assert cost >= shortest_cost * (1 - 1e-9), pair
+
+
+@pytest.mark.parametrize("simplify", [True, False])
+def test_close_then_reopen_restores_weights_and_routes(routing, simplify):
+    pathfinder = CampusPathfinder.from_routing(routing, simplify=simplify)
+    weights = {profile: list(values) for profile, values in pathfinder._weights.items()}
+    before = {profile: routes(pathfinder, profile) for profile in PROFILES}
+
+    # Close an edge in the middle of the longest walking route
+    path = max((pathfinder.expand_path(path) for path, _ in before["walking"].values()), key=len)
+    ids = routing.node_ids
+    middle = len(path) // 2
+    edge = (int(ids[path[middle]]), int(ids[path[middle + 1]]))
+
+    closed = pathfinder.with_closed_edges([edge])
+    overrides = closed.edge_overrides()
+    assert edge in overrides and set(overrides.values()) == {math.inf}
+    assert routes(closed, "walking") != before["walking"]
+    # The closure applies to a copy
+    assert pathfinder._weights == weights
+
+    reopened = closed.with_reopened_edges([edge])
+    assert reopened.edge_overrides() == {}
+    assert reopened._weights == weights
+    assert {profile: routes(reopened, profile) for profile in PROFILES} == before
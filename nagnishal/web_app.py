@@ -1,18 +1,61 @@
 import os
-from flask import Flask, send_from_directory, request, jsonify
-from pathfinding import CampusPathfinder
+import threading
+from flask import Flask, send_from_directory, request, jsonify, Response, stream_with_context
+from pathfinding import DEFAULT_PROFILE, EXCLUDED, PROFILES
 from gemini_integration import GeminiAssistant
+from map_registry import DEFAULT_MAP, MEMORY_BUDGET_MB, MapRegistry, UnknownMapError, load_map_config
+from map_reloader import POLL_INTERVAL_SECONDS
 import json
 
 app = Flask(__name__, static_folder='.')
 
-# Initialize instances immediately
-pathfinder = CampusPathfinder("attached_assets/map_1758707724808.osm")
-# Check for GEMINI_API_KEY from Replit secrets
-if "GEMINI_API_KEY" in os.environ:
-    gemini = GeminiAssistant()
-else:
-    gemini = None
+# Maps served by id from the MAP_CONFIG JSON file (default: the bundled campus from
+# OSM_FILE and POI_FILE). Maps load on first use, are hot-reloaded when their OSM
+# file changes (MAP_WATCH=0 disables the watchers) and the least recently used are
+# evicted above MAP_MEMORY_MB
+maps = MapRegistry(
+    load_map_config(os.environ.get("MAP_CONFIG")),
+    memory_budget_mb=float(os.environ.get("MAP_MEMORY_MB", MEMORY_BUDGET_MB)),
+    poll_interval=float(os.environ.get("MAP_POLL_SECONDS", POLL_INTERVAL_SECONDS)),
+    watch=os.environ.get("MAP_WATCH") != "0",
+    # INSTRUMENT_SEARCH=1 adds search counters to every /find_path response
+    instrument_search=os.environ.get("INSTRUMENT_SEARCH") == "1"
+)
+# Chat assistants by map id, each knowing its map's locations. They are built
+# on first use, so comparison workers importing this module never build one
+assistants = {}
+assistants_lock = threading.Lock()
+
+def assistant(map_id):
+    """The map's chat assistant, built from its location registry on first use; None without GEMINI_API_KEY.
+    
+    Assistants share one Gemini client, and so its request limit and circuit breaker.
+    """
+    if map_id not in maps:
+        raise UnknownMapError(f"Unknown map: {map_id}")
+    with assistants_lock:
+        gemini = assistants.get(map_id)
+        # Check for GEMINI_API_KEY from Replit secrets
+        if gemini is None and "GEMINI_API_KEY" in os.environ:
+            shared = next(iter(assistants.values()), None)
+            gemini = GeminiAssistant(registry=maps.registry(map_id),
+                                     client=shared.client if shared else None,
+                                     model_client=shared.model if shared else None)
+            assistants[map_id] = gemini
+    return gemini
+
+def request_map():
+    """Map id from ?map= or the JSON body's "map", the default campus otherwise."""
+    data = request.get_json(silent=True) if request.is_json else None
+    return request.args.get('map') or (data or {}).get('map') or DEFAULT_MAP
+
+def current_pathfinder():
+    """The requested map's pathfinder; read once so the request finishes on the map it started with."""
+    return maps.pathfinder(request_map())
+
+@app.errorhandler(UnknownMapError)
+def unknown_map(e):
+    return jsonify({"error": e.args[0]}), 404
 
 # Serve the main HTML file
 @app.route('/')
@@ -26,19 +69,20 @@ def find_path():
     start_location = data.get('start')
     end_location = data.get('end')
     algorithm = data.get('algorithm')
+    profile = data.get('profile') or DEFAULT_PROFILE
     
     if not start_location or not end_location or not algorithm:
         return jsonify({"error": "Missing parameters"}), 400
+    if profile not in PROFILES:
+        return jsonify({"error": f"Unknown profile: {profile}"}), 400
     
+    pathfinder = current_pathfinder()
     try:
-        result = pathfinder.find_path(start_location, end_location, algorithm)
+        result = pathfinder.find_path(start_location, end_location, algorithm, profile=profile)
         
         # Convert map to JSON for sending to frontend
         # Folium maps are difficult to serialize. Send back the path data instead.
-        path_nodes = [
-            (pathfinder.graph.nodes[n]['y'], pathfinder.graph.nodes[n]['x'])
-            for n in result['path']
-        ] if 'path' in result else []
+        path_nodes = pathfinder.node_coords(result['path']) if 'path' in result else []
         
         return jsonify({
             "metrics": result['metrics'],
@@ -47,29 +91,120 @@ def find_path():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Upper bound on explored nodes per streamed event; larger batches would leave nothing to animate
+MAX_STREAM_BATCH = 5000
+
+# Server-Sent Events endpoint streaming search progress for animation
+@app.route('/find_path/stream', methods=['GET'])
+def find_path_stream():
+    start_location = request.args.get('start')
+    end_location = request.args.get('end')
+    algorithm = request.args.get('algorithm')
+    batch_size = request.args.get('batch_size', type=int)
+    profile = request.args.get('profile') or DEFAULT_PROFILE
+    
+    if not start_location or not end_location or not algorithm:
+        return jsonify({"error": "Missing parameters"}), 400
+    if profile not in PROFILES:
+        return jsonify({"error": f"Unknown profile: {profile}"}), 400
+    if batch_size is not None:
+        if batch_size < 1:
+            return jsonify({"error": "batch_size must be at least 1"}), 400
+        batch_size = min(batch_size, MAX_STREAM_BATCH)
+    
+    pathfinder = current_pathfinder()
+    
+    def generate():
+        try:
+            for event in pathfinder.stream_path(start_location, end_location, algorithm, batch_size, profile):
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 # API endpoint for Gemini chat
 @app.route('/ask_gemini', methods=['POST'])
 def ask_gemini():
+    gemini = assistant(request_map())
     if not gemini:
         return jsonify({"error": "AI Assistant unavailable. GEMINI_API_KEY not configured."}), 503
         
     data = request.json
     query = data.get('query')
+    # Conversation context is keyed per browser session, falling back to client address
+    session_id = data.get('session_id') or request.remote_addr
     
     if not query:
         return jsonify({"error": "Missing query"}), 400
         
+    # Stream the answer as Server-Sent Events when asked to
+    if data.get('stream') or request.accept_mimetypes.best == 'text/event-stream':
+        def generate():
+            for event in gemini.stream_response(query, session_id):
+                payload = event['response'] if event['type'] == 'done' else {"text": event['text']}
+                yield f"event: {event['type']}\ndata: {json.dumps(payload)}\n\n"
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+        
     try:
-        response = gemini.get_response(query)
+        response = gemini.get_response(query, session_id)
         return jsonify(response)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Batch endpoint for replaying chat logs and pre-warming the response cache
+@app.route('/ask_gemini/batch', methods=['POST'])
+def ask_gemini_batch():
+    gemini = assistant(request_map())
+    if not gemini:
+        return jsonify({"error": "AI Assistant unavailable. GEMINI_API_KEY not configured."}), 503
+    
+    queries = request.json.get('queries')
+    if not isinstance(queries, list) or not all(isinstance(q, str) for q in queries):
+        return jsonify({"error": "Missing queries"}), 400
+    
+    try:
+        return jsonify(gemini.get_responses(queries))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Upper bound on timed trials per route a comparison request may ask for
+MAX_COMPARE_TRIALS = 20
+
+def comparison_params(pathfinder):
+    """Parse ?routes=all or ?routes=Start|End,Start|End, ?trials=N and ?profile= for comparisons."""
+    routes = request.args.get('routes')
+    if routes and routes != 'all':
+        routes = [tuple(part.split('|', 1)) for part in routes.split(',')]
+        unknown = [name for route in routes for name in route if name not in pathfinder.POIS]
+        if any(len(route) != 2 for route in routes) or unknown:
+            raise ValueError(f"Invalid routes: {', '.join(unknown) or 'expected Start|End pairs'}")
+    trials = min(max(request.args.get('trials', default=5, type=int), 1), MAX_COMPARE_TRIALS)
+    profile = request.args.get('profile') or DEFAULT_PROFILE
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile: {profile}")
+    return routes or None, trials, profile
+
 # API endpoint for analysis comparison
 @app.route('/compare', methods=['GET'])
 def compare_algorithms():
+    pathfinder = current_pathfinder()
+    try:
+        routes, trials, profile = comparison_params(pathfinder)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
     try:
-        results = pathfinder.compare_algorithms()
+        results = pathfinder.compare_algorithms(routes, trials, profile=profile)
         return jsonify(results)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -77,8 +212,14 @@ def compare_algorithms():
 # API endpoint for heuristic comparison
 @app.route('/compare_heuristics', methods=['GET'])
 def compare_heuristics():
+    pathfinder = current_pathfinder()
+    try:
+        routes, trials, profile = comparison_params(pathfinder)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
     try:
-        results = pathfinder.compare_heuristics()
+        results = pathfinder.compare_heuristics(routes, trials, profile=profile)
         return jsonify(results)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -86,11 +227,105 @@ def compare_heuristics():
 # Endpoint to get list of POIs
 @app.route('/locations', methods=['GET'])
 def get_locations():
+    map_id = request_map()
+    pathfinder = maps.pathfinder(map_id)
+    try:
+        if request.args.get('details') == '1':
+            return jsonify([
+                {
+                    "id": location['id'],
+                    "name": location['name'],
+                    "coordinates": location['coordinates'],
+                    "category": location['category'],
+                    "node": location['node']
+                }
+                for location in pathfinder.registry.locations.values()
+            ])
+        return jsonify(list(pathfinder.POIS.keys()))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Endpoint to re-read the map's configured POI file without restarting or reparsing the map
+@app.route('/locations/reload', methods=['POST'])
+def reload_locations():
+    map_id = request_map()
+    poi_file = maps.config[map_id].get('pois')
+    if not poi_file:
+        return jsonify({"error": f"Map {map_id} has no POI file"}), 400
     try:
-        locations = list(pathfinder.POIS.keys())
-        return jsonify(locations)
+        # The reloaded registry is published with the new pathfinder and handed to the
+        # map's assistant; one built after this point reads it from the map registry
+        pathfinder = maps.reload_pois(map_id, poi_file)
+        with assistants_lock:
+            gemini = assistants.get(map_id)
+        if gemini:
+            gemini.reload_campus_info(pathfinder.registry)
+        return jsonify({"locations": len(pathfinder.POIS), "version": pathfinder.registry.version})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# Configured and loaded maps with their memory use
+@app.route('/maps', methods=['GET'])
+def list_maps():
+    return jsonify(maps.status())
+
+# Map status, and a rebuild from the OSM file off the request thread
+@app.route('/map', methods=['GET'])
+def map_status():
+    return jsonify(maps.get(request_map()).status())
+
+@app.route('/map/reload', methods=['POST'])
+def reload_map():
+    map_reloader = maps.get(request_map())
+    map_reloader.request_reload()
+    return jsonify(map_reloader.status()), 202
+
+# Runtime edge closures and weight changes, by OSM node id pairs or a whole OSM way
+@app.route('/closures', methods=['GET'])
+def get_closures():
+    overrides = current_pathfinder().edge_overrides()
+    return jsonify([
+        {"edge": [u, v], "closed": scale == EXCLUDED, "factor": None if scale == EXCLUDED else scale}
+        for (u, v), scale in overrides.items()
+    ])
+
+def closure_edges(pathfinder, data):
+    """Routing graph edges named by a /closures request: a whole OSM way or OSM node id pairs."""
+    if data.get('way') is not None:
+        return pathfinder.way_edges(int(data['way']))
+    return pathfinder.base_edges([tuple(edge) for edge in data.get('edges', [])], data.get('both_ways', True))
+
+@app.route('/closures', methods=['POST'])
+def update_closures():
+    data = request.json or {}
+    action = data.get('action', 'close')
+    map_reloader = maps.get(request_map())
+    try:
+        if action == 'close':
+            scale = EXCLUDED
+        elif action == 'reopen':
+            scale = 1.0
+        elif action == 'scale':
+            scale = float(data.get('factor'))
+        else:
+            raise ValueError(f"Unknown action: {action}")
+        # The change is applied to a copy that replaces the current pathfinder,
+        # so searches in flight never see a partly re-weighted graph
+        pathfinder = map_reloader.update(lambda current: current.with_edge_scale(closure_edges(current, data), scale))
+        edges = closure_edges(pathfinder, data)
+        return jsonify({"edges": len(edges), "search_edges": len(pathfinder.search_edges(edges))})
+    except KeyError as e:
+        return jsonify({"error": e.args[0]}), 404
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+# Endpoint to get the travel profiles find_path accepts
+@app.route('/profiles', methods=['GET'])
+def get_profiles():
+    return jsonify({"default": DEFAULT_PROFILE, "profiles": list(PROFILES)})
+
 if __name__ == '__main__':
+    # Load the default campus before serving; comparison workers import this
+    # module as __mp_main__ and must not load maps of their own
+    maps.get(DEFAULT_MAP)
     app.run(host='0.0.0.0', port=5000)
\ No newline at end of file